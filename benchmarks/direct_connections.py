@@ -0,0 +1,103 @@
+"""Direct-connection benchmark: pooled versus connect-per-query latency.
+
+Runs the same small query against a PostgreSQL-protocol server (a local
+PostgreSQL or a Redshift endpoint) from several threads, once opening a fresh
+psycopg2 connection per query and once through ``ConnectionPool``, and reports
+p50/p95 latency and queries per second for each.
+
+Usage::
+
+    python -m benchmarks.direct_connections --dsn postgresql://postgres@localhost/postgres
+    python -m benchmarks.direct_connections --dsn "$DSN" --queries 500 --concurrency 10 --output pool.json
+"""
+import argparse
+import functools
+import json
+import statistics
+import sys
+import threading
+import time
+from core.lazy import lazy_import
+from infrastructure.database import ConnectionPool
+
+psycopg2 = lazy_import("psycopg2")
+
+
+def _connect_per_query(dsn: str, sql: str):
+    connection = psycopg2.connect(dsn)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            cursor.fetchall()
+    finally:
+        connection.close()
+
+
+def run_scenario(name: str, query, queries: int, concurrency: int):
+    """Run ``query`` ``queries`` times from ``concurrency`` threads and summarise the latencies."""
+    remaining = iter(range(queries))
+    lock = threading.Lock()
+    latencies = []
+
+    def worker():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            started = time.perf_counter()
+            query()
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed * 1000)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "scenario": name,
+        "queries": len(latencies),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "queries_per_s": round(len(latencies) / elapsed, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare pooled and connect-per-query latency for a small query.")
+    parser.add_argument("--dsn", required=True, help="libpq connection string or URI.")
+    parser.add_argument("--sql", default="SELECT COUNT(*) FROM pg_stat_activity", help="Query to run.")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per scenario.")
+    parser.add_argument("--concurrency", type=int, default=5, help="Concurrent threads (and pool size).")
+    parser.add_argument("--output", help="Where to write the JSON report.")
+    args = parser.parse_args(argv)
+
+    pool = ConnectionPool(functools.partial(psycopg2.connect, args.dsn), name="benchmark",
+                          min_size=args.concurrency, max_size=args.concurrency)
+    pool.fill()
+    try:
+        results = [
+            run_scenario("connect_per_query", functools.partial(_connect_per_query, args.dsn, args.sql),
+                         args.queries, args.concurrency),
+            run_scenario("pooled", functools.partial(pool.fetch_all, args.sql), args.queries, args.concurrency),
+        ]
+    finally:
+        pool.close()
+
+    for result in results:
+        print(f"{result['scenario']:<18} p50={result['p50_ms']:<8} p95={result['p95_ms']:<8} "
+              f"q/s={result['queries_per_s']}")
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"settings": vars(args), "results": results, "pool": pool.stats()}, output, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+import itertools
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from botocore.exceptions import ClientError
+from core import instrumentation
+
+
+class FakeAWSConfig:
+    """Knobs shared by the local AWS stand-ins.
+
+    :param latency: Seconds each simulated API call takes (network round trip).
+    :param statement_seconds: Seconds a Redshift statement stays RUNNING before it finishes.
+    :param rows: Rows returned by a generic ``SELECT``.
+    :param page_size: Rows per ``get_statement_result`` page.
+    :param history_rows: Rows in the simulated ``stl_query`` table.
+    :param log_events: Events in every simulated log stream.
+    :param log_page_size: Events per ``get_log_events`` / ``filter_log_events`` page.
+    :param metric_points: Datapoints returned per metric series.
+    :param quotas: (Optional) Requests per second allowed per method (e.g. ``{"describe_statement": 100}``);
+        calls beyond it fail with ``ThrottlingException`` like an account over its AWS quota.
+    """
+
+    def __init__(self, latency: float = 0.005, statement_seconds: float = 0.05, rows: int = 100,
+                 page_size: int = 1000, history_rows: int = 2000, log_events: int = 500,
+                 log_page_size: int = 100, metric_points: int = 168, quotas: dict = None):
+        self.latency = latency
+        self.statement_seconds = statement_seconds
+        self.rows = rows
+        self.page_size = page_size
+        self.history_rows = history_rows
+        self.log_events = log_events
+        self.log_page_size = log_page_size
+        self.metric_points = metric_points
+        self.quotas = quotas or {}
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+class _FakeClient:
+    service = None
+
+    def __init__(self, config: FakeAWSConfig):
+        self.config = config
+        self.calls = {}
+        self.throttled = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _within_quota(self, method: str, now: float) -> bool:
+        """Token bucket per method holding one second of quota; call with the lock held."""
+        quota = self.config.quotas.get(method)
+        if quota is None:
+            return True
+        tokens, refilled = self._buckets.get(method, (quota, now))
+        tokens = min(quota, tokens + (now - refilled) * quota)
+        allowed = tokens >= 1
+        self._buckets[method] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+    def _call(self, method: str):
+        started = time.perf_counter()
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            allowed = self._within_quota(method, time.monotonic())
+            if not allowed:
+                self.throttled[method] = self.throttled.get(method, 0) + 1
+        if self.config.latency:
+            time.sleep(self.config.latency)
+        # Stand-ins skip botocore's event hooks, so report the call the way ClientRegistry would.
+        operation = "".join(part.title() for part in method.split("_"))
+        instrumentation.record_aws_call(self.service, operation, time.perf_counter() - started, failed=not allowed)
+        if not allowed:
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}}, operation)
+
+
+_HISTORY_COLUMNS = (
+    ("query", "int4"), ("userid", "int4"), ("database", "bpchar"), ("starttime", "timestamp"),
+    ("endtime", "timestamp"), ("execution_time_ms", "numeric"), ("aborted", "int4"), ("querytxt", "bpchar"),
+)
+_LIVE_HISTORY_COLUMNS = (
+    ("query", "int4"), ("starttime", "timestamp"), ("endtime", "timestamp"), ("execution_time_ms", "numeric"),
+    ("querytxt", "bpchar"), ("aborted", "int4"),
+)
+_ATTRIBUTION_COLUMNS = (
+    ("query", "int4"), ("usename", "bpchar"), ("querytxt", "bpchar"), ("execution_time_ms", "numeric"),
+    ("slot_count", "int4"),
+)
+_HISTORY_TEMPLATES = (
+    "SELECT * FROM sales WHERE id = {0}",
+    "SELECT region, SUM(amount) FROM sales WHERE sold_at > '2024-01-{1:02d}' GROUP BY region",
+    "SELECT * FROM events WHERE user_id IN ({0}, {1}, {2}) LIMIT 100",
+    "INSERT INTO audit VALUES ({0}, 'fake', {1})",
+)
+_GENERIC_COLUMNS = (("id", "int8"), ("name", "varchar"), ("value", "float8"), ("created", "timestamp"))
+
+
+def _field(value):
+    if value is None:
+        return {"isNull": True}
+    if isinstance(value, bool):
+        return {"booleanValue": value}
+    if isinstance(value, int):
+        return {"longValue": value}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class FakeRedshiftData(_FakeClient):
+    """In-process stand-in for the ``redshift-data`` client.
+
+    Statements finish ``statement_seconds`` after submission. ``stl_query`` reads
+    are answered from a synthetic history table honouring the ingester's
+    ``(endtime, query)`` watermark; any other statement returns ``rows`` generic rows.
+    """
+
+    service = "redshift-data"
+
+    def __init__(self, config: FakeAWSConfig):
+        super().__init__(config)
+        self._statements = {}
+        start = datetime.utcnow() - timedelta(days=1)
+        step = 86400 / max(config.history_rows, 1)
+        self._history = []
+        for query in range(1, config.history_rows + 1):
+            started = start + timedelta(seconds=query * step)
+            runtime_ms = float((query * 7919) % 60000)
+            self._history.append((
+                query, 100 + query % 5, "dev", started.strftime("%Y-%m-%d %H:%M:%S"),
+                (started + timedelta(milliseconds=runtime_ms)).strftime("%Y-%m-%d %H:%M:%S"),
+                runtime_ms, int(query % 50 == 0), _HISTORY_TEMPLATES[query % len(_HISTORY_TEMPLATES)].format(query, query % 28 + 1, query + 1),
+            ))
+        self._history.sort(key=lambda row: (row[4], row[0]))
+
+    def _new_statement(self, sql, parameters=None, sub_statements=None, target=None):
+        statement_id = str(uuid.uuid4())
+        self._statements[statement_id] = {
+            "sql": sql, "parameters": parameters or [], "submitted": time.monotonic(), "sub_statements": sub_statements,
+            "target": {key: (target or {}).get(key) for key in ("ClusterIdentifier", "Database", "DbUser")},
+        }
+        return statement_id
+
+    def execute_statement(self, Sql, Parameters=None, **kwargs):
+        self._call("execute_statement")
+        return {"Id": self._new_statement(Sql, Parameters, target=kwargs)}
+
+    def batch_execute_statement(self, Sqls, **kwargs):
+        self._call("batch_execute_statement")
+        sub_statements = [self._new_statement(sql) for sql in Sqls]
+        return {"Id": self._new_statement(";".join(Sqls), sub_statements=sub_statements, target=kwargs)}
+
+    def cancel_statement(self, Id):
+        self._call("cancel_statement")
+        return {"Status": True}
+
+    def describe_statement(self, Id):
+        self._call("describe_statement")
+        statement = self._statements.get(Id)
+        if statement is None:
+            raise ClientError(
+                {"Error": {"Code": "ResourceNotFoundException", "Message": f"Query {Id} does not exist."}},
+                "DescribeStatement",
+            )
+        elapsed = time.monotonic() - statement["submitted"]
+        finished = elapsed >= self.config.statement_seconds
+        has_result_set = statement["sql"].lstrip().upper().startswith("SELECT")
+        response = {
+            "Id": Id,
+            "Status": "FINISHED" if finished else "STARTED",
+            "Duration": int(elapsed * 1e9),
+            "HasResultSet": has_result_set,
+            "ResultRows": (self.config.rows if has_result_set else 0) if finished else -1,
+            "QueryString": statement["sql"],
+            **statement["target"],
+        }
+        if statement["sub_statements"]:
+            response["SubStatements"] = [
+                {"Id": sub_id, "Status": response["Status"], "Duration": response["Duration"],
+                 "HasResultSet": self._statements[sub_id]["sql"].lstrip().upper().startswith("SELECT")}
+                for sub_id in statement["sub_statements"]
+            ]
+        return response
+
+    def get_statement_result(self, Id, NextToken=None):
+        self._call("get_statement_result")
+        statement = self._statements[Id]
+        columns, rows = self._result(statement["sql"], statement["parameters"])
+        offset = int(NextToken or 0)
+        page = rows[offset:offset + self.config.page_size]
+        response = {
+            "ColumnMetadata": [{"name": name, "typeName": type_name} for name, type_name in columns],
+            "Records": [[_field(value) for value in row] for row in page],
+            "TotalNumRows": len(rows),
+        }
+        if offset + self.config.page_size < len(rows):
+            response["NextToken"] = str(offset + self.config.page_size)
+        return response
+
+    def _result(self, sql, parameters):
+        if "stl_query" not in sql:
+            created = datetime(2024, 1, 1).strftime("%Y-%m-%d %H:%M:%S")
+            return _GENERIC_COLUMNS, [(i, f"row-{i}", i * 0.5, created) for i in range(self.config.rows)]
+
+        params = {p["name"]: p["value"] for p in parameters}
+        rows = self._history
+        if "ts" in params:
+            watermark = (params["ts"], int(params["query"]))
+            rows = [row for row in rows if (row[4], row[0]) > watermark]
+        if "start_time" in params:
+            rows = [row for row in rows if params["start_time"] <= row[3] <= params["end_time"]]
+            if "COUNT(*)" in sql:
+                durations = [row[5] for row in rows]
+                return (("total", "int8"), ("avg_ms", "numeric"), ("failed", "int8")), [(
+                    len(rows), sum(durations) / len(durations) if durations else None, sum(row[6] for row in rows),
+                )]
+            if "min_execution_ms" in params:
+                rows = sorted((row for row in rows if row[5] > float(params["min_execution_ms"])), key=lambda row: -row[5])
+                limit = re.search(r"LIMIT\s+(\d+)", sql, re.IGNORECASE)
+                return (("query", "int4"), ("userid", "int4"), ("starttime", "timestamp"), ("execution_time_ms", "numeric")), [
+                    (row[0], row[1], row[3], row[5]) for row in rows[:int(limit.group(1))]
+                ]
+            if "ORDER BY starttime DESC" in sql:
+                # Live query history, as read when the local history store does not cover a cluster.
+                rows = sorted(rows, key=lambda row: row[3], reverse=True)
+                limit = re.search(r"LIMIT\s+(\d+)", sql, re.IGNORECASE)
+                return _LIVE_HISTORY_COLUMNS, [
+                    (row[0], row[3], row[4], row[5], row[7], row[6]) for row in rows[:int(limit.group(1))]
+                ]
+            if "stl_wlm_query" in sql:
+                return _ATTRIBUTION_COLUMNS, [
+                    (row[0], f"user_{row[1]}", row[7], row[5], 1 + row[0] % 3) for row in rows
+                ]
+            return (("querytxt", "bpchar"), ("execution_time_ms", "numeric")), [(row[7], row[5]) for row in rows]
+        limit = re.search(r"LIMIT\s+(\d+)", sql, re.IGNORECASE)
+        rows = rows[:int(limit.group(1))] if limit else rows
+        return _HISTORY_COLUMNS, rows
+
+    def list_databases(self, **kwargs):
+        self._call("list_databases")
+        return {"Databases": ["dev", "analytics"]}
+
+    def list_schemas(self, **kwargs):
+        self._call("list_schemas")
+        return {"Schemas": ["public", "staging", "reporting"]}
+
+    def list_tables(self, SchemaPattern=None, **kwargs):
+        self._call("list_tables")
+        schemas = [SchemaPattern] if SchemaPattern else ["public", "staging", "reporting"]
+        return {
+            "Tables": [
+                {"name": f"{prefix}_{i}", "schema": schema, "type": "TABLE"}
+                for schema in schemas for prefix in ("sales", "events", "users") for i in range(20)
+            ]
+        }
+
+
+class _FakePaginator:
+    def __init__(self, method):
+        self.method = method
+
+    def paginate(self, **kwargs):
+        yield self.method(**kwargs)
+
+
+class FakeCloudWatch(_FakeClient):
+    """In-process stand-in for the ``cloudwatch`` client with deterministic hourly series."""
+
+    service = "cloudwatch"
+    SERVICES = ("AmazonRedshift", "AmazonS3", "AmazonEC2", "AWSDataTransfer")
+
+    def list_metrics(self, **kwargs):
+        self._call("list_metrics")
+        return {
+            "Metrics": [
+                {"Namespace": "AWS/Billing", "MetricName": "EstimatedCharges",
+                 "Dimensions": [{"Name": "ServiceName", "Value": service}, {"Name": "Currency", "Value": "USD"}]}
+                for service in self.SERVICES
+            ]
+        }
+
+    def get_paginator(self, operation_name):
+        return _FakePaginator(getattr(self, operation_name))
+
+    def get_metric_data(self, MetricDataQueries, StartTime, EndTime, **kwargs):
+        self._call("get_metric_data")
+        results = []
+        for index, query in enumerate(MetricDataQueries):
+            period = query["MetricStat"]["Period"]
+            count = min(self.config.metric_points, max(int((EndTime - StartTime).total_seconds() // period), 1))
+            timestamps = [EndTime - timedelta(seconds=period * (count - i)) for i in range(count)]
+            if query["MetricStat"]["Metric"]["MetricName"] == "EstimatedCharges":
+                # Month-to-date running total that resets on the 1st, like the real billing metric.
+                values = [
+                    round((ts.day - 1) * 24 + ts.hour + 1, 2) * (index + 1) * 0.05 for ts in timestamps
+                ]
+            else:
+                values = [float((i * 37 + index * 11) % 100) for i in range(count)]
+            results.append({"Id": query["Id"], "Timestamps": timestamps, "Values": values, "StatusCode": "Complete"})
+        return {"MetricDataResults": results}
+
+
+class FakeLogs(_FakeClient):
+    """In-process stand-in for the ``logs`` client; every stream holds ``log_events`` events."""
+
+    service = "logs"
+
+    def __init__(self, config: FakeAWSConfig):
+        super().__init__(config)
+        self._queries = {}
+
+    def _events(self, start_time=None, end_time=None):
+        base = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+        for i in range(self.config.log_events):
+            timestamp = base + i * 1000
+            if (start_time is None or timestamp >= start_time) and (end_time is None or timestamp <= end_time):
+                yield {"eventId": str(i), "timestamp": timestamp, "ingestionTime": timestamp,
+                       "message": f"event {i} level=INFO duration_ms={i % 250}"}
+
+    def get_log_events(self, logGroupName, logStreamName, nextToken=None, startTime=None, endTime=None,
+                       startFromHead=True, limit=None):
+        self._call("get_log_events")
+        offset = int(nextToken[2:]) if nextToken else 0
+        size = limit or self.config.log_page_size
+        events = list(itertools.islice(self._events(startTime, endTime), offset, offset + size))
+        return {"events": events, "nextForwardToken": f"f/{offset + len(events)}"}
+
+    def filter_log_events(self, logGroupName, nextToken=None, startTime=None, endTime=None, **kwargs):
+        self._call("filter_log_events")
+        offset = int(nextToken) if nextToken else 0
+        events = list(itertools.islice(self._events(startTime, endTime), offset, offset + self.config.log_page_size))
+        response = {"events": [{**event, "logStreamName": "stream-1"} for event in events]}
+        if len(events) == self.config.log_page_size:
+            response["nextToken"] = str(offset + len(events))
+        return response
+
+    def start_query(self, logGroupNames, startTime, endTime, queryString, **kwargs):
+        self._call("start_query")
+        bin_seconds = int(re.search(r"bin\((\d+)s\)", queryString).group(1))
+        query_id = str(uuid.uuid4())
+        self._queries[query_id] = (logGroupNames, startTime, endTime, bin_seconds)
+        return {"queryId": query_id}
+
+    def get_query_results(self, queryId):
+        self._call("get_query_results")
+        log_groups, start_time, end_time, bin_seconds = self._queries.pop(queryId)
+        results = []
+        for group in log_groups:
+            for i, slot in enumerate(range(start_time - start_time % bin_seconds, end_time, bin_seconds)):
+                slot_time = datetime.fromtimestamp(slot, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S.000")
+                results.append([
+                    {"field": "@log", "value": f"123456789012:{group}"},
+                    {"field": "slot", "value": slot_time},
+                    {"field": "events", "value": str(100 + (i * 13) % 20)},
+                ])
+        return {"status": "Complete", "results": results}
+
+
+def install(config: FakeAWSConfig, regions):
+    """
+    Register the stand-ins with the shared client registry for every region.
+
+    :return: Dict mapping service name to its fake client, for reading call counts.
+    """
+    from infrastructure.aws_clients import client_registry
+
+    fakes = {"redshift-data": FakeRedshiftData(config), "cloudwatch": FakeCloudWatch(config), "logs": FakeLogs(config)}
+    for region in set(regions):
+        for service, client in fakes.items():
+            client_registry.register(service, client, region)
+    return fakes
@@ -0,0 +1,309 @@
+"""Offline load benchmark for every router in ``main.py``.
+
+The app is driven in-process over ASGI with the AWS clients replaced by the
+stand-ins in ``benchmarks.fake_aws``, so no AWS account or network is needed.
+
+Usage::
+
+    python -m benchmarks.run --concurrency 20 --requests 200 --output benchmark-results.json
+    python -m benchmarks.run --compare benchmark-results.json --output new.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+# (name, method, path, JSON body). Every router in main.py is covered.
+ENDPOINTS = [
+    ("databases", "GET", "/api/databases", None),
+    ("databases_fleet", "GET", "/api/databases?cluster=all", None),
+    ("schemas", "GET", "/api/schemas/dev", None),
+    ("tables", "GET", "/api/tables/dev/public", None),
+    ("tables_search", "GET", "/api/tables/search?prefix=sales&database=dev", None),
+    ("query_execute", "POST", "/api/query/execute", {"sql": "SELECT * FROM sales"}),
+    ("query_execute_columnar", "POST", "/api/query/execute", {"sql": "SELECT * FROM sales", "format": "columnar"}),
+    ("query_execute_cached", "POST", "/api/query/execute", {"sql": "SELECT * FROM sales", "max_age": 60}),
+    ("query_execute_stream", "POST", "/api/query/execute", {"sql": "SELECT * FROM sales", "stream": True}),
+    ("query_export_csv", "POST", "/api/query/export", {"sql": "SELECT * FROM sales", "format": "csv"}),
+    ("query_batch", "POST", "/api/query/batch",
+     {"statements": ["SELECT 1", "SELECT 2", "SELECT 3"], "mode": "parallel"}),
+    ("query_job_submit", "POST", "/api/query/jobs", {"sql": "SELECT * FROM sales"}),
+    ("query_history", "GET", "/api/query/history?limit=50", None),
+    ("query_history_fleet", "GET", "/api/query/history?limit=50&cluster=all", None),
+    ("query_fingerprints", "GET", "/api/query/fingerprints?limit=20", None),
+    ("query_long_running", "GET", "/api/query/long-running", None),
+    ("query_slow", "GET", "/api/query/slow", None),
+    ("query_statistics", "GET", "/api/query/statistics", None),
+    ("query_statistics_fleet", "GET", "/api/query/statistics?cluster=all", None),
+    ("cost_total", "GET", "/api/cost/total", None),
+    ("cost_history", "GET", "/api/cost/history?days=90", None),
+    ("cost_month_over_month", "GET", "/api/cost/month-over-month", None),
+    ("cost_top_queries", "GET", "/api/cost/top-queries", None),
+    ("cost_top_queries_fleet", "GET", "/api/cost/top-queries?cluster=all", None),
+    ("cost_optimization", "GET", "/api/cost/optimization", None),
+    ("anomalies", "POST", "/api/anomalies",
+     {"metrics": [{"namespace": "AWS/Redshift", "metric_name": "CPUUtilization",
+                   "dimensions": {"ClusterIdentifier": "bench"}}],
+      "log_groups": ["/aws/redshift/bench"], "hours": 24, "period": 300}),
+    ("logs_stream", "GET", "/api/logs/stream?log_group=/aws/redshift/bench&log_stream=stream-1", None),
+    ("logs_filter", "GET", "/api/logs/stream?log_group=/aws/redshift/bench&filter_pattern=INFO", None),
+    ("system_caches", "GET", "/api/system/caches", None),
+    ("metrics", "GET", "/metrics", None),
+]
+
+
+def _configure_environment(data_dir: str):
+    """Point the app at local state before ``core.config`` is imported."""
+    defaults = {
+        "AWS_ACCESS_KEY_ID": "benchmark",
+        "AWS_SECRET_ACCESS_KEY": "benchmark",
+        "REDSHIFT_CLUSTER_ID": "bench",
+        "REDSHIFT_DATABASE": "dev",
+        "REDSHIFT_USER": "bench",
+        # Three clusters in the fake region, for the ``?cluster=all`` fan-out endpoints.
+        "REDSHIFT_CLUSTERS": json.dumps([
+            {"name": "bench", "cluster_id": "bench"},
+            {"name": "bench-etl", "cluster_id": "bench-etl"},
+            {"name": "bench-bi", "cluster_id": "bench-bi"},
+        ]),
+        "STATEMENT_POLL_INITIAL": "0.02",
+        # The stand-ins have no AWS quotas; keep the rate governor in the path without capping it.
+        "AWS_GOVERNOR_LIMITS": json.dumps({"*": 100000}),
+        "AWS_GOVERNOR_CONCURRENCY": "50",
+        "QUERY_HISTORY_STORE_ENABLED": "true",
+        "QUERY_HISTORY_STORE_PATH": os.path.join(data_dir, "query_history.sqlite3"),
+        "DASHBOARD_REFRESH_ENABLED": "true",
+        "COST_HISTORY_STORE_ENABLED": "true",
+        "COST_HISTORY_STORE_PATH": os.path.join(data_dir, "cost_history.sqlite3"),
+    }
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+
+
+class RSSSampler:
+    """Samples resident set size in a background thread and keeps the peak.
+
+    Reads ``/proc/self/statm`` where available; elsewhere falls back to the
+    process-lifetime ``ru_maxrss``, which can only grow.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def current(self) -> int:
+        try:
+            with open("/proc/self/statm") as statm:
+                return int(statm.read().split()[1]) * self._page_size
+        except OSError:
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.current())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self.current()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+def percentile(sorted_values, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+async def bench_endpoint(client, method: str, path: str, body, requests: int, concurrency: int):
+    """
+    Issue ``requests`` calls with ``concurrency`` in flight and summarise them.
+
+    :return: Dict of latency percentiles (ms), requests per second, error count and peak RSS (bytes).
+    """
+    latencies = []
+    errors = 0
+    statuses = {}
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            # Streaming endpoints are timed until the last byte arrives.
+            await response.aread()
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code >= 400:
+                errors += 1
+
+    with RSSSampler() as rss:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "method": method,
+        "path": path,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2),
+        "peak_rss_bytes": rss.peak,
+    }
+
+
+async def run_benchmarks(args, fake_config):
+    import httpx
+    from core.config import Settings
+    from benchmarks import fake_aws
+
+    fakes = fake_aws.install(fake_config, [Settings.AWS_REGION, Settings.CLOUDWATCH_REGION])
+
+    import main
+
+    async with main.app.router.lifespan_context(main.app):
+        # Let the ingesters finish their first pass so history reads hit populated stores.
+        for ingester in (main.query_history_ingester, main.cost_history_ingester):
+            while ingester is not None and ingester.last_run is None:
+                if ingester.last_error:
+                    raise RuntimeError(f"History ingestion failed: {ingester.last_error}")
+                await asyncio.sleep(0.05)
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            results = {}
+            for name, method, path, body in ENDPOINTS:
+                if args.endpoint and name not in args.endpoint:
+                    continue
+                for _ in range(args.warmup):
+                    await client.request(method, path, json=body)
+                results[name] = await bench_endpoint(client, method, path, body, args.requests, args.concurrency)
+                print(_format_row(name, results[name]), flush=True)
+
+    return results, {service: dict(fake.calls) for service, fake in fakes.items()}
+
+
+def _format_row(name: str, result: dict) -> str:
+    return (
+        f"{name:<24} p50={result['p50_ms']:>8.2f}ms p95={result['p95_ms']:>8.2f}ms "
+        f"p99={result['p99_ms']:>8.2f}ms rps={result['rps']:>8.1f} errors={result['errors']:<4} "
+        f"rss={result['peak_rss_bytes'] / 2**20:.1f}MiB"
+    )
+
+
+def compare(previous: dict, current: dict, tolerance: float):
+    """
+    Print per-endpoint changes against a previous results file.
+
+    :return: Names of endpoints whose p95 grew or RPS fell by more than ``tolerance`` (a fraction).
+    """
+    if previous.get("settings") != current["settings"] or previous.get("fake_aws") != current["fake_aws"]:
+        print("Warning: load or stand-in settings differ from the previous run; changes are not like for like.")
+    regressions = []
+    for name, result in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(name)
+        if before is None:
+            continue
+        p95_change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+        rps_change = (result["rps"] - before["rps"]) / before["rps"] if before["rps"] else 0.0
+        regressed = p95_change > tolerance or rps_change < -tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<24} p95 {p95_change:+7.1%}  rps {rps_change:+7.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load benchmark against local AWS stand-ins.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint.")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight per endpoint.")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per endpoint.")
+    parser.add_argument("--endpoint", action="append", help="Only run this endpoint (repeatable).")
+    parser.add_argument("--latency", type=float, default=0.005, help="Simulated seconds per AWS API call.")
+    parser.add_argument("--statement-seconds", type=float, default=0.05, help="Simulated Redshift statement runtime.")
+    parser.add_argument("--rows", type=int, default=100, help="Rows returned by a SELECT.")
+    parser.add_argument("--page-size", type=int, default=1000, help="Rows per result page.")
+    parser.add_argument("--log-events", type=int, default=500, help="Events per log stream.")
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to write the JSON results.")
+    parser.add_argument("--compare", help="Previous results file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Fractional p95/RPS change reported as a regression (default 0.10).")
+    args = parser.parse_args(argv)
+
+    data_dir = tempfile.mkdtemp(prefix="redshift-api-bench-")
+    _configure_environment(data_dir)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from benchmarks.fake_aws import FakeAWSConfig
+
+    fake_config = FakeAWSConfig(
+        latency=args.latency, statement_seconds=args.statement_seconds, rows=args.rows,
+        page_size=args.page_size, log_events=args.log_events,
+    )
+    results, aws_calls = asyncio.run(run_benchmarks(args, fake_config))
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"requests": args.requests, "concurrency": args.concurrency, "warmup": args.warmup},
+        "fake_aws": fake_config.to_dict(),
+        "aws_calls": aws_calls,
+        "endpoints": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as previous:
+            regressions = compare(json.load(previous), report, args.tolerance)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""Cold-start benchmark: import time and time to first request.
+
+Each run starts a fresh interpreter, imports ``main``, swaps in the stand-ins
+from ``benchmarks.fake_aws`` and serves one request over ASGI, reading the
+``imported`` and ``first_request`` milestones the app records for itself.
+
+Usage::
+
+    python -m benchmarks.startup --runs 10 --output startup-results.json
+    python -m benchmarks.startup --compare startup-results.json --output new.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from benchmarks.run import _git_commit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; ``import main`` must come first so nothing is pre-imported.
+_CHILD = """
+import asyncio, json, sys, time
+import main
+import httpx
+from benchmarks import fake_aws
+from core import instrumentation
+from core.config import Settings
+
+fake_aws.install(fake_aws.FakeAWSConfig(latency=0, statement_seconds=0), [Settings.AWS_REGION, Settings.CLOUDWATCH_REGION])
+
+async def first_request():
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            response = await client.get(sys.argv[1])
+            response.raise_for_status()
+
+asyncio.run(first_request())
+print(json.dumps(instrumentation.startup_milestones))
+"""
+
+
+def measure_once(path: str, warmup: str, env: dict) -> dict:
+    """Start one interpreter and return its startup milestones in seconds."""
+    child_env = {**os.environ, **env, "STARTUP_WARMUP": warmup, "PYTHONPATH": ROOT}
+    completed = subprocess.run(
+        [sys.executable, "-c", _CHILD, path], capture_output=True, text=True, cwd=ROOT, env=child_env,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup run failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    """Median, min and max in milliseconds for each milestone across runs."""
+    summary = {}
+    for milestone in samples[0]:
+        values = [sample[milestone] * 1000 for sample in samples if milestone in sample]
+        summary[milestone] = {
+            "median_ms": round(statistics.median(values), 1),
+            "min_ms": round(min(values), 1),
+            "max_ms": round(max(values), 1),
+        }
+    return summary
+
+
+def compare(previous: dict, current: dict, tolerance: float):
+    """
+    Print per-mode milestone changes against a previous results file.
+
+    :return: ``mode/milestone`` names whose median grew by more than ``tolerance`` (a fraction).
+    """
+    regressions = []
+    for mode, milestones in current["modes"].items():
+        for milestone, result in milestones.items():
+            before = previous.get("modes", {}).get(mode, {}).get(milestone)
+            if before is None or not before["median_ms"]:
+                continue
+            change = (result["median_ms"] - before["median_ms"]) / before["median_ms"]
+            regressed = change > tolerance
+            if regressed:
+                regressions.append(f"{mode}/{milestone}")
+            print(f"{mode + '/' + milestone:<28} median {change:+7.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import time and time to first request.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per startup mode.")
+    parser.add_argument("--path", default="/api/databases", help="Endpoint served as the first request.")
+    parser.add_argument("--mode", action="append", choices=("lazy", "background"),
+                        help="Only measure this STARTUP_WARMUP mode (repeatable).")
+    parser.add_argument("--output", default="startup-results.json", help="Where to write the JSON report.")
+    parser.add_argument("--compare", help="Previous JSON report to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Fractional median change reported as a regression (default 0.10).")
+    args = parser.parse_args(argv)
+
+    data_dir = tempfile.mkdtemp(prefix="redshift-api-startup-")
+    env = {
+        "AWS_ACCESS_KEY_ID": "benchmark",
+        "AWS_SECRET_ACCESS_KEY": "benchmark",
+        "REDSHIFT_CLUSTER_ID": "bench",
+        "REDSHIFT_DATABASE": "dev",
+        "REDSHIFT_USER": "bench",
+        "STATEMENT_POLL_INITIAL": "0.01",
+        "DOTENV_ENABLED": "false",
+        # Keep background ingestion from competing with the first request.
+        "QUERY_HISTORY_STORE_ENABLED": "false",
+        "COST_HISTORY_STORE_ENABLED": "false",
+        "QUERY_HISTORY_STORE_PATH": os.path.join(data_dir, "query_history.sqlite3"),
+        "COST_HISTORY_STORE_PATH": os.path.join(data_dir, "cost_history.sqlite3"),
+    }
+
+    modes = {}
+    for mode in args.mode or ("lazy", "background"):
+        samples = [measure_once(args.path, mode, env) for _ in range(args.runs)]
+        modes[mode] = summarize(samples)
+        for milestone, result in modes[mode].items():
+            print(f"{mode + '/' + milestone:<28} median {result['median_ms']:8.1f} ms  "
+                  f"min {result['min_ms']:8.1f}  max {result['max_ms']:8.1f}")
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"runs": args.runs, "path": args.path},
+        "modes": modes,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as previous:
+            regressions = compare(json.load(previous), report, args.tolerance)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Throttling benchmark: Data API calls against a stand-in with an AWS-style quota.
+
+Runs the same burst of ``describe_statement`` calls through ``StatementExecutor``
+twice, once straight at the stand-in and once through a ``RateGovernor`` whose
+ceiling is deliberately set above the quota, and reports how many calls succeed,
+how many AWS calls were wasted on throttling responses and the achieved rate.
+
+Usage::
+
+    python -m benchmarks.throttling --quota 50 --calls 1000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from benchmarks.fake_aws import FakeAWSConfig, FakeRedshiftData
+from core.exceptions import ThrottledError
+from core.rate_governor import GovernedClient, RateGovernors
+from core.statement_executor import StatementExecutor
+
+OPERATION = "describe_statement"
+
+
+async def run_scenario(governed: bool, quota: float, calls: int, concurrency: int, governor_rate: float, latency: float):
+    """Issue ``calls`` describe_statement calls from ``concurrency`` workers and count the outcomes."""
+    fake = FakeRedshiftData(FakeAWSConfig(latency=latency, quotas={OPERATION: quota}))
+    statement_id = fake.execute_statement(Sql="SELECT 1")["Id"]
+    client = fake
+    governors = None
+    if governed:
+        governors = RateGovernors(limits=json.dumps({f"redshift-data.{OPERATION}": governor_rate}))
+        client = GovernedClient(fake, governors, "redshift-data", "local")
+    executor = StatementExecutor(client, max_workers=concurrency)
+
+    outcomes = {"ok": 0, "throttled": 0, "rejected": 0}
+    remaining = iter(range(calls))
+
+    async def worker():
+        for _ in remaining:
+            try:
+                await executor.call(OPERATION, Id=statement_id)
+                outcomes["ok"] += 1
+            except ThrottledError:
+                outcomes["rejected"] += 1
+            except Exception:
+                outcomes["throttled"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "governed": governed,
+        "seconds": round(elapsed, 2),
+        "succeeded": outcomes["ok"],
+        "failed": outcomes["throttled"] + outcomes["rejected"],
+        "aws_calls": fake.calls.get(OPERATION, 0),
+        "aws_throttled": fake.throttled.get(OPERATION, 0),
+        "success_rate_per_s": round(outcomes["ok"] / elapsed, 1),
+    }
+    if governors is not None:
+        result["governor"] = governors.stats()[0]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare ungoverned and governed calls against a throttling stand-in.")
+    parser.add_argument("--quota", type=float, default=50, help="Stand-in requests per second before throttling.")
+    parser.add_argument("--calls", type=int, default=1000, help="Calls issued per scenario.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent callers.")
+    parser.add_argument("--governor-rate", type=float, default=100,
+                        help="Governor's starting ceiling in requests per second (above --quota to show it adapting).")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds each stand-in call takes.")
+    parser.add_argument("--output", help="Where to write the JSON report.")
+    args = parser.parse_args(argv)
+
+    results = [
+        asyncio.run(run_scenario(governed, args.quota, args.calls, args.concurrency, args.governor_rate, args.latency))
+        for governed in (False, True)
+    ]
+    for result in results:
+        print(f"{'governed' if result['governed'] else 'ungoverned':<11} "
+              f"succeeded={result['succeeded']:<6} failed={result['failed']:<6} "
+              f"aws_calls={result['aws_calls']:<6} aws_throttled={result['aws_throttled']:<6} "
+              f"ok/s={result['success_rate_per_s']:<7} time={result['seconds']}s")
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"settings": vars(args), "results": results}, output, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
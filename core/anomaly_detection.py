@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import itertools
+import warnings
+from core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Scale factor that makes the MAD a consistent estimator of the standard deviation.
+_MAD_SCALE = 0.6745
+
+
+def to_grid(series, start: float, period: int, length: int) -> np.ndarray:
+    """
+    Place several sparse ``(epoch_seconds, value)`` series on one regular time grid.
+
+    :param series: List of point lists, one per series.
+    :param start: Epoch seconds of the first grid slot.
+    :param period: Seconds per slot.
+    :param length: Number of slots.
+    :return: ``(n_series, length)`` float array with NaN where a series has no point.
+    """
+    grid = np.full((len(series), length), np.nan)
+    for row, points in enumerate(series):
+        if not points:
+            continue
+        flat = np.fromiter(itertools.chain.from_iterable(points), dtype=float, count=2 * len(points))
+        times, values = flat[0::2], flat[1::2]
+        slots = ((times - start) // period).astype(np.int64)
+        inside = (slots >= 0) & (slots < length)
+        grid[row, slots[inside]] = values[inside]
+    return grid
+
+
+def rolling_zscore(values: np.ndarray, window: int = 60) -> np.ndarray:
+    """
+    Score each point against the mean and standard deviation of the preceding ``window`` points.
+
+    Computed for all series at once from cumulative sums, so the cost is linear in the
+    number of points regardless of ``window``.
+    """
+    n_series, n = values.shape
+    valid = ~np.isnan(values)
+    # Centre each series first to keep the sum-of-squares variance numerically stable.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        centred = values - np.nanmean(values, axis=1, keepdims=True)
+    x = np.where(valid, centred, 0.0)
+
+    index = np.arange(n)
+    low = np.maximum(index - window, 0)
+
+    def trailing_sum(a):
+        totals = np.zeros((n_series, n + 1))
+        np.cumsum(a, axis=1, out=totals[:, 1:])
+        return totals[:, index] - totals[:, low]
+
+    count = trailing_sum(valid.astype(float))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = trailing_sum(x) / count
+        std = np.sqrt(np.maximum(trailing_sum(x * x) / count - mean * mean, 0.0))
+        scores = (x - mean) / std
+    scores[~valid | (count < max(2, window // 2)) | ~np.isfinite(scores)] = 0.0
+    return scores
+
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    """Replace NaNs with the previous value in the row (leading NaNs take the first valid value)."""
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(values.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    rows = np.arange(values.shape[0])
+    filled = values[rows[:, None], index]
+    first_valid = values[rows, np.argmax(valid, axis=1)]
+    filled = np.where(np.isnan(filled), first_valid[:, None], filled)
+    return np.nan_to_num(filled)
+
+
+def _ewma_filter(x: np.ndarray, alpha: float, initial: np.ndarray, block: int = 128) -> np.ndarray:
+    """
+    Apply ``y[t] = (1 - alpha) * y[t-1] + alpha * x[t]`` along every row.
+
+    Within a block the recurrence is unrolled into a lower-triangular matrix product,
+    so the Python loop runs once per ``block`` points rather than once per point.
+    """
+    n_series, n = x.shape
+    decay = 1 - alpha
+    k = np.arange(block)
+    lags = k[:, None] - k[None, :]
+    with np.errstate(under="ignore"):
+        weights = np.where(lags >= 0, alpha * decay ** np.maximum(lags, 0), 0.0)
+        carry = decay ** (k + 1)
+
+    out = np.empty_like(x)
+    state = initial
+    for start in range(0, n, block):
+        chunk = x[:, start:start + block]
+        size = chunk.shape[1]
+        y = chunk @ weights[:size, :size].T + state[:, None] * carry[None, :size]
+        out[:, start:start + size] = y
+        state = y[:, -1]
+    return out
+
+
+def ewma_zscore(values: np.ndarray, alpha: float = 0.1, warmup: int = 30) -> np.ndarray:
+    """
+    Score each point against an exponentially weighted mean and variance of the points before it.
+
+    Gaps are forward-filled so the smoothing runs as a linear filter over every series at once.
+    """
+    n_series, n = values.shape
+    x = _forward_fill(values)
+
+    mean = _ewma_filter(x, alpha, x[:, 0])
+    previous_mean = np.concatenate([x[:, :1], mean[:, :-1]], axis=1)
+    diff = x - previous_mean
+
+    var = _ewma_filter((1 - alpha) * diff * diff, alpha, np.zeros(n_series))
+    previous_var = np.concatenate([np.zeros((n_series, 1)), var[:, :-1]], axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = diff / np.sqrt(previous_var)
+    scores[np.isnan(values) | ~np.isfinite(scores)] = 0.0
+    scores[:, :warmup] = 0.0
+    return scores
+
+
+def seasonal_mad_score(values: np.ndarray, season: int) -> np.ndarray:
+    """
+    Score each point against the median of the same phase in every season.
+
+    E.g. with minute data and ``season=1440`` each minute is compared with the same
+    minute on the other days of the window.  The spread is the MAD of each series'
+    residuals, which is far more stable than a per-phase MAD over a few seasons.
+    Needs at least three full seasons.
+    """
+    n_series, n = values.shape
+    n_seasons = -(-n // season)
+    if n // season < 3:
+        return np.zeros_like(values)
+
+    padded = np.full((n_series, n_seasons * season), np.nan)
+    padded[:, :n] = values
+    cube = padded.reshape(n_series, n_seasons, season)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        baseline = np.nanmedian(cube, axis=1, keepdims=True)
+        residuals = (cube - baseline).reshape(n_series, -1)[:, :n]
+        mad = np.nanmedian(np.abs(residuals), axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = _MAD_SCALE * residuals / mad
+
+    scores[~np.isfinite(scores)] = 0.0
+    return scores
+
+
+DETECTORS = {
+    "zscore": lambda values, options: rolling_zscore(values, options.get("window", 60)),
+    "ewma": lambda values, options: ewma_zscore(values, options.get("alpha", 0.1)),
+    "seasonal": lambda values, options: seasonal_mad_score(values, options.get("season", 1440)),
+}
+
+
+def detect(values: np.ndarray, detectors, threshold: float = 3.0, options: dict = None):
+    """
+    Run the named detectors over every series and return the flagged points.
+
+    :return: List of ``(detector, series_index, slot_index, score)`` tuples.
+    """
+    options = options or {}
+    flagged = []
+    for name in detectors:
+        scores = DETECTORS[name](values, options)
+        rows, slots = np.nonzero(np.abs(scores) > threshold)
+        flagged.extend(zip([name] * len(rows), rows.tolist(), slots.tolist(), scores[rows, slots].tolist()))
+    return flagged
@@ -0,0 +1,332 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+# All named caches in the process, for reporting hit/miss counters.
+caches = {}
+
+
+class Flight:
+    """A load in progress that concurrent callers wait on instead of repeating it."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """In-process TTL cache with stale-while-revalidate and single-flight loading.
+
+    A fresh entry (younger than its TTL) is returned directly.  A stale entry
+    (within ``stale_ttl`` past its TTL) is also returned directly while a
+    background thread refreshes it.  On a miss, concurrent callers for the
+    same key share a single loader call.
+    """
+
+    def __init__(self, name: str, stale_ttl: float = 0):
+        self.name = name
+        self.stale_ttl = stale_ttl
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "errors": 0}
+        caches[name] = self
+
+    def get_or_load(self, key, loader, ttl: float):
+        """
+        Return the cached value for ``key``, calling ``loader()`` when it is missing or expired.
+
+        :param key: Hashable cache key.
+        :param loader: Zero-argument callable producing the value.
+        :param ttl: Seconds the value is considered fresh.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, loaded_at = entry
+                age = time.monotonic() - loaded_at
+                if age < ttl:
+                    self.counters["hits"] += 1
+                    return value
+                if age < ttl + self.stale_ttl:
+                    self.counters["stale_hits"] += 1
+                    if key not in self._inflight:
+                        self._start_refresh(key, loader)
+                    return value
+
+            self.counters["misses"] += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Flight()
+            else:
+                self.counters["coalesced"] += 1
+
+        if leader:
+            return self._load(key, loader, flight)
+
+        flight.event.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _load(self, key, loader, flight: Flight):
+        try:
+            flight.value = loader()
+            with self._lock:
+                self._entries[key] = (flight.value, time.monotonic())
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.counters["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def _start_refresh(self, key, loader):
+        # Called with self._lock held.
+        flight = self._inflight[key] = Flight()
+        self.counters["refreshes"] += 1
+
+        def refresh():
+            try:
+                self._load(key, loader, flight)
+            except Exception:
+                pass  # Keep serving the stale value; the error is counted in _load.
+
+        threading.Thread(target=refresh, name=f"{self.name}-refresh", daemon=True).start()
+
+    def invalidate(self, key=None):
+        """Drop one key, or every entry when ``key`` is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """Return hit/miss counters and the current entry count."""
+        with self._lock:
+            return {"entries": len(self._entries), **self.counters}
+
+
+class AsyncTTLCache:
+    """Event-loop counterpart of ``TTLCache`` for coroutine loaders.
+
+    Stale entries are refreshed by a background task, and concurrent misses
+    for the same key await a single shared future.
+    """
+
+    def __init__(self, name: str, stale_ttl: float = 0):
+        self.name = name
+        self.stale_ttl = stale_ttl
+        self._entries = {}
+        self._inflight = {}
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "errors": 0}
+        caches[name] = self
+
+    async def get_or_load(self, key, loader, ttl: float):
+        """
+        Return the cached value for ``key``, awaiting ``loader()`` when it is missing or expired.
+
+        :param key: Hashable cache key.
+        :param loader: Zero-argument coroutine function producing the value.
+        :param ttl: Seconds the value is considered fresh.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, loaded_at = entry
+            age = time.monotonic() - loaded_at
+            if age < ttl:
+                self.counters["hits"] += 1
+                return value
+            if age < ttl + self.stale_ttl:
+                self.counters["stale_hits"] += 1
+                if key not in self._inflight:
+                    self.counters["refreshes"] += 1
+                    self._start_load(key, loader)
+                return value
+
+        self.counters["misses"] += 1
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._start_load(key, loader)
+        else:
+            self.counters["coalesced"] += 1
+        return await asyncio.shield(future)
+
+    def _start_load(self, key, loader):
+        async def load():
+            try:
+                value = await loader()
+                self._entries[key] = (value, time.monotonic())
+                return value
+            except Exception:
+                self.counters["errors"] += 1
+                raise
+            finally:
+                self._inflight.pop(key, None)
+
+        future = self._inflight[key] = asyncio.ensure_future(load())
+        # Background refreshes may finish with nobody awaiting them.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return future
+
+    def peek(self, key):
+        """Return the cached value for ``key`` regardless of age, or None."""
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def invalidate(self, predicate=None):
+        """Drop every entry whose key matches ``predicate``, or all entries when it is None."""
+        for key in [key for key in self._entries if predicate is None or predicate(key)]:
+            del self._entries[key]
+
+    def stats(self):
+        """Return hit/miss counters and the current entry count."""
+        return {"entries": len(self._entries), **self.counters}
+
+
+class _SharedCall:
+    """A running ``AsyncSingleFlight`` call and the number of callers awaiting it."""
+
+    def __init__(self, future):
+        self.future = future
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """Shares one in-flight coroutine among concurrent callers with the same key.
+
+    Nothing is kept once the call finishes; only callers that arrive while it is
+    running share its result (or exception).  The shared call runs as its own
+    task, so a caller going away does not cancel it for the others; once the last
+    caller has gone away it is cancelled, as an unshared call would have been.
+    """
+
+    def __init__(self, name: str, on_coalesced=None):
+        self.name = name
+        self.on_coalesced = on_coalesced
+        self._inflight = {}
+        self.counters = {"calls": 0, "coalesced": 0, "errors": 0, "abandoned": 0}
+        caches[name] = self
+
+    async def do(self, key, fn):
+        """
+        Await ``fn()``, or the call already running for ``key``.
+
+        :param key: Hashable key identifying equivalent calls.
+        :param fn: Zero-argument coroutine function.
+        """
+        call = self._inflight.get(key)
+        if call is not None:
+            self.counters["coalesced"] += 1
+            if self.on_coalesced is not None:
+                self.on_coalesced()
+        else:
+            self.counters["calls"] += 1
+
+            async def run():
+                try:
+                    return await fn()
+                except Exception:
+                    self.counters["errors"] += 1
+                    raise
+                finally:
+                    if self._inflight.get(key) is call:
+                        del self._inflight[key]
+
+            call = self._inflight[key] = _SharedCall(asyncio.ensure_future(run()))
+            call.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.future)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.future.done():
+                # Every caller went away (e.g. clients disconnected): stop the work rather than finish it for nobody.
+                self.counters["abandoned"] += 1
+                if self._inflight.get(key) is call:
+                    del self._inflight[key]
+                call.future.cancel()
+
+    def stats(self):
+        """Return call and coalescing counters and the number of calls in flight."""
+        return {"in_flight": len(self._inflight), **self.counters}
+
+
+class ByteLRUCache:
+    """LRU cache bounded by the total size of its values in bytes rather than entry count.
+
+    Callers pass each value's size when storing it; least recently used entries
+    are evicted until the total fits in ``max_bytes``.
+    """
+
+    def __init__(self, name: str, max_bytes: int):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "oversized": 0}
+        caches[name] = self
+
+    def get(self, key, max_age: float = None):
+        """
+        Return ``(value, age_seconds)`` for ``key``, or None when absent or older than ``max_age``.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at, _ = entry
+                age = time.monotonic() - stored_at
+                if max_age is None or age <= max_age:
+                    self._entries.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return value, age
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, key, value, size: int):
+        """Store ``value`` occupying ``size`` bytes, evicting LRU entries as needed."""
+        if size > self.max_bytes:
+            with self._lock:
+                self.counters["oversized"] += 1
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[2]
+            self._entries[key] = (value, time.monotonic(), size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.counters["evictions"] += 1
+
+    def invalidate(self, key=None):
+        """Drop one key, or every entry when ``key`` is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.total_bytes = 0
+            else:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self.total_bytes -= old[2]
+
+    def stats(self):
+        """Return hit/miss counters and current byte usage."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                **self.counters,
+            }
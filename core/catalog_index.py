@@ -0,0 +1,44 @@
+import bisect
+
+
+class TableNameIndex:
+    """Sorted in-memory index of table names for prefix search across loaded schemas.
+
+    Tables are registered per ``(database, schema)``; the sorted search list is
+    rebuilt lazily on the next search after any change.
+    """
+
+    def __init__(self):
+        self._tables = {}
+        self._sorted = []
+        self._dirty = False
+
+    def update(self, database: str, schema: str, tables):
+        """Replace the tables registered for one schema."""
+        self._tables[(database, schema)] = list(tables)
+        self._dirty = True
+
+    def remove(self, predicate=None):
+        """Drop schemas whose ``(database, schema)`` key matches ``predicate`` (all when None)."""
+        for key in [key for key in self._tables if predicate is None or predicate(key)]:
+            del self._tables[key]
+        self._dirty = True
+
+    def search(self, prefix: str, database: str = None, limit: int = 50):
+        """Return up to ``limit`` tables whose name starts with ``prefix`` (case-insensitive)."""
+        if self._dirty:
+            self._sorted = sorted(
+                (table["name"].lower(), db, schema, table)
+                for (db, schema), tables in self._tables.items()
+                for table in tables
+            )
+            self._dirty = False
+
+        prefix = prefix.lower()
+        matches = []
+        for name, db, schema, table in self._sorted[bisect.bisect_left(self._sorted, (prefix,)):]:
+            if not name.startswith(prefix) or len(matches) >= limit:
+                break
+            if database is None or db == database:
+                matches.append({"database": db, "schema": schema, **table})
+        return matches
@@ -1,14 +1,9 @@
-import boto3
-from core.config import Settings
+from infrastructure.aws_clients import get_logs_client
 
 class CloudWatchClient:
-    def __init__(self):
-        self.client = boto3.client(
-            "logs",
-            region_name=Settings.AWS_REGION,
-            aws_access_key_id=Settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=Settings.AWS_SECRET_ACCESS_KEY,
-        )
+    def __init__(self, client=None):
+        """Wrap the shared CloudWatch Logs client unless one is passed in."""
+        self.client = client or get_logs_client()
 
     def get_log_events(self, log_group_name, log_stream_name, limit=10):
         """Fetch latest log events from CloudWatch Logs"""
@@ -21,3 +16,40 @@ class CloudWatchClient:
             return response["events"]
         except Exception as e:
             raise Exception(f"Error fetching logs from CloudWatch: {str(e)}")
+
+    def get_log_events_page(self, log_group_name, log_stream_name, next_token=None, start_time=None, end_time=None):
+        """
+        Fetch one page of a log stream, oldest first.
+
+        :return: Tuple of (events, nextForwardToken). The token is unchanged once the end of the stream is reached.
+        """
+        kwargs = {"logGroupName": log_group_name, "logStreamName": log_stream_name, "startFromHead": True}
+        if next_token:
+            kwargs["nextToken"] = next_token
+        if start_time is not None:
+            kwargs["startTime"] = start_time
+        if end_time is not None:
+            kwargs["endTime"] = end_time
+        response = self.client.get_log_events(**kwargs)
+        return response["events"], response["nextForwardToken"]
+
+    def filter_log_events_page(self, log_group_name, filter_pattern=None, log_stream_names=None,
+                               next_token=None, start_time=None, end_time=None):
+        """
+        Fetch one page of events matching a filter across a log group.
+
+        :return: Tuple of (events, nextToken or None when there are no more pages).
+        """
+        kwargs = {"logGroupName": log_group_name}
+        if filter_pattern:
+            kwargs["filterPattern"] = filter_pattern
+        if log_stream_names:
+            kwargs["logStreamNames"] = log_stream_names
+        if next_token:
+            kwargs["nextToken"] = next_token
+        if start_time is not None:
+            kwargs["startTime"] = start_time
+        if end_time is not None:
+            kwargs["endTime"] = end_time
+        response = self.client.filter_log_events(**kwargs)
+        return response["events"], response.get("nextToken")
@@ -0,0 +1,132 @@
+import json
+import os
+from typing import NamedTuple, Optional
+from core.config import Settings
+from core.exceptions import CustomAPIException
+from core.response import error_response
+
+# ``?cluster=`` value that selects every registered cluster.
+ALL_CLUSTERS = "all"
+
+
+class Cluster(NamedTuple):
+    """One provisioned Redshift cluster the API can query."""
+    name: str
+    cluster_id: str
+    region: str
+    database: str
+    db_user: str
+    # Seconds this cluster may take inside a fan-out before it is reported as timed out.
+    timeout: Optional[float] = None
+    # Endpoint for pooled direct connections; without one every query goes through the Data API.
+    host: Optional[str] = None
+    port: Optional[int] = None
+
+    def to_dict(self):
+        return self._asdict()
+
+
+class ClusterRegistry:
+    """Named clusters the endpoints can target, loaded from ``REDSHIFT_CLUSTERS``.
+
+    ``REDSHIFT_CLUSTERS`` is a JSON list (inline or a path to a JSON file) of
+    objects with ``name``, ``cluster_id``, ``region``, ``database``, ``db_user``
+    and optional ``timeout``, ``host`` and ``port``; missing fields fall back to the
+    single-cluster ``REDSHIFT_*`` / ``AWS_REGION`` settings, except ``host``, which
+    only applies to the cluster it names.  Without it, the registry holds just
+    that single cluster.  The first entry is the default target.
+    """
+
+    def __init__(self, clusters):
+        if not clusters:
+            raise ValueError("At least one cluster must be configured")
+        self._clusters = {}
+        for cluster in clusters:
+            if cluster.name in self._clusters:
+                raise ValueError(f"Duplicate cluster name: {cluster.name}")
+            self._clusters[cluster.name] = cluster
+        self.default = clusters[0]
+
+    @classmethod
+    def from_settings(cls):
+        spec = Settings.REDSHIFT_CLUSTERS
+        if not spec:
+            return cls([Cluster(
+                Settings.REDSHIFT_CLUSTER_ID or "default", Settings.REDSHIFT_CLUSTER_ID, Settings.AWS_REGION,
+                Settings.REDSHIFT_DATABASE, Settings.REDSHIFT_USER,
+                host=Settings.REDSHIFT_HOST or None, port=Settings.REDSHIFT_PORT,
+            )])
+        if not spec.lstrip().startswith("["):
+            with open(os.path.expanduser(spec)) as config_file:
+                spec = config_file.read()
+        return cls([
+            Cluster(
+                name=entry.get("name") or entry["cluster_id"],
+                cluster_id=entry["cluster_id"],
+                region=entry.get("region") or Settings.AWS_REGION,
+                database=entry.get("database") or Settings.REDSHIFT_DATABASE,
+                db_user=entry.get("db_user") or Settings.REDSHIFT_USER,
+                timeout=entry.get("timeout"),
+                host=entry.get("host"),
+                port=entry.get("port") or Settings.REDSHIFT_PORT,
+            )
+            for entry in json.loads(spec)
+        ])
+
+    def get(self, name: str = None) -> Cluster:
+        """Return the named cluster, or the default one when ``name`` is empty."""
+        if not name:
+            return self.default
+        cluster = self._clusters.get(name)
+        if cluster is None:
+            raise CustomAPIException(f"Unknown cluster: {name}", status_code=404)
+        return cluster
+
+    def select(self, spec: str = None):
+        """
+        Resolve a ``?cluster=`` value into a list of clusters.
+
+        :param spec: Empty for the default cluster, ``all`` for every cluster, or comma-separated names.
+        """
+        if not spec:
+            return [self.default]
+        if spec == ALL_CLUSTERS:
+            return list(self._clusters.values())
+        names = list(dict.fromkeys(name.strip() for name in spec.split(",") if name.strip()))
+        return [self.get(name) for name in names]
+
+    def regions(self):
+        """Distinct regions of the registered clusters."""
+        return sorted({cluster.region for cluster in self._clusters.values()})
+
+    def __iter__(self):
+        return iter(self._clusters.values())
+
+    def __len__(self):
+        return len(self._clusters)
+
+
+_cluster_registry = None
+
+def get_cluster_registry() -> ClusterRegistry:
+    """Returns the process-wide cluster registry."""
+    global _cluster_registry
+    if _cluster_registry is None:
+        _cluster_registry = ClusterRegistry.from_settings()
+    return _cluster_registry
+
+
+def resolve_clusters(spec: str = None, single: bool = False):
+    """
+    Resolve a ``?cluster=`` query parameter for a route dependency.
+
+    :param single: Reject selections of more than one cluster (for endpoints that run a statement).
+    :return: List of clusters; unknown names and disallowed selections become error responses.
+    """
+    try:
+        clusters = get_cluster_registry().select(spec)
+    except CustomAPIException as e:
+        return error_response(e.message, e.status_code)
+    if single and len(clusters) > 1:
+        return error_response("This endpoint targets a single cluster; pass one cluster name.")
+    return clusters
@@ -1,7 +1,11 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+# Deployments that inject configuration through the environment can set
+# DOTENV_ENABLED=false to skip importing python-dotenv and searching for a .env file.
+if os.getenv("DOTENV_ENABLED", "true").lower() == "true":
+    from dotenv import load_dotenv
+
+    load_dotenv()
 
 class Settings:
     AWS_ACCESS_KEY_ID: str = os.getenv("AWS_ACCESS_KEY_ID")
@@ -13,5 +17,124 @@ class Settings:
     REDSHIFT_USER: str = os.getenv("REDSHIFT_USER")
     REDSHIFT_PASSWORD: str = os.getenv("REDSHIFT_PASSWORD")
     REDSHIFT_PORT: int = int(os.getenv("REDSHIFT_PORT", 5439))  # Added port
+    REDSHIFT_HOST: str = os.getenv("REDSHIFT_HOST", "")
+
+    # Cluster registry: JSON list (or path to a JSON file) of {name, cluster_id, region, database, db_user, timeout}
+    REDSHIFT_CLUSTERS: str = os.getenv("REDSHIFT_CLUSTERS", "")
+    # ?cluster=a,b / ?cluster=all fan-out: clusters queried at once and default per-cluster timeout (seconds)
+    FANOUT_CONCURRENCY: int = int(os.getenv("FANOUT_CONCURRENCY", 16))
+    FANOUT_CLUSTER_TIMEOUT: float = float(os.getenv("FANOUT_CLUSTER_TIMEOUT", 30))
+
+    # Shared AWS client pool
+    CLOUDWATCH_REGION: str = os.getenv("CLOUDWATCH_REGION", "us-east-1")
+    AWS_MAX_POOL_CONNECTIONS: int = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", 50))
+    AWS_TCP_KEEPALIVE: bool = os.getenv("AWS_TCP_KEEPALIVE", "true").lower() == "true"
+    AWS_MAX_ATTEMPTS: int = int(os.getenv("AWS_MAX_ATTEMPTS", 5))
+    AWS_RETRY_MODE: str = os.getenv("AWS_RETRY_MODE", "adaptive")
+
+    # Client-side rate governor per AWS API operation: token bucket (requests/second) plus AIMD concurrency limit.
+    # AWS_GOVERNOR_LIMITS is a JSON object of "service.operation" to requests/second, e.g. {"logs.filter_log_events": 2};
+    # a "*" entry replaces the built-in per-operation quotas for everything not listed
+    AWS_GOVERNOR_ENABLED: bool = os.getenv("AWS_GOVERNOR_ENABLED", "true").lower() == "true"
+    AWS_GOVERNOR_DEFAULT_RATE: float = float(os.getenv("AWS_GOVERNOR_DEFAULT_RATE", 50))
+    AWS_GOVERNOR_LIMITS: str = os.getenv("AWS_GOVERNOR_LIMITS", "")
+    AWS_GOVERNOR_CONCURRENCY: int = int(os.getenv("AWS_GOVERNOR_CONCURRENCY", 16))
+    AWS_GOVERNOR_MAX_CONCURRENCY: int = int(os.getenv("AWS_GOVERNOR_MAX_CONCURRENCY", os.getenv("AWS_MAX_POOL_CONNECTIONS", 50)))
+    AWS_GOVERNOR_MAX_WAIT: float = float(os.getenv("AWS_GOVERNOR_MAX_WAIT", 10))
+    AWS_GOVERNOR_MAX_QUEUE: int = int(os.getenv("AWS_GOVERNOR_MAX_QUEUE", 1000))
+
+    # Pooled direct (psycopg2) connections for system-table lookups, used for clusters with a host; others use the Data API.
+    # Idle connections older than DB_POOL_HEALTH_CHECK_INTERVAL seconds are pinged before reuse; large scans use
+    # server-side cursors fetching DB_SERVER_CURSOR_BATCH rows at a time
+    DIRECT_CONNECTIONS_ENABLED: bool = os.getenv("DIRECT_CONNECTIONS_ENABLED", "true").lower() == "true"
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+    DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+    DB_POOL_ACQUIRE_TIMEOUT: float = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", 5))
+    DB_POOL_HEALTH_CHECK_INTERVAL: float = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", 30))
+    DB_POOL_MAX_LIFETIME: float = float(os.getenv("DB_POOL_MAX_LIFETIME", 3600))
+    DB_CONNECT_TIMEOUT: int = int(os.getenv("DB_CONNECT_TIMEOUT", 5))
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))
+    DB_SSLMODE: str = os.getenv("DB_SSLMODE", "require")
+    DB_SERVER_CURSOR_BATCH: int = int(os.getenv("DB_SERVER_CURSOR_BATCH", 10000))
+
+    # /cost endpoint cache (seconds)
+    COST_TOTAL_TTL: float = float(os.getenv("COST_TOTAL_TTL", 3600))
+    COST_TOP_QUERIES_TTL: float = float(os.getenv("COST_TOP_QUERIES_TTL", 900))
+    COST_CACHE_STALE_TTL: float = float(os.getenv("COST_CACHE_STALE_TTL", 21600))
+
+    # Per-query cost attribution for /cost/top-queries (on-demand USD per node-hour, WLM query slots)
+    COST_NODE_HOUR_PRICE: float = float(os.getenv("COST_NODE_HOUR_PRICE", 1.086))
+    COST_NODE_COUNT: int = int(os.getenv("COST_NODE_COUNT", 2))
+    COST_WLM_SLOTS: int = int(os.getenv("COST_WLM_SLOTS", 5))
+    COST_TOP_QUERIES_DAYS: int = int(os.getenv("COST_TOP_QUERIES_DAYS", 7))
+
+    # Local EstimatedCharges time series for /cost/total, /cost/history and /cost/month-over-month
+    COST_HISTORY_STORE_ENABLED: bool = os.getenv("COST_HISTORY_STORE_ENABLED", "false").lower() == "true"
+    COST_HISTORY_STORE_PATH: str = os.getenv("COST_HISTORY_STORE_PATH", "data/cost_history.sqlite3")
+    COST_HISTORY_INGEST_INTERVAL: float = float(os.getenv("COST_HISTORY_INGEST_INTERVAL", 3600))
+    COST_HISTORY_BACKFILL_MONTHS: int = int(os.getenv("COST_HISTORY_BACKFILL_MONTHS", 12))
+    COST_HISTORY_HOURLY_RETENTION_DAYS: int = int(os.getenv("COST_HISTORY_HOURLY_RETENTION_DAYS", 14))
+    COST_HISTORY_DAILY_RETENTION_DAYS: int = int(os.getenv("COST_HISTORY_DAILY_RETENTION_DAYS", 800))
+
+    # Opt-in /query/execute result cache
+    QUERY_CACHE_MAX_BYTES: int = int(os.getenv("QUERY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+    # POST /query/export: result pages fetched ahead while earlier ones are encoded, rows per Parquet row group
+    EXPORT_PREFETCH_PAGES: int = int(os.getenv("EXPORT_PREFETCH_PAGES", 2))
+    EXPORT_PARQUET_ROW_GROUP_ROWS: int = int(os.getenv("EXPORT_PARQUET_ROW_GROUP_ROWS", 100000))
+
+    # POST /query/batch
+    QUERY_BATCH_MAX_STATEMENTS: int = int(os.getenv("QUERY_BATCH_MAX_STATEMENTS", 40))
+    QUERY_BATCH_CONCURRENCY: int = int(os.getenv("QUERY_BATCH_CONCURRENCY", 10))
+
+    # Local stl_query copy for /query/history, /long-running and /statistics
+    QUERY_HISTORY_STORE_ENABLED: bool = os.getenv("QUERY_HISTORY_STORE_ENABLED", "false").lower() == "true"
+    QUERY_HISTORY_STORE_PATH: str = os.getenv("QUERY_HISTORY_STORE_PATH", "data/query_history.sqlite3")
+    QUERY_HISTORY_INGEST_INTERVAL: float = float(os.getenv("QUERY_HISTORY_INGEST_INTERVAL", 60))
+    QUERY_HISTORY_INGEST_BATCH: int = int(os.getenv("QUERY_HISTORY_INGEST_BATCH", 10000))
+    QUERY_HISTORY_BACKFILL_DAYS: int = int(os.getenv("QUERY_HISTORY_BACKFILL_DAYS", 7))
+
+    # Seconds the first CloudWatch metric request waits for others to join its GetMetricData batch
+    METRICS_BATCH_WINDOW: float = float(os.getenv("METRICS_BATCH_WINDOW", 0.02))
+
+    # /logs/stream follow mode poll interval bounds (seconds)
+    LOG_FOLLOW_POLL_MIN: float = float(os.getenv("LOG_FOLLOW_POLL_MIN", 0.5))
+    LOG_FOLLOW_POLL_MAX: float = float(os.getenv("LOG_FOLLOW_POLL_MAX", 10.0))
+
+    # POST /anomalies: seconds a Logs Insights event-rate query may stay scheduled or running before it is stopped
+    ANOMALY_LOGS_QUERY_TIMEOUT: float = float(os.getenv("ANOMALY_LOGS_QUERY_TIMEOUT", 60))
+
+    # In-process catalog index for /databases, /schemas and /tables (seconds)
+    CATALOG_TTL: float = float(os.getenv("CATALOG_TTL", 300))
+    CATALOG_STALE_TTL: float = float(os.getenv("CATALOG_STALE_TTL", 86400))
+
+    # Asynchronous query jobs (POST /query/jobs)
+    QUERY_JOBS_MAX: int = int(os.getenv("QUERY_JOBS_MAX", 10000))
+    QUERY_JOB_TTL: float = float(os.getenv("QUERY_JOB_TTL", 3600))
+
+    # GET /query/fingerprints: distinct query shapes tracked per request before folding into "other"
+    QUERY_FINGERPRINT_MAX: int = int(os.getenv("QUERY_FINGERPRINT_MAX", 50000))
+
+    # Precomputed dashboard payloads (/cost/*, /query/statistics|slow|long-running called without query parameters):
+    # refreshed every interval (+/- JITTER as a fraction), CONCURRENCY refreshes at once, paused after IDLE_TTL seconds unread
+    DASHBOARD_REFRESH_ENABLED: bool = os.getenv("DASHBOARD_REFRESH_ENABLED", "false").lower() == "true"
+    DASHBOARD_REFRESH_CONCURRENCY: int = int(os.getenv("DASHBOARD_REFRESH_CONCURRENCY", 4))
+    DASHBOARD_REFRESH_JITTER: float = float(os.getenv("DASHBOARD_REFRESH_JITTER", 0.1))
+    DASHBOARD_REFRESH_IDLE_TTL: float = float(os.getenv("DASHBOARD_REFRESH_IDLE_TTL", 600))
+    DASHBOARD_QUERY_REFRESH_INTERVAL: float = float(os.getenv("DASHBOARD_QUERY_REFRESH_INTERVAL", 30))
+    DASHBOARD_COST_REFRESH_INTERVAL: float = float(os.getenv("DASHBOARD_COST_REFRESH_INTERVAL", 300))
+
+    # Instrumentation
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+
+    # Startup: "lazy" builds AWS clients on first use, "background" builds them right after the server starts
+    STARTUP_WARMUP: str = os.getenv("STARTUP_WARMUP", "lazy").lower()
+
+    # Async statement executor
+    STATEMENT_MAX_IN_FLIGHT: int = int(os.getenv("STATEMENT_MAX_IN_FLIGHT", 500))
+    STATEMENT_POLL_INITIAL: float = float(os.getenv("STATEMENT_POLL_INITIAL", 0.1))
+    STATEMENT_POLL_MAX: float = float(os.getenv("STATEMENT_POLL_MAX", 5.0))
+    STATEMENT_TIMEOUT: float = float(os.getenv("STATEMENT_TIMEOUT", 300))
+    STATEMENT_WORKERS: int = int(os.getenv("STATEMENT_WORKERS", 16))
 
 settings = Settings()
@@ -0,0 +1,123 @@
+import heapq
+from core.query_fingerprints import OTHER_FINGERPRINT
+from core.sql import fingerprint_sql
+
+
+class CostModel:
+    """Converts query runtime and WLM slot usage into an estimated dollar cost.
+
+    A provisioned cluster is billed per node-hour whether or not it is busy, so a
+    query is charged the share of the cluster it held: its execution time times
+    the fraction of WLM slots it occupied, priced at ``node_count`` node-hours
+    per hour.
+    """
+
+    def __init__(self, node_hour_price: float, node_count: int, total_slots: int):
+        self.node_hour_price = node_hour_price
+        self.node_count = node_count
+        self.total_slots = max(total_slots, 1)
+        self._per_slot_ms = node_hour_price * node_count / self.total_slots / 3_600_000
+
+    def cost(self, execution_ms: float, slot_count: int = 1) -> float:
+        """Return the estimated dollars for a query that ran ``execution_ms`` in ``slot_count`` slots."""
+        return max(execution_ms, 0.0) * min(max(slot_count, 1), self.total_slots) * self._per_slot_ms
+
+    def to_dict(self):
+        return {
+            "node_hour_price": self.node_hour_price,
+            "node_count": self.node_count,
+            "total_slots": self.total_slots,
+        }
+
+
+class CostAttribution:
+    """Streaming per-query, per-user and per-fingerprint cost totals with bounded top-N.
+
+    Only the ``limit`` most expensive queries are kept, in a min-heap, so memory
+    does not grow with the number of rows.  User and fingerprint totals are
+    kept in full (their cardinality is small next to the row count) and ranked
+    with ``heapq.nlargest`` when the report is built; past ``max_fingerprints``
+    shapes, further queries are folded into a single ``other`` entry.
+    """
+
+    def __init__(self, model: CostModel, limit: int = 10, max_fingerprints: int = 50000):
+        self.model = model
+        self.limit = limit
+        self.max_fingerprints = max_fingerprints
+        self.queries = 0
+        self.total_cost = 0.0
+        self.total_execution_ms = 0.0
+        self._top_queries = []
+        self._users = {}
+        self._fingerprints = {}
+
+    def add(self, query_id: int, user: str, querytxt: str, execution_ms: float, slot_count: int = 1):
+        """Attribute one query's cost."""
+        execution_ms = max(float(execution_ms or 0), 0.0)
+        slot_count = int(slot_count or 1)
+        cost = self.model.cost(execution_ms, slot_count)
+        self.queries += 1
+        self.total_cost += cost
+        self.total_execution_ms += execution_ms
+
+        # The query id breaks ties so heap entries never compare the dicts.
+        entry = (cost, query_id, user, querytxt, execution_ms, slot_count)
+        if len(self._top_queries) < self.limit:
+            heapq.heappush(self._top_queries, entry)
+        elif self.limit and entry > self._top_queries[0]:
+            heapq.heapreplace(self._top_queries, entry)
+
+        totals = self._users.get(user)
+        if totals is None:
+            totals = self._users[user] = [0.0, 0, 0.0]
+        totals[0] += cost
+        totals[1] += 1
+        totals[2] += execution_ms
+
+        fingerprint, normalized = fingerprint_sql(querytxt or "")
+        totals = self._fingerprints.get(fingerprint)
+        if totals is None:
+            if len(self._fingerprints) >= self.max_fingerprints:
+                fingerprint, normalized = OTHER_FINGERPRINT, None
+                totals = self._fingerprints.get(fingerprint)
+            if totals is None:
+                totals = self._fingerprints[fingerprint] = [0.0, 0, 0.0, normalized]
+        totals[0] += cost
+        totals[1] += 1
+        totals[2] += execution_ms
+
+    def report(self):
+        """Return totals and the ``limit`` most expensive queries, users and fingerprints."""
+        top_users = heapq.nlargest(self.limit, self._users.items(), key=lambda item: item[1][0])
+        top_fingerprints = heapq.nlargest(self.limit, self._fingerprints.items(), key=lambda item: item[1][0])
+        return {
+            "pricing": self.model.to_dict(),
+            "queries": self.queries,
+            "total_cost": round(self.total_cost, 4),
+            "total_execution_ms": round(self.total_execution_ms, 2),
+            "top_queries": [
+                {
+                    "query_id": query_id,
+                    "user": user,
+                    "query_text": querytxt,
+                    "execution_time_ms": round(execution_ms, 2),
+                    "slot_count": slot_count,
+                    "cost": round(cost, 4),
+                }
+                for cost, query_id, user, querytxt, execution_ms, slot_count in sorted(self._top_queries, reverse=True)
+            ],
+            "top_users": [
+                {"user": user, "queries": count, "execution_time_ms": round(execution_ms, 2), "cost": round(cost, 4)}
+                for user, (cost, count, execution_ms) in top_users
+            ],
+            "top_fingerprints": [
+                {
+                    "fingerprint": fingerprint,
+                    "query": normalized,
+                    "queries": count,
+                    "execution_time_ms": round(execution_ms, 2),
+                    "cost": round(cost, 4),
+                }
+                for fingerprint, (cost, count, execution_ms, normalized) in top_fingerprints
+            ],
+        }
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from core.config import Settings
+from core.instrumentation import DASHBOARD_REFRESH_LAG
+
+# Seconds between scheduler passes over the jobs.
+_TICK = 0.5
+
+
+class DashboardJob:
+    """One precomputed dashboard payload and its refresh bookkeeping."""
+
+    def __init__(self, name: str, compute, interval: float, blocking: bool = False):
+        self.name = name
+        self.compute = compute
+        self.interval = interval
+        self.blocking = blocking
+        self.body = None
+        self.stored_at = None
+        # Monotonic time the next refresh is due, or None while nobody is reading the payload.
+        self.due = None
+        self.last_read = None
+        self.running = False
+        self.refreshes = 0
+        self.skipped = 0
+        self.failures = 0
+        self.hits = 0
+        self.misses = 0
+        self.last_error = None
+        self.last_duration_ms = None
+        self.last_lag = None
+
+
+class DashboardRefresher:
+    """Keeps dashboard responses serialised and ready to serve, refreshed in the background.
+
+    Each job is one endpoint called without query parameters.  A request answered
+    live stores its serialised body; later requests get those bytes with no
+    upstream calls while they are younger than twice the job's interval.  A
+    background loop refreshes every job whose interval (with ``jitter``) has
+    elapsed, at most ``concurrency`` at a time, but skips jobs nobody has read for
+    ``idle_ttl`` seconds until the next read.  ``last_lag`` is how late a refresh
+    started after it was due, e.g. while waiting for a concurrency slot.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = Settings.DASHBOARD_REFRESH_ENABLED,
+        concurrency: int = Settings.DASHBOARD_REFRESH_CONCURRENCY,
+        jitter: float = Settings.DASHBOARD_REFRESH_JITTER,
+        idle_ttl: float = Settings.DASHBOARD_REFRESH_IDLE_TTL,
+    ):
+        self.enabled = enabled
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.idle_ttl = idle_ttl
+        self._jobs = {}
+        self._task = None
+        self._refreshes = set()
+        # Cost handlers run in the threadpool, so lookups and stores can race the refresh loop.
+        self._lock = threading.Lock()
+
+    def register(self, name: str, compute, interval: float, blocking: bool = False):
+        """
+        Add a job.
+
+        :param compute: Callable returning the endpoint's payload; a coroutine unless ``blocking``.
+        :param blocking: Run ``compute`` in the default executor (for the synchronous CloudWatch handlers).
+        """
+        self._jobs[name] = DashboardJob(name, compute, interval, blocking)
+
+    def _next_due(self, job: DashboardJob, since: float) -> float:
+        return since + job.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _store(self, job: DashboardJob, payload) -> bytes:
+        body = json.dumps(jsonable_encoder(payload)).encode()
+        with self._lock:
+            job.body = body
+            job.stored_at = time.monotonic()
+            job.due = self._next_due(job, job.stored_at)
+        return body
+
+    @staticmethod
+    def _response(body: bytes, age: float, cache_status: str) -> Response:
+        headers = {"X-Cache": cache_status, "Age": str(int(age))}
+        return Response(body, media_type="application/json", headers=headers)
+
+    def lookup(self, name: str, request):
+        """
+        Return the stored response for a request without query parameters, or None to compute it live.
+
+        Every lookup counts as a read, so a job idled by ``idle_ttl`` is refreshed again.
+        """
+        job = self._jobs.get(name)
+        if not self.enabled or job is None or request.query_params:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            job.last_read = now
+            if job.body is None or now - job.stored_at > 2 * job.interval:
+                job.misses += 1
+                return None
+            if job.due is None:
+                job.due = self._next_due(job, job.stored_at)
+            job.hits += 1
+            body, age = job.body, now - job.stored_at
+        return self._response(body, age, "HIT")
+
+    def store(self, name: str, request, payload):
+        """Store a live payload computed after a ``lookup`` miss and return it as a response."""
+        job = self._jobs.get(name)
+        if not self.enabled or job is None or request.query_params:
+            return payload
+        return self._response(self._store(job, payload), 0, "MISS")
+
+    def serve(self, name: str, request, compute):
+        """``lookup``, falling back to calling ``compute()`` and storing its payload."""
+        response = self.lookup(name, request)
+        if response is not None:
+            return response
+        return self.store(name, request, compute())
+
+    async def serve_async(self, name: str, request, compute):
+        """``serve`` for coroutine ``compute`` functions."""
+        response = self.lookup(name, request)
+        if response is not None:
+            return response
+        return self.store(name, request, await compute())
+
+    async def _refresh(self, job: DashboardJob, semaphore: asyncio.Semaphore):
+        try:
+            async with semaphore:
+                job.last_lag = max(0.0, time.monotonic() - job.due)
+                DASHBOARD_REFRESH_LAG.set(job.last_lag, job=job.name)
+                started = time.perf_counter()
+                try:
+                    if job.blocking:
+                        payload = await asyncio.get_running_loop().run_in_executor(None, job.compute)
+                    else:
+                        payload = await job.compute()
+                    self._store(job, payload)
+                    job.refreshes += 1
+                    job.last_error = None
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Keep serving the previous payload until it is too old; retry after another interval.
+                    detail = getattr(e, "detail", None)
+                    job.failures += 1
+                    job.last_error = detail["message"] if isinstance(detail, dict) else str(detail or e)
+                    with self._lock:
+                        job.due = self._next_due(job, time.monotonic())
+                job.last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        finally:
+            job.running = False
+
+    async def run(self):
+        """Start due refreshes forever, checking every ``_TICK`` seconds."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        while True:
+            now = time.monotonic()
+            for job in self._jobs.values():
+                if job.due is None or job.running or job.due > now:
+                    continue
+                if job.last_read is None or now - job.last_read > self.idle_ttl:
+                    with self._lock:
+                        job.skipped += 1
+                        job.due = None
+                    continue
+                job.running = True
+                task = asyncio.get_running_loop().create_task(self._refresh(job, semaphore))
+                self._refreshes.add(task)
+                task.add_done_callback(self._refreshes.discard)
+            await asyncio.sleep(_TICK)
+
+    def start(self):
+        """Start the background refresh loop on the running event loop."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.get_event_loop().create_task(self.run())
+
+    async def stop(self):
+        """Cancel the refresh loop and any refreshes in flight."""
+        tasks = [self._task, *self._refreshes] if self._task is not None else list(self._refreshes)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self):
+        now = time.monotonic()
+        return {
+            "enabled": self.enabled,
+            "running": sum(job.running for job in self._jobs.values()),
+            "jobs": {
+                job.name: {
+                    "interval": job.interval,
+                    "age_seconds": round(now - job.stored_at, 1) if job.stored_at is not None else None,
+                    "due_in_seconds": round(job.due - now, 1) if job.due is not None else None,
+                    "idle": job.last_read is None or now - job.last_read > self.idle_ttl,
+                    "hits": job.hits,
+                    "misses": job.misses,
+                    "refreshes": job.refreshes,
+                    "skipped": job.skipped,
+                    "failures": job.failures,
+                    "last_lag_seconds": round(job.last_lag, 3) if job.last_lag is not None else None,
+                    "last_duration_ms": job.last_duration_ms,
+                    "last_error": job.last_error,
+                }
+                for job in self._jobs.values()
+            },
+        }
+
+
+dashboards = DashboardRefresher()
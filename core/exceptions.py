@@ -10,6 +10,12 @@ class QueryExecutionError(Exception):
         self.message = message
         super().__init__(self.message)
 
+class QueryTimeoutError(Exception):
+    """Exception raised when a query does not finish before its timeout."""
+    def __init__(self, message="Query timed out on Redshift"):
+        self.message = message
+        super().__init__(self.message)
+
 class CustomAPIException(Exception):
     """Custom exception class to handle API errors gracefully."""
     
@@ -25,3 +31,10 @@ class CustomAPIException(Exception):
     def to_dict(self):
         """Convert exception details into a dictionary for JSON responses."""
         return {"error": self.message, "status_code": self.status_code}
+
+
+class ThrottledError(CustomAPIException):
+    """Raised when an AWS API is throttling and a call could not be made within its deadline."""
+
+    def __init__(self, message: str, status_code: int = 429):
+        super().__init__(message, status_code)
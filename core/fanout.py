@@ -0,0 +1,95 @@
+import asyncio
+import heapq
+import time
+from core.config import Settings
+from core.exceptions import CustomAPIException
+
+
+async def fan_out(targets: dict, call, concurrency: int = None, timeout: float = None, timeouts: dict = None):
+    """
+    Run ``call(target)`` for every target concurrently and collect partial results.
+
+    A target that fails or exceeds its timeout is reported under ``errors`` instead
+    of failing the whole request, so a fleet-wide view costs about as long as the
+    slowest healthy cluster rather than the sum of all of them.
+
+    :param targets: Mapping of name (e.g. cluster name) to the object passed to ``call``.
+    :param call: Coroutine function taking one target.
+    :param concurrency: Maximum targets in flight (default ``FANOUT_CONCURRENCY``).
+    :param timeout: Seconds each target may take (default ``FANOUT_CLUSTER_TIMEOUT``).
+    :param timeouts: (Optional) Per-name timeouts overriding ``timeout``.
+    :return: Dict with ``results`` and ``errors`` keyed by name, and per-name ``durations_ms``.
+    :raises CustomAPIException: 502 when no target answered.
+    """
+    semaphore = asyncio.Semaphore(concurrency or Settings.FANOUT_CONCURRENCY)
+    timeout = timeout or Settings.FANOUT_CLUSTER_TIMEOUT
+    results, errors, durations = {}, {}, {}
+
+    async def run_one(name, target):
+        limit = (timeouts or {}).get(name) or timeout
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                results[name] = await asyncio.wait_for(call(target), limit)
+            except asyncio.TimeoutError:
+                errors[name] = f"Timed out after {limit}s"
+            except CustomAPIException as e:
+                errors[name] = e.message
+            except Exception as e:
+                errors[name] = str(e)
+            finally:
+                durations[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    await asyncio.gather(*(run_one(name, target) for name, target in targets.items()))
+    if targets and not results:
+        details = "; ".join(f"{name}: {errors[name]}" for name in targets)
+        raise CustomAPIException(f"No cluster answered ({details})", status_code=502)
+    # Keep the caller's ordering rather than completion order.
+    return {
+        "results": {name: results[name] for name in targets if name in results},
+        "errors": {name: errors[name] for name in targets if name in errors},
+        "durations_ms": {name: durations[name] for name in targets},
+    }
+
+
+def cluster_timeouts(repositories: dict):
+    """Per-cluster timeouts from the registry for repositories keyed by cluster name."""
+    return {name: repository.cluster.timeout for name, repository in repositories.items()}
+
+
+def fleet_summary(outcome: dict):
+    """Per-target status for a ``fan_out`` outcome: whether it answered, how long it took and any error."""
+    return {
+        name: {"ok": name in outcome["results"], "duration_ms": duration, "error": outcome["errors"].get(name)}
+        for name, duration in outcome["durations_ms"].items()
+    }
+
+
+def merge_top(results: dict, items, key, limit: int):
+    """
+    Merge per-target lists into the ``limit`` largest items, each tagged with its target's name.
+
+    :param results: ``fan_out`` results keyed by name.
+    :param items: Function returning the list to merge from one result.
+    :param key: Sort key applied to each item.
+    """
+    tagged = ({"cluster": name, **item} for name, result in results.items() for item in items(result))
+    return heapq.nlargest(limit, tagged, key=key)
+
+
+def merge_totals(results: dict, items, group: str, sums, key, limit: int):
+    """
+    Add up per-target rows that share ``group`` (e.g. the same user on several clusters) and keep the top ``limit``.
+
+    :param sums: Fields to add up; other fields are taken from the first row seen.
+    """
+    merged = {}
+    for result in results.values():
+        for item in items(result):
+            row = merged.get(item[group])
+            if row is None:
+                merged[item[group]] = dict(item)
+            else:
+                for field in sums:
+                    row[field] += item[field]
+    return heapq.nlargest(limit, merged.values(), key=key)
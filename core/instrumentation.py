@@ -0,0 +1,241 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Prometheus' default latency buckets, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(10))  # 256 B .. 64 MiB
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+_registry = []
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter rendered in the Prometheus text format."""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram rendered in the Prometheus text format."""
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Gauge:
+    """Point-in-time value rendered in the Prometheus text format."""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def set(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+def render() -> str:
+    """Render every registered metric in the Prometheus text exposition format (0.0.4)."""
+    return "\n".join(line for metric in _registry for line in metric.collect()) + "\n"
+
+
+REQUEST_DURATION = Histogram(
+    "redshift_api_request_duration_seconds", "HTTP request latency until the last body byte.",
+    ("method", "route", "status"),
+)
+RESPONSE_SIZE = Histogram(
+    "redshift_api_response_size_bytes", "HTTP response body size.", ("method", "route"), SIZE_BUCKETS,
+)
+REQUEST_AWS_CALLS = Histogram(
+    "redshift_api_request_aws_calls", "AWS API calls made while serving one request.", ("method", "route"), COUNT_BUCKETS,
+)
+PHASE_DURATION = Histogram(
+    "redshift_api_phase_duration_seconds",
+    "Time spent in each request phase (client_init, submit, poll, fetch, decode, serialize, warm_up).",
+    ("phase",),
+)
+AWS_CALL_DURATION = Histogram(
+    "redshift_api_aws_call_duration_seconds", "AWS API call latency including retries.", ("service", "operation"),
+)
+AWS_CALL_ERRORS = Counter(
+    "redshift_api_aws_call_errors_total", "AWS API calls that raised after retries.", ("service", "operation"),
+)
+AWS_THROTTLES = Counter(
+    "redshift_api_aws_throttles_total",
+    "Throttling responses from AWS, including attempts botocore retried.", ("operation",),
+)
+STATEMENTS_COALESCED = Counter(
+    "redshift_api_statements_coalesced_total",
+    "Redshift statements not started because an identical one was already in flight.",
+)
+
+DASHBOARD_REFRESH_LAG = Gauge(
+    "redshift_api_dashboard_refresh_lag_seconds",
+    "Seconds the latest background refresh of each dashboard payload started after it was due.", ("job",),
+)
+
+STARTUP_DURATION = Gauge(
+    "redshift_api_startup_seconds",
+    "Seconds from the start of importing main to each startup milestone (imported, first_request).",
+    ("milestone",),
+)
+
+# Set by main.py before anything else is imported; startup milestones are measured from here.
+process_started = None
+startup_milestones = {}
+
+
+def record_startup(milestone: str):
+    """Record the seconds since ``process_started`` for a startup milestone and return them."""
+    if process_started is None:
+        return None
+    seconds = time.perf_counter() - process_started
+    STARTUP_DURATION.set(seconds, milestone=milestone)
+    startup_milestones[milestone] = seconds
+    return seconds
+
+
+class RequestTimings:
+    """Per-request phase durations and AWS call count, shared with worker threads via the context."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.aws_calls = 0
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def count_aws_call(self):
+        with self._lock:
+            self.aws_calls += 1
+
+    def server_timing(self) -> str:
+        """Format as a ``Server-Timing`` header value. Phases of concurrent statements are summed."""
+        with self._lock:
+            entries = [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in self.phases.items()]
+            entries.append(f'aws;desc="{self.aws_calls} calls"')
+        entries.append(f"app;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+def start_request() -> RequestTimings:
+    """Begin collecting timings for the request running in the current context."""
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def current_request():
+    """Return the current request's timings, or None outside a request."""
+    return _current.get()
+
+
+@contextmanager
+def phase(name: str):
+    """Time a block as ``name``, recording it on the phase histogram and the current request."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        PHASE_DURATION.observe(elapsed, phase=name)
+        timings = _current.get()
+        if timings is not None:
+            timings.add(name, elapsed)
+
+
+def record_aws_call(service: str, operation: str, seconds: float, failed: bool = False):
+    """Record one AWS API call against the global histograms and the current request."""
+    AWS_CALL_DURATION.observe(seconds, service=service, operation=operation)
+    if failed:
+        AWS_CALL_ERRORS.inc(service=service, operation=operation)
+    timings = _current.get()
+    if timings is not None:
+        timings.count_aws_call()
@@ -0,0 +1,54 @@
+import importlib
+import threading
+
+_deferred = []
+
+
+class LazyModule:
+    """Stands in for a module until one of its attributes is first used.
+
+    The import goes through ``importlib.import_module``, so threads racing on
+    first use wait on the interpreter's import lock instead of seeing a
+    half-initialised module.  The module's namespace is then copied onto the
+    proxy, so later attribute lookups cost the same as on the module itself.
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_lazy_name"] = name
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self):
+        with self._lazy_lock:
+            module = importlib.import_module(self._lazy_name)
+            self.__dict__.update(module.__dict__)
+            return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._lazy_name!r}>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Return a stand-in for module ``name`` that imports it on first attribute access.
+
+    Heavy SDKs (boto3, botocore, psycopg2, numpy) add hundreds of milliseconds to
+    ``import main``; importing them through here moves that cost to the first
+    request that needs them, or to the background warm-up.  A missing optional
+    package only raises ``ImportError`` when it is actually used.
+    """
+    module = LazyModule(name)
+    _deferred.append(module)
+    return module
+
+
+def load_deferred():
+    """Import every module deferred by ``lazy_import`` now, e.g. from a background warm-up."""
+    for module in _deferred:
+        try:
+            module._load()
+        except ImportError:
+            # Optional dependencies (e.g. psycopg2) may not be installed.
+            pass
@@ -0,0 +1,158 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional, Tuple
+from core.cache import Flight
+from core.config import Settings
+
+MAX_QUERIES_PER_CALL = 500
+
+
+class MetricQuery(NamedTuple):
+    """One CloudWatch series; equal queries are fetched once per batch."""
+    namespace: str
+    metric_name: str
+    dimensions: Tuple[Tuple[str, str], ...]
+    stat: str
+    period: int
+    unit: Optional[str] = None
+
+    def to_metric_stat(self):
+        metric_stat = {
+            "Metric": {
+                "Namespace": self.namespace,
+                "MetricName": self.metric_name,
+                "Dimensions": [{"Name": name, "Value": value} for name, value in self.dimensions],
+            },
+            "Period": self.period,
+            "Stat": self.stat,
+        }
+        if self.unit:
+            metric_stat["Unit"] = self.unit
+        return metric_stat
+
+
+def redshift_query_runtime(cluster_id: str) -> MetricQuery:
+    """Hourly maximum ``QueryRuntime`` for a cluster, shared by the cost and slow-query endpoints."""
+    return MetricQuery("AWS/Redshift", "QueryRuntime", (("ClusterIdentifier", cluster_id),), "Maximum", 3600, "Seconds")
+
+
+class _Batch:
+    def __init__(self):
+        self.flights = {}
+
+
+def _align(value: datetime, seconds: int = 60) -> datetime:
+    """Floor a timestamp to a whole minute so requests a moment apart share a batch."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return datetime.fromtimestamp(int(value.timestamp()) // seconds * seconds, tz=timezone.utc)
+
+
+class MetricsFetcher:
+    """Collects metric requests from concurrent callers into batched ``GetMetricData`` calls.
+
+    The first caller for a time range waits ``window`` seconds for others to
+    join, then fetches every distinct series in the batch with up to 500
+    queries per call, following ``NextToken``.  Identical series requested by
+    several callers are fetched once and the datapoints fanned back out.
+    """
+
+    def __init__(self, client, window: float = Settings.METRICS_BATCH_WINDOW):
+        self.client = client
+        self.window = window
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.counters = {"requested": 0, "deduplicated": 0, "series_fetched": 0, "api_calls": 0}
+
+    def fetch(self, queries, start_time: datetime, end_time: datetime):
+        """
+        Fetch datapoints for several series over one time range.
+
+        :param queries: Iterable of ``MetricQuery``.
+        :param start_time: Range start (floored to the minute).
+        :param end_time: Range end (floored to the minute).
+        :return: Dict mapping each query to a list of ``(timestamp, value)`` pairs in ascending time order.
+        """
+        queries = list(queries)
+        if not queries:
+            return {}
+        key = (_align(start_time), _align(end_time))
+        with self._lock:
+            batch = self._pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._pending[key] = _Batch()
+            flights = []
+            for query in queries:
+                self.counters["requested"] += 1
+                flight = batch.flights.get(query)
+                if flight is None:
+                    flight = batch.flights[query] = Flight()
+                else:
+                    self.counters["deduplicated"] += 1
+                flights.append(flight)
+
+        if leader:
+            time.sleep(self.window)
+            with self._lock:
+                del self._pending[key]
+            self._execute(batch, *key)
+
+        results = {}
+        for query, flight in zip(queries, flights):
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            results[query] = flight.value
+        return results
+
+    def fetch_one(self, query: MetricQuery, start_time: datetime, end_time: datetime):
+        """Fetch datapoints for a single series; see ``fetch``."""
+        return self.fetch([query], start_time, end_time)[query]
+
+    def _execute(self, batch: _Batch, start_time: datetime, end_time: datetime):
+        items = list(batch.flights.items())
+        for offset in range(0, len(items), MAX_QUERIES_PER_CALL):
+            chunk = items[offset:offset + MAX_QUERIES_PER_CALL]
+            try:
+                points = self._get_metric_data([query for query, _ in chunk], start_time, end_time)
+                for index, (_, flight) in enumerate(chunk):
+                    flight.value = points[index]
+            except Exception as e:
+                for _, flight in chunk:
+                    flight.error = e
+            finally:
+                for _, flight in chunk:
+                    flight.event.set()
+
+    def _get_metric_data(self, queries, start_time: datetime, end_time: datetime):
+        kwargs = {
+            "MetricDataQueries": [
+                {"Id": f"m{index}", "MetricStat": query.to_metric_stat(), "ReturnData": True}
+                for index, query in enumerate(queries)
+            ],
+            "StartTime": start_time,
+            "EndTime": end_time,
+            "ScanBy": "TimestampAscending",
+        }
+        points = [[] for _ in queries]
+        while True:
+            response = self.client.get_metric_data(**kwargs)
+            with self._lock:
+                self.counters["api_calls"] += 1
+            for result in response["MetricDataResults"]:
+                points[int(result["Id"][1:])].extend(zip(result["Timestamps"], result["Values"]))
+            next_token = response.get("NextToken")
+            if not next_token:
+                break
+            kwargs["NextToken"] = next_token
+
+        with self._lock:
+            self.counters["series_fetched"] += len(queries)
+        return points
+
+    def stats(self):
+        """Return request, deduplication and API call counters."""
+        with self._lock:
+            return dict(self.counters)
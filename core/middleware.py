@@ -1,5 +1,8 @@
+import time
 from fastapi.responses import JSONResponse
 from fastapi import Request
+from core import instrumentation
+from core.config import Settings
 from core.exceptions import CustomAPIException
 
 async def custom_exception_handler(request: Request, exc: CustomAPIException):
@@ -7,3 +10,52 @@ async def custom_exception_handler(request: Request, exc: CustomAPIException):
         status_code=exc.status_code,
         content=exc.to_dict()
     )
+
+
+class InstrumentationMiddleware:
+    """Records latency, response size and AWS call histograms for every HTTP request.
+
+    Phase timings collected while the request runs are added as a ``Server-Timing``
+    header when ``SERVER_TIMING_ENABLED`` is set. For streamed responses the header
+    only covers the work done before the first byte.
+    """
+
+    def __init__(self, app, server_timing: bool = Settings.SERVER_TIMING_ENABLED):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = instrumentation.start_request()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"server-timing", timings.server_timing().encode("latin-1")),
+                    ]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template rather than raw path to keep cardinality bounded.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            instrumentation.REQUEST_DURATION.observe(
+                time.perf_counter() - timings.started, method=method, route=route, status=str(status)
+            )
+            instrumentation.RESPONSE_SIZE.observe(size, method=method, route=route)
+            instrumentation.REQUEST_AWS_CALLS.observe(timings.aws_calls, method=method, route=route)
+            if "first_request" not in instrumentation.startup_milestones:
+                instrumentation.record_startup("first_request")
@@ -0,0 +1,82 @@
+import math
+
+
+class QuantileSketch:
+    """Streaming quantile estimate with bounded relative error (DDSketch).
+
+    Values are counted in logarithmically sized buckets, so any quantile is
+    returned within ``relative_accuracy`` of the true value using memory that
+    depends only on the value range, not on how many values were added.  When
+    more than ``max_buckets`` are in use the lowest buckets are merged, which
+    only affects accuracy for the smallest values.  Sketches can be merged.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048, min_value: float = 1e-3):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.min_value = min_value
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        """Add one non-negative value; values below ``min_value`` are counted as zero."""
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value < self.min_value:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        buckets = self.buckets
+        buckets[key] = buckets.get(key, 0) + 1
+        if len(buckets) > self.max_buckets:
+            self._collapse()
+
+    def merge(self, other: "QuantileSketch"):
+        """Fold another sketch with the same accuracy into this one."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        keys = sorted(self.buckets)
+        excess = keys[:len(keys) - self.max_buckets + 1]
+        target = keys[len(excess)]
+        self.buckets[target] += sum(self.buckets.pop(key) for key in excess)
+
+    def quantile(self, q: float):
+        """Return the estimated ``q``-quantile (0 <= q <= 1), or None when empty."""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Midpoint of the bucket (gamma^(k-1), gamma^k], clamped to the observed range.
+                estimate = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else None
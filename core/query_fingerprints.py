@@ -0,0 +1,95 @@
+from core.quantile_sketch import QuantileSketch
+from core.sql import fingerprint_sql
+
+# Sort keys accepted by FingerprintAggregator.top().
+ORDER_BY = ("total_ms", "count", "p95_ms", "p50_ms", "max_ms")
+
+# Fingerprint used for executions once ``max_fingerprints`` distinct shapes are tracked.
+OTHER_FINGERPRINT = "other"
+
+
+class FingerprintAggregator:
+    """Per-fingerprint execution count, total runtime and runtime quantiles over a row stream.
+
+    Memory grows with the number of distinct query shapes, not with the number of
+    rows: each shape keeps one ``QuantileSketch``.  Past ``max_fingerprints``
+    shapes, further executions are folded into a single ``other`` entry.
+    """
+
+    def __init__(self, max_fingerprints: int = 50000, relative_accuracy: float = 0.01):
+        self.max_fingerprints = max_fingerprints
+        self.relative_accuracy = relative_accuracy
+        self.rows = 0
+        self._sketches = {}
+        self._samples = {}
+
+    def add(self, querytxt: str, execution_ms: float, fingerprint: str = None):
+        """
+        Count one execution.
+
+        :param querytxt: The statement text (only fingerprinted when ``fingerprint`` is not given).
+        :param execution_ms: Runtime in milliseconds.
+        :param fingerprint: Precomputed fingerprint id, e.g. from the history store.
+        """
+        if fingerprint is None:
+            fingerprint = fingerprint_sql(querytxt or "")[0]
+        sketch = self._sketches.get(fingerprint)
+        if sketch is None:
+            if len(self._sketches) >= self.max_fingerprints:
+                fingerprint = OTHER_FINGERPRINT
+                sketch = self._sketches.get(fingerprint)
+            if sketch is None:
+                sketch = self._sketches[fingerprint] = QuantileSketch(self.relative_accuracy)
+                self._samples[fingerprint] = querytxt
+        sketch.add(max(float(execution_ms or 0), 0.0))
+        self.rows += 1
+
+    def top(self, limit: int = 20, order_by: str = "total_ms", texts: dict = None):
+        """
+        Return the ``limit`` heaviest fingerprints.
+
+        :param order_by: One of ``ORDER_BY``.
+        :param texts: (Optional) Mapping of fingerprint id to ``(normalised text, sample query)``, e.g. from
+            the history store; computed from the sample seen by ``add`` otherwise.
+        :return: List of dicts with count, total, mean, p50, p95 and max runtime in milliseconds.
+        """
+        if order_by not in ORDER_BY:
+            raise ValueError(f"order_by must be one of {', '.join(ORDER_BY)}")
+
+        key = {
+            "total_ms": lambda sketch: sketch.sum,
+            "count": lambda sketch: sketch.count,
+            "p95_ms": lambda sketch: sketch.quantile(0.95),
+            "p50_ms": lambda sketch: sketch.quantile(0.5),
+            "max_ms": lambda sketch: sketch.max,
+        }[order_by]
+        ranked = sorted(self._sketches.items(), key=lambda item: key(item[1]), reverse=True)[:limit]
+
+        results = []
+        for fingerprint, sketch in ranked:
+            sample = self._samples[fingerprint]
+            if fingerprint == OTHER_FINGERPRINT:
+                text = None
+            elif texts and fingerprint in texts:
+                text, sample = texts[fingerprint][0], sample or texts[fingerprint][1]
+            else:
+                text = fingerprint_sql(sample or "")[1]
+            results.append({
+                "fingerprint": fingerprint,
+                "query": text,
+                "sample_query": sample,
+                "count": sketch.count,
+                "total_ms": round(sketch.sum, 2),
+                "mean_ms": round(sketch.mean, 2),
+                "p50_ms": round(sketch.quantile(0.5), 2),
+                "p95_ms": round(sketch.quantile(0.95), 2),
+                "max_ms": round(sketch.max, 2),
+            })
+        return results
+
+    def fingerprints(self):
+        """Return the tracked fingerprint ids."""
+        return [fingerprint for fingerprint in self._sketches if fingerprint != OTHER_FINGERPRINT]
+
+    def __len__(self):
+        return len(self._sketches)
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from core.statement_executor import TERMINAL_STATUSES
+
+
+class QueryJob:
+    """State of one asynchronously submitted statement; the job id is the Data API statement id."""
+
+    def __init__(self, job_id: str, sql: str = None, submitted_at: float = None, cluster: str = None):
+        self.job_id = job_id
+        self.cluster = cluster
+        self.sql = sql
+        self.submitted_at = submitted_at or time.time()
+        self.status = "SUBMITTED"
+        self.updated_at = self.submitted_at
+        self.finished_at = None
+        self.duration_ms = None
+        self.result_rows = None
+        self.has_result_set = None
+        self.error = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def update(self, description: dict):
+        """Apply a ``describe_statement`` response."""
+        self.status = description["Status"]
+        self.updated_at = time.time()
+        self.sql = self.sql or description.get("QueryString")
+        if description.get("Duration", -1) >= 0:
+            self.duration_ms = round(description["Duration"] / 1e6, 2)
+        if description.get("ResultRows", -1) >= 0:
+            self.result_rows = description["ResultRows"]
+        self.has_result_set = description.get("HasResultSet")
+        self.error = description.get("Error")
+        if self.done and self.finished_at is None:
+            self.finished_at = self.updated_at
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "cluster": self.cluster,
+            "status": self.status,
+            "done": self.done,
+            "sql": self.sql,
+            "submitted_at": self.submitted_at,
+            "updated_at": self.updated_at,
+            "finished_at": self.finished_at,
+            "duration_ms": self.duration_ms,
+            "result_rows": self.result_rows,
+            "has_result_set": self.has_result_set,
+            "error": self.error,
+        }
+
+
+class QueryJobRegistry:
+    """In-memory job table with least-recently-used eviction.
+
+    Finished jobs are dropped ``ttl`` seconds after they finish, and the oldest
+    jobs go first once ``max_jobs`` is exceeded. Evicting a job only forgets the
+    local copy: the statement stays in the Data API, so it can be re-attached by id.
+    """
+
+    def __init__(self, max_jobs: int, ttl: float):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+        self.counters = {"submitted": 0, "reattached": 0, "evicted": 0}
+
+    def add(self, job: QueryJob, reattached: bool = False):
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._jobs.move_to_end(job.job_id)
+            self.counters["reattached" if reattached else "submitted"] += 1
+            self._evict()
+        return job
+
+    def get(self, job_id: str):
+        """Return the tracked job, or None when it is unknown or evicted."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs.move_to_end(job_id)
+            self._evict()
+            return job
+
+    def _evict(self):
+        now = time.time()
+        # The TTL sweep walks every job, so run it at most once a second.
+        if now >= self._next_sweep:
+            self._next_sweep = now + 1.0
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished_at is not None and now - job.finished_at > self.ttl
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+            self.counters["evicted"] += len(expired)
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+            self.counters["evicted"] += 1
+
+    def stats(self):
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if not job.done)
+            return {"jobs": len(self._jobs), "running": running, **self.counters}
+
@@ -0,0 +1,406 @@
+import asyncio
+import collections
+import json
+import math
+import threading
+import time
+from core.config import Settings
+from core.exceptions import ThrottledError
+from core.instrumentation import AWS_THROTTLES
+
+# Error codes AWS uses for rate and concurrency limiting (as botocore's retry handlers treat them).
+THROTTLING_ERROR_CODES = frozenset({
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "LimitExceededException",
+    "SlowDown",
+    "PriorRequestNotComplete",
+})
+
+# Requests per second allowed per operation before any throttling is seen, roughly the
+# default per-account AWS quotas; other operations use AWS_GOVERNOR_DEFAULT_RATE and
+# AWS_GOVERNOR_LIMITS overrides both.
+DEFAULT_RATES = {
+    "redshift-data.execute_statement": 30,
+    "redshift-data.batch_execute_statement": 20,
+    "redshift-data.describe_statement": 100,
+    "redshift-data.get_statement_result": 20,
+    "cloudwatch.get_metric_data": 50,
+    "cloudwatch.list_metrics": 25,
+    "logs.get_log_events": 25,
+    "logs.filter_log_events": 5,
+    "logs.start_query": 5,
+}
+
+# Longest a waiter sleeps before re-checking, in case its wake-up went to a waiter that gave up.
+_MAX_SLEEP = 0.1
+
+
+def error_code(error: Exception):
+    """The AWS error code carried by a botocore ``ClientError`` (or a stand-in with a ``response``), if any."""
+    response = getattr(error, "response", None)
+    return (response or {}).get("Error", {}).get("Code")
+
+
+def is_throttling_error(error: Exception) -> bool:
+    return error_code(error) in THROTTLING_ERROR_CODES
+
+
+class RateGovernor:
+    """Client-side limiter for one AWS API operation: a token bucket plus an AIMD concurrency limit.
+
+    A call needs a token (refilled at ``rate`` per second, up to one second of burst)
+    and a concurrency slot.  Every throttling response multiplies both the rate and
+    the concurrency limit by ``decrease`` (at most once per ``cooldown`` seconds, so a
+    burst of throttles counts once); every success adds back ``1 / rate`` requests per
+    second and, while all slots are busy, ``1 / limit`` slots, so both climb by about
+    one unit per round of successful calls until they reach their ceilings.
+
+    Callers that cannot start immediately queue for at most ``max_wait`` seconds
+    (``max_queue`` at a time) and then get a ``ThrottledError`` (HTTP 429) rather than
+    piling more failed work onto AWS.  Thread-safe; ``acquire`` blocks a thread,
+    ``acquire_async`` suspends a coroutine.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_rate: float,
+        concurrency: int = Settings.AWS_GOVERNOR_CONCURRENCY,
+        max_concurrency: int = Settings.AWS_GOVERNOR_MAX_CONCURRENCY,
+        max_wait: float = Settings.AWS_GOVERNOR_MAX_WAIT,
+        max_queue: int = Settings.AWS_GOVERNOR_MAX_QUEUE,
+        decrease: float = 0.7,
+        cooldown: float = 1.0,
+        min_rate: float = 0.5,
+    ):
+        self.name = name
+        self.max_rate = float(max_rate)
+        self.rate = self.max_rate
+        self.max_concurrency = max_concurrency
+        self.limit = float(min(concurrency, max_concurrency))
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.min_rate = min_rate
+        self.tokens = self.rate
+        self.in_flight = 0
+        self.counters = {"calls": 0, "queued": 0, "throttled": 0, "rejected": 0, "timed_out": 0}
+        self.wait_seconds = 0.0
+        self._refilled = time.monotonic()
+        self._last_decrease = -math.inf
+        self._lock = threading.Lock()
+        # Queued callers in arrival order; only the head may take capacity.
+        self._queue = collections.deque()
+
+    def _refill(self, now: float):
+        # Burst of one second's worth, but always room for a whole token at sub-1/s rates.
+        self.tokens = min(max(1.0, self.rate), self.tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _try_acquire(self, now: float):
+        """
+        Take a token and a slot if both are free.
+
+        :return: 0 when acquired, else seconds until the next token, or None when waiting on a slot.
+        """
+        self._refill(now)
+        if self.in_flight < max(1, int(self.limit)) and self.tokens >= 1:
+            self.tokens -= 1
+            self.in_flight += 1
+            self.counters["calls"] += 1
+            return 0.0
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        return None
+
+    def _wake_head(self):
+        if self._queue:
+            self._queue[0].wake()
+
+    def _enqueue(self, waiter):
+        if len(self._queue) >= self.max_queue:
+            self.counters["rejected"] += 1
+            raise ThrottledError(f"Too many requests queued for AWS {self.name}; retry later.")
+        self._queue.append(waiter)
+        self.counters["queued"] += 1
+
+    def _poll(self, waiter, started: float, deadline: float):
+        """
+        One queued attempt, with the lock held.
+
+        :return: None once acquired, else the seconds to sleep before trying again.
+        """
+        now = time.monotonic()
+        delay = self._try_acquire(now) if self._queue[0] is waiter else None
+        if delay == 0.0:
+            self._queue.popleft()
+            self.wait_seconds += now - started
+            # The next caller in line may be able to start too.
+            self._wake_head()
+            return None
+        remaining = deadline - now
+        if remaining <= 0:
+            self.counters["timed_out"] += 1
+            raise ThrottledError(f"Timed out after {self.max_wait}s waiting for AWS {self.name} capacity; retry later.")
+        waiter.reset()
+        return min(delay if delay is not None else remaining, remaining, _MAX_SLEEP)
+
+    def _leave(self, waiter):
+        """Drop a caller that gave up from the queue, handing its turn on if it was first."""
+        if waiter in self._queue:
+            was_head = self._queue[0] is waiter
+            self._queue.remove(waiter)
+            if was_head:
+                self._wake_head()
+
+    def acquire(self, deadline: float = None):
+        """Block until a call may start; raises ``ThrottledError`` once ``deadline`` (monotonic) passes."""
+        started = time.monotonic()
+        deadline = deadline or started + self.max_wait
+        with self._lock:
+            if not self._queue and self._try_acquire(started) == 0.0:
+                return
+            waiter = _Waiter()
+            self._enqueue(waiter)
+        try:
+            while True:
+                with self._lock:
+                    delay = self._poll(waiter, started, deadline)
+                if delay is None:
+                    return
+                waiter.event.wait(delay)
+        except BaseException:
+            with self._lock:
+                self._leave(waiter)
+            raise
+
+    async def acquire_async(self, deadline: float = None):
+        """Wait without blocking the event loop until a call may start; see ``acquire``."""
+        started = time.monotonic()
+        deadline = deadline or started + self.max_wait
+        with self._lock:
+            if not self._queue and self._try_acquire(started) == 0.0:
+                return
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._enqueue(waiter)
+        try:
+            while True:
+                with self._lock:
+                    delay = self._poll(waiter, started, deadline)
+                if delay is None:
+                    return
+                try:
+                    await asyncio.wait_for(waiter.future, delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._lock:
+                self._leave(waiter)
+            raise
+
+    def _throttled(self, now: float):
+        self.counters["throttled"] += 1
+        AWS_THROTTLES.inc(operation=self.name)
+        if now - self._last_decrease >= self.cooldown:
+            self._last_decrease = now
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = min(self.tokens, self.rate)
+            self.limit = max(1.0, self.limit * self.decrease)
+
+    def record_throttle(self):
+        """Note a throttled attempt that botocore is about to retry, without ending the call."""
+        with self._lock:
+            self._throttled(time.monotonic())
+
+    def release(self, throttled: bool = False):
+        """End a call started with ``acquire``; ``throttled`` if AWS finally rejected it for rate."""
+        with self._lock:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            if throttled:
+                self._throttled(time.monotonic())
+            else:
+                self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+                if saturated:
+                    self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._wake_head()
+
+    def _finish(self, error: Exception = None):
+        throttled = error is not None and is_throttling_error(error)
+        self.release(throttled)
+        if throttled:
+            return ThrottledError(f"AWS {self.name} is throttling requests; retry later ({error_code(error)}).")
+        return None
+
+    def run(self, call):
+        """Run the blocking ``call()`` under the governor; a final throttling error becomes ``ThrottledError``."""
+        self.acquire()
+        try:
+            result = call()
+        except Exception as e:
+            throttled = self._finish(e)
+            if throttled is not None:
+                raise throttled from e
+            raise
+        self._finish()
+        return result
+
+    async def run_async(self, call):
+        """Await ``call()`` (a coroutine function) under the governor; see ``run``."""
+        await self.acquire_async()
+        try:
+            result = await call()
+        except Exception as e:
+            throttled = self._finish(e)
+            if throttled is not None:
+                raise throttled from e
+            raise
+        except BaseException:
+            # Cancelled while the call was running: free the slot.
+            self.release()
+            raise
+        self._finish()
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rate": round(self.rate, 2),
+                "max_rate": self.max_rate,
+                "concurrency_limit": round(self.limit, 2),
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "waiting": len(self._queue),
+                "wait_seconds": round(self.wait_seconds, 3),
+                **self.counters,
+            }
+
+
+class _Waiter:
+    """A queued caller: a thread waits on ``event``, a coroutine on ``future`` in its event loop."""
+
+    __slots__ = ("loop", "event", "future")
+
+    def __init__(self, loop=None):
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = None
+
+    def reset(self):
+        """Re-arm before sleeping; called with the governor's lock held, like ``wake``."""
+        if self.event is not None:
+            self.event.clear()
+        else:
+            self.future = self.loop.create_future()
+
+    def wake(self):
+        if self.event is not None:
+            self.event.set()
+        elif self.future is not None:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class RateGovernors:
+    """One ``RateGovernor`` per AWS service, region and operation, created on first use."""
+
+    def __init__(self, default_rate: float = Settings.AWS_GOVERNOR_DEFAULT_RATE, limits: str = Settings.AWS_GOVERNOR_LIMITS):
+        """
+        :param default_rate: Requests per second for operations without a known quota.
+        :param limits: JSON object of ``"service.operation"`` to requests per second, overriding ``DEFAULT_RATES``;
+            a ``"*"`` entry replaces the built-in rates and the default for every operation not listed.
+        """
+        overrides = json.loads(limits or "{}")
+        if "*" in overrides:
+            self.default_rate = overrides.pop("*")
+            self.rates = overrides
+        else:
+            self.default_rate = default_rate
+            self.rates = {**DEFAULT_RATES, **overrides}
+        self._governors = {}
+        self._lock = threading.Lock()
+
+    def get(self, service: str, region: str, operation: str) -> RateGovernor:
+        key = (service, region, operation)
+        governor = self._governors.get(key)
+        if governor is None:
+            with self._lock:
+                governor = self._governors.get(key)
+                if governor is None:
+                    name = f"{service}.{operation}"
+                    governor = self._governors[key] = RateGovernor(name, self.rates.get(name, self.default_rate))
+        return governor
+
+    def stats(self):
+        return [
+            {"service": service, "region": region, "operation": operation, **governor.stats()}
+            for (service, region, operation), governor in sorted(self._governors.items())
+        ]
+
+
+# Client attributes that are not API operations and are passed through ungoverned.
+_UNGOVERNED = frozenset({"can_paginate", "get_waiter", "close", "generate_presigned_url"})
+
+_NO_PAGE = object()
+
+
+class GovernedPaginator:
+    """Wraps a boto3 paginator so fetching each page goes through the operation's ``RateGovernor``."""
+
+    def __init__(self, paginator, governor: RateGovernor):
+        self.paginator = paginator
+        self.governor = governor
+
+    def paginate(self, **kwargs):
+        pages = iter(self.paginator.paginate(**kwargs))
+        while True:
+            page = self.governor.run(lambda: next(pages, _NO_PAGE))
+            if page is _NO_PAGE:
+                return
+            yield page
+
+
+class GovernedClient:
+    """Wraps a boto3 client (or a stand-in) so each API operation goes through its ``RateGovernor``.
+
+    Blocking callers just call methods as on the client.  Async callers that run
+    the client on a thread pool (``StatementExecutor``) should wait in
+    ``governor(operation).run_async`` on the event loop instead and call
+    ``client`` directly, so queued calls do not hold pool threads.
+    """
+
+    def __init__(self, client, governors: RateGovernors, service: str, region: str):
+        self.client = client
+        self.governors = governors
+        self.service = service
+        self.region = region
+
+    def governor(self, operation: str) -> RateGovernor:
+        return self.governors.get(self.service, self.region, operation)
+
+    def get_paginator(self, operation: str) -> GovernedPaginator:
+        """The client's paginator for ``operation``, with every page request governed like a direct call."""
+        return GovernedPaginator(self.client.get_paginator(operation), self.governor(operation))
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name.startswith("_") or name in _UNGOVERNED or not callable(attr):
+            return attr
+        governor = self.governor(name)
+
+        def governed(*args, **kwargs):
+            return governor.run(lambda: attr(*args, **kwargs))
+
+        return governed
@@ -1,15 +1,10 @@
-import boto3
 from core.config import Settings
+from infrastructure.aws_clients import get_redshift_client
 
 class RedshiftDataClient:
-    def __init__(self):
-        """Initialize Redshift Data API client"""
-        self.client = boto3.client(
-            "redshift-data",
-            region_name=Settings.AWS_REGION,
-            aws_access_key_id=Settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=Settings.AWS_SECRET_ACCESS_KEY,
-        )
+    def __init__(self, client=None):
+        """Wrap the shared Redshift Data API client unless one is passed in."""
+        self.client = client or get_redshift_client()
 
     def execute_query(self, sql):
         """Execute SQL query using Redshift Data API"""
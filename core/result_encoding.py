@@ -0,0 +1,121 @@
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow output is optional
+    pa = None
+
+ROWS = "rows"
+COLUMNAR = "columnar"
+ARROW = "arrow"
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.redshift.columnar+json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Data API typed field used for each Redshift column type; anything else arrives as stringValue.
+_FIELD_BY_TYPE = {
+    "int2": "longValue",
+    "int4": "longValue",
+    "int8": "longValue",
+    "smallint": "longValue",
+    "integer": "longValue",
+    "bigint": "longValue",
+    "float4": "doubleValue",
+    "float8": "doubleValue",
+    "real": "doubleValue",
+    "double precision": "doubleValue",
+    "bool": "booleanValue",
+    "boolean": "booleanValue",
+}
+
+_ARROW_TYPE_BY_FIELD = {
+    "longValue": "int64",
+    "doubleValue": "float64",
+    "booleanValue": "bool_",
+    "stringValue": "string",
+}
+
+
+def negotiate_format(accept: str, requested: str = None) -> str:
+    """Pick a result format from an explicit request or the ``Accept`` header (rows by default)."""
+    if requested in (ROWS, COLUMNAR, ARROW):
+        return requested
+    accept = accept or ""
+    if ARROW_MEDIA_TYPE in accept:
+        return ARROW
+    if COLUMNAR_MEDIA_TYPE in accept:
+        return COLUMNAR
+    return ROWS
+
+
+def column_fields(column_metadata):
+    """Typed Data API field key (``longValue``, ``stringValue``, ...) for each column in ``ColumnMetadata``."""
+    return [_FIELD_BY_TYPE.get(column.get("typeName", ""), "stringValue") for column in column_metadata]
+
+
+def arrow_array(values, field: str):
+    """Build an Arrow array for one column of values decoded from ``field``."""
+    if field == "stringValue":
+        values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+    return pa.array(values, type=getattr(pa, _ARROW_TYPE_BY_FIELD[field])())
+
+
+def field_value(field: dict):
+    """Return the Python value of a single Data API ``Field``."""
+    if field.get("isNull"):
+        return None
+    return next(iter(field.values()))
+
+
+def decode_rows(column_names, records):
+    """Decode Data API records into ``{column: value}`` dicts."""
+    return [
+        {name: field_value(field) for name, field in zip(column_names, record)}
+        for record in records
+    ]
+
+
+class ColumnarBuilder:
+    """Accumulates Data API result pages into one typed array per column.
+
+    Each column's typed field (``longValue``, ``doubleValue``, ...) is resolved
+    once from ``ColumnMetadata``, so decoding a cell is a single dict lookup.
+    """
+
+    def __init__(self, column_metadata):
+        self.names = [column["name"] for column in column_metadata]
+        self.types = [column.get("typeName", "") for column in column_metadata]
+        self.fields = column_fields(column_metadata)
+        self.data = [[] for _ in self.names]
+        self.row_count = 0
+
+    def add_records(self, records):
+        """Append a page of records column by column."""
+        for index, key in enumerate(self.fields):
+            values = self.data[index]
+            append = values.append
+            for record in records:
+                field = record[index]
+                value = field.get(key)
+                if value is None and "isNull" not in field:
+                    value = next(iter(field.values()))
+                append(value)
+        self.row_count += len(records)
+
+    def to_dict(self):
+        """Return the columnar JSON body: column names and types once, then one array per column."""
+        return {
+            "format": COLUMNAR,
+            "columns": [{"name": name, "type": type_name} for name, type_name in zip(self.names, self.types)],
+            "data": self.data,
+            "row_count": self.row_count,
+        }
+
+    def to_arrow(self) -> bytes:
+        """Serialise the columns as an Arrow IPC stream."""
+        if pa is None:
+            raise ImportError("pyarrow is required for Arrow output")
+        arrays = [arrow_array(values, field) for values, field in zip(self.data, self.fields)]
+        table = pa.Table.from_arrays(arrays, names=self.names)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
@@ -0,0 +1,164 @@
+import csv
+import io
+import zlib
+from core.lazy import lazy_import
+from core.result_encoding import ColumnarBuilder, arrow_array, field_value
+
+# Optional: only needed for zstd-compressed CSV and Parquet exports.
+zstandard = lazy_import("zstandard")
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+
+CSV = "csv"
+PARQUET = "parquet"
+EXPORT_FORMATS = (CSV, PARQUET)
+
+GZIP = "gzip"
+ZSTD = "zstd"
+NONE = "none"
+COMPRESSIONS = (GZIP, ZSTD, NONE)
+
+# Compression used when the request does not name one.
+DEFAULT_COMPRESSION = {CSV: GZIP, PARQUET: ZSTD}
+
+_CSV_MEDIA_TYPES = {GZIP: ("application/gzip", ".csv.gz"), ZSTD: ("application/zstd", ".csv.zst"), NONE: ("text/csv", ".csv")}
+
+
+def _compressor(compression: str):
+    """Streaming compressor with ``compress``/``flush``, or None for uncompressed output."""
+    if compression == GZIP:
+        # wbits=31 writes a gzip header and trailer instead of a raw zlib stream.
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if compression == ZSTD:
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    return None
+
+
+class CsvExportEncoder:
+    """Encodes Data API result pages as CSV, compressed as a single gzip or zstd stream.
+
+    Each page is written and compressed as it arrives, so only the compressor's
+    window is kept between pages.
+    """
+
+    def __init__(self, compression: str = GZIP):
+        self.media_type, self.extension = _CSV_MEDIA_TYPES[compression]
+        self._compressor = _compressor(compression)
+        self._header_written = False
+
+    def _compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) if self._compressor is not None else data
+
+    def encode(self, page: dict) -> bytes:
+        """Encode one ``get_statement_result`` page; returns the bytes ready to send (possibly empty)."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not self._header_written:
+            writer.writerow([column["name"] for column in page["ColumnMetadata"]])
+            self._header_written = True
+        writer.writerows([field_value(field) for field in record] for record in page["Records"])
+        return self._compress(buffer.getvalue().encode())
+
+    def finish(self) -> bytes:
+        """Flush the compressor; the returned bytes end the file."""
+        return self._compressor.flush() if self._compressor is not None else b""
+
+
+class _ChunkSink:
+    """Write-only file object that hands back what Parquet wrote since the last ``drain``."""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetExportEncoder:
+    """Encodes Data API result pages as a Parquet file, one row group per ``row_group_rows`` rows.
+
+    Pages are buffered as Arrow record batches until a row group is full, then
+    written and handed back, so memory is bounded by one row group rather than
+    the whole result.  ``compression`` is the Parquet column codec.
+    """
+
+    media_type = "application/vnd.apache.parquet"
+    extension = ".parquet"
+
+    def __init__(self, compression: str = ZSTD, row_group_rows: int = 100000):
+        self.compression = compression
+        self.row_group_rows = row_group_rows
+        # Resolved here so a missing pyarrow fails before the statement runs.
+        self._writer_class = pq.ParquetWriter
+        self._sink = _ChunkSink()
+        self._writer = None
+        self._batches = []
+        self._buffered_rows = 0
+
+    def encode(self, page: dict) -> bytes:
+        """Buffer one ``get_statement_result`` page; returns any completed row group's bytes."""
+        builder = ColumnarBuilder(page["ColumnMetadata"])
+        builder.add_records(page["Records"])
+        arrays = [arrow_array(values, field) for values, field in zip(builder.data, builder.fields)]
+        batch = pa.RecordBatch.from_arrays(arrays, names=builder.names)
+        if self._writer is None:
+            self._writer = self._writer_class(self._sink, batch.schema, compression=self.compression)
+        self._batches.append(batch)
+        self._buffered_rows += batch.num_rows
+        if self._buffered_rows >= self.row_group_rows:
+            self._write_row_group()
+        return self._sink.drain()
+
+    def _write_row_group(self):
+        if self._batches:
+            table = pa.Table.from_batches(self._batches)
+            self._writer.write_table(table, row_group_size=table.num_rows)
+        self._batches = []
+        self._buffered_rows = 0
+
+    def finish(self) -> bytes:
+        """Write the last row group and the footer."""
+        if self._writer is None:
+            return b""
+        self._write_row_group()
+        self._writer.close()
+        return self._sink.drain()
+
+
+def create_encoder(export_format: str, compression: str = None, row_group_rows: int = 100000):
+    """
+    Build the encoder for an export.
+
+    :param export_format: "csv" or "parquet".
+    :param compression: "gzip", "zstd" or "none"; defaults to gzip for CSV and zstd for Parquet.
+    :raises ValueError: For an unknown format or compression.
+    :raises ImportError: When the format or compression needs a package that is not installed.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{export_format}'; use one of {', '.join(EXPORT_FORMATS)}")
+    compression = compression or DEFAULT_COMPRESSION[export_format]
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression '{compression}'; use one of {', '.join(COMPRESSIONS)}")
+
+    if export_format == PARQUET:
+        return ParquetExportEncoder(compression, row_group_rows)
+    return CsvExportEncoder(compression)
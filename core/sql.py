@@ -0,0 +1,111 @@
+import functools
+import hashlib
+import re
+
+# Quoted literals/identifiers and comments, matched so they can be skipped or stripped as a unit.
+_TOKEN_RE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|--[^\n]*|/\*.*?\*/)""", re.S)
+
+_READ_ONLY_KEYWORDS = ("select", "with", "show", "explain", "values")
+_WRITE_RE = re.compile(
+    r"\b(insert|update|delete|merge|create|alter|drop|truncate|grant|revoke|copy|unload|vacuum|analyze|call|into|lock)\b"
+)
+
+_NUMBER_RE = re.compile(r"(?<![\w$.])(?:\d+\.?\d*|\.\d+)(?:e[-+]?\d+)?\b")
+_OPERATOR_RE = re.compile(r"([=<>!]+) ")
+_BEFORE_OPERATOR_RE = re.compile(r" (?=[=<>!])")
+_IN_LIST_RE = re.compile(r"\bin ?\(\?(?:,\?)*\)")
+_VALUES_ROWS_RE = re.compile(r"(\(\?(?:,\?)*\))(?:,\(\?(?:,\?)*\))+")
+_NAMED_PARAMETER_RE = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+
+
+def _split_literals(sql: str):
+    """Return ``(text, is_literal)`` pieces with comments replaced by a space."""
+    pieces = []
+    code = ""
+    pos = 0
+    for match in _TOKEN_RE.finditer(sql):
+        token = match.group(0)
+        code += sql[pos:match.start()]
+        if token.startswith(("--", "/*")):
+            code += " "
+        else:
+            pieces.append((code, False))
+            pieces.append((token, True))
+            code = ""
+        pos = match.end()
+    pieces.append((code + sql[pos:], False))
+    return pieces
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Canonicalise SQL text for use as a cache key.
+
+    Comments are removed, whitespace outside literals is collapsed, text outside
+    literals is lower-cased and a trailing semicolon is dropped.
+    """
+    normalized = "".join(
+        text if is_literal else re.sub(r"\s+", " ", text).lower()
+        for text, is_literal in _split_literals(sql)
+    )
+    return normalized.strip().rstrip(";").strip()
+
+
+def is_read_only(sql: str) -> bool:
+    """Return True for a single SELECT-style statement that cannot modify data."""
+    code = " ".join(text for text, is_literal in _split_literals(sql) if not is_literal).lower().strip()
+    code = code.rstrip("; ")
+    if ";" in code:
+        return False
+    if not code.startswith(_READ_ONLY_KEYWORDS):
+        return False
+    return _WRITE_RE.search(code) is None
+
+
+@functools.lru_cache(maxsize=1024)
+def pyformat_sql(sql: str) -> str:
+    """
+    Rewrite Data API ``:name`` parameters as psycopg2 ``%(name)s`` placeholders.
+
+    Literal ``%`` signs are doubled and ``::type`` casts and quoted text are left
+    alone, so one statement can run through either the Data API or a direct connection.
+    """
+    return "".join(
+        text.replace("%", "%%") if is_literal else _NAMED_PARAMETER_RE.sub(r"%(\1)s", text.replace("%", "%%"))
+        for text, is_literal in _split_literals(sql)
+    )
+
+
+@functools.lru_cache(maxsize=65536)
+def fingerprint_sql(sql: str):
+    """
+    Reduce a statement to its shape so executions that differ only in literals group together.
+
+    String and numeric literals become ``?``, IN-lists collapse to ``in (?+)``, multi-row
+    VALUES lists collapse to their first row, comments are removed, text is lower-cased
+    and whitespace is collapsed (and dropped inside parentheses, after commas and around
+    comparison operators).
+
+    :return: Tuple of (16-hex-digit fingerprint id, normalised text).
+    """
+    pieces = []
+    for text, is_literal in _split_literals(sql):
+        if not is_literal:
+            # str.split/join and str.replace are several times faster than the equivalent regexes.
+            code = " ".join(text.split()).lower()
+            if text[:1].isspace():
+                code = " " + code
+            if text[-1:].isspace() and code.strip():
+                code += " "
+            code = _NUMBER_RE.sub("?", code)
+            code = code.replace("( ", "(").replace(" )", ")").replace(" ,", ",").replace(", ", ",")
+            code = _BEFORE_OPERATOR_RE.sub("", _OPERATOR_RE.sub(r"\1", code))
+            pieces.append(code)
+        elif text.startswith("'"):
+            pieces.append("?")
+        else:
+            pieces.append(text)
+    normalized = "".join(pieces).strip().rstrip(";").strip()
+    normalized = _IN_LIST_RE.sub("in (?+)", normalized)
+    normalized = _VALUES_ROWS_RE.sub(r"\1", normalized)
+    return hashlib.md5(normalized.encode()).hexdigest()[:16], normalized
@@ -0,0 +1,203 @@
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from core.config import Settings
+from core.exceptions import QueryExecutionError, QueryTimeoutError
+from core.instrumentation import phase
+from core.rate_governor import GovernedClient
+
+TERMINAL_STATUSES = ("FINISHED", "FAILED", "ABORTED")
+_END_OF_PAGES = object()
+
+
+async def prefetch_pages(pages, depth: int):
+    """
+    Re-yield ``pages`` (an async iterator) while a background task keeps up to ``depth`` items fetched ahead.
+
+    Errors from the source are raised to the consumer; closing the consumer cancels the fetching task.
+    """
+    queue = asyncio.Queue(depth)
+
+    async def produce():
+        try:
+            async for page in pages:
+                await queue.put(page)
+            await queue.put(_END_OF_PAGES)
+        except Exception as e:
+            await queue.put(e)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END_OF_PAGES:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+
+
+class StatementExecutor:
+    """Runs Redshift Data API statements without blocking the event loop.
+
+    Statements are submitted with ``execute_statement`` and then polled with
+    ``describe_statement`` using exponential backoff, so a waiting statement
+    costs nothing but a sleeping coroutine.  The blocking boto3 calls are
+    short and run on a small dedicated thread pool.
+    """
+
+    def __init__(
+        self,
+        client,
+        max_in_flight: int = Settings.STATEMENT_MAX_IN_FLIGHT,
+        poll_initial: float = Settings.STATEMENT_POLL_INITIAL,
+        poll_max: float = Settings.STATEMENT_POLL_MAX,
+        poll_multiplier: float = 1.5,
+        timeout: float = Settings.STATEMENT_TIMEOUT,
+        max_workers: int = Settings.STATEMENT_WORKERS,
+    ):
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.poll_multiplier = poll_multiplier
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="redshift-data")
+        self._semaphore = None
+        self.in_flight = 0
+
+    @property
+    def semaphore(self):
+        # Created lazily so the semaphore binds to the running event loop.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._semaphore
+
+    async def call(self, method: str, **kwargs):
+        """Invoke a blocking Data API method on the executor's thread pool.
+
+        With a ``GovernedClient``, the call first waits for its operation's rate governor
+        here on the event loop, so throttled operations queue without holding pool threads.
+        """
+        if isinstance(self.client, GovernedClient):
+            client = self.client.client
+            return await self.client.governor(method).run_async(lambda: self._call(client, method, kwargs))
+        return await self._call(self.client, method, kwargs)
+
+    async def _call(self, client, method: str, kwargs: dict):
+        loop = asyncio.get_running_loop()
+        fn = functools.partial(getattr(client, method), **kwargs)
+        # Run in a copy of the caller's context so AWS call hooks see the current request.
+        return await loop.run_in_executor(self._pool, contextvars.copy_context().run, fn)
+
+    async def submit(self, sql: str, **kwargs) -> str:
+        """Submit a statement and return its id without waiting for it."""
+        with phase("submit"):
+            response = await self.call("execute_statement", Sql=sql, **kwargs)
+        return response["Id"]
+
+    async def submit_batch(self, sqls, **kwargs) -> str:
+        """Submit several statements as one ``batch_execute_statement`` transaction."""
+        with phase("submit"):
+            response = await self.call("batch_execute_statement", Sqls=list(sqls), **kwargs)
+        return response["Id"]
+
+    async def cancel(self, statement_id: str):
+        """Cancel a running statement, ignoring statements that already ended."""
+        try:
+            await self.call("cancel_statement", Id=statement_id)
+        except Exception:
+            pass
+
+    async def wait(self, statement_id: str, timeout: float = None) -> dict:
+        """
+        Poll a statement until it reaches a terminal status.
+
+        :param statement_id: Data API statement id.
+        :param timeout: Seconds to wait before cancelling (defaults to the executor timeout).
+        :return: The final ``describe_statement`` response.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            with phase("poll"):
+                return await self._poll(statement_id, timeout)
+        except asyncio.CancelledError:
+            # The caller went away (e.g. client disconnect); don't leave the statement running.
+            await asyncio.shield(self.cancel(statement_id))
+            raise
+
+    async def _poll(self, statement_id: str, timeout: float) -> dict:
+        deadline = time.monotonic() + timeout
+        interval = self.poll_initial
+        while True:
+            status = await self.call("describe_statement", Id=statement_id)
+            if status["Status"] in TERMINAL_STATUSES:
+                return status
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                await self.cancel(statement_id)
+                raise QueryTimeoutError(f"Statement {statement_id} timed out after {timeout}s")
+
+            await asyncio.sleep(min(interval, remaining))
+            interval = min(interval * self.poll_multiplier, self.poll_max)
+
+    async def iter_result_pages(self, statement_id: str, prefetch: int = 0):
+        """
+        Lazily yield ``get_statement_result`` pages, following ``NextToken``.
+
+        Only one page is held at a time, so memory stays bounded by the page size.
+        With ``prefetch``, up to that many further pages are fetched in the background
+        while the caller works on the current one.
+        """
+        if prefetch > 0:
+            async for page in prefetch_pages(self.iter_result_pages(statement_id), prefetch):
+                yield page
+            return
+
+        kwargs = {"Id": statement_id}
+        while True:
+            with phase("fetch"):
+                page = await self.call("get_statement_result", **kwargs)
+            yield page
+            next_token = page.get("NextToken")
+            if not next_token:
+                return
+            kwargs["NextToken"] = next_token
+
+    async def run(self, sql: str, timeout: float = None, **kwargs) -> dict:
+        """
+        Submit a statement and wait for it to finish.
+
+        :param sql: The SQL to execute.
+        :param timeout: Optional per-statement timeout in seconds.
+        :return: The final ``describe_statement`` response of a FINISHED statement.
+        """
+        return await self._run(lambda: self.submit(sql, **kwargs), timeout)
+
+    async def run_batch(self, sqls, timeout: float = None, **kwargs) -> dict:
+        """
+        Submit statements as a single transaction and wait for the batch to finish.
+
+        :param sqls: The SQL statements to execute, in order.
+        :param timeout: Optional timeout in seconds for the whole batch.
+        :return: The final ``describe_statement`` response, including ``SubStatements``.
+        """
+        return await self._run(lambda: self.submit_batch(sqls, **kwargs), timeout)
+
+    async def _run(self, submit, timeout: float = None) -> dict:
+        async with self.semaphore:
+            self.in_flight += 1
+            try:
+                statement_id = await submit()
+                status = await self.wait(statement_id, timeout)
+            finally:
+                self.in_flight -= 1
+
+        if status["Status"] != "FINISHED":
+            raise QueryExecutionError(status.get("Error", f"Statement {status['Status'].lower()}"))
+        return status
@@ -1,16 +1,208 @@
-import boto3
+import threading
+import time
+from core import instrumentation
+from core.clusters import get_cluster_registry
+from core.config import Settings
 from core.exceptions import RedshiftConnectionError
+from core.lazy import lazy_import, load_deferred
+from core.metrics_fetcher import MetricsFetcher
+from core.rate_governor import THROTTLING_ERROR_CODES, GovernedClient, RateGovernors
+from core.statement_executor import StatementExecutor
 
-def get_redshift_client():
-    """Returns a Redshift Data API client."""
+boto3 = lazy_import("boto3")
+botocore = lazy_import("botocore")
+botocore_config = lazy_import("botocore.config")
+
+
+class ClientRegistry:
+    """Process-wide cache of boto3 clients keyed by service and region.
+
+    Clients are thread-safe and keep their own HTTP connection pool, so building
+    one per request throws that pool away.  Every client handed out here shares
+    the same botocore pool, keep-alive and retry settings, and in-use counters
+    are kept per client so pool saturation can be observed under load.  boto3
+    itself is only loaded when the first client is built.
+
+    With ``governors``, clients are handed out wrapped in a ``GovernedClient`` so
+    every API operation is rate- and concurrency-limited, and throttled attempts
+    that botocore retries internally still slow the governor down.
+    """
+
+    def __init__(
+        self,
+        max_pool_connections: int = Settings.AWS_MAX_POOL_CONNECTIONS,
+        tcp_keepalive: bool = Settings.AWS_TCP_KEEPALIVE,
+        max_attempts: int = Settings.AWS_MAX_ATTEMPTS,
+        retry_mode: str = Settings.AWS_RETRY_MODE,
+        governors: RateGovernors = None,
+    ):
+        self.max_pool_connections = max_pool_connections
+        self.governors = governors
+        self._config_kwargs = {
+            "max_pool_connections": max_pool_connections,
+            "tcp_keepalive": tcp_keepalive,
+            "retries": {"max_attempts": max_attempts, "mode": retry_mode},
+        }
+        self._config = None
+        self._session = None
+        self._clients = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @property
+    def config(self):
+        """The botocore ``Config`` shared by every client, built on first use."""
+        if self._config is None:
+            self._config = botocore_config.Config(**self._config_kwargs)
+        return self._config
+
+    def get(self, service: str, region: str = None):
+        """Return the shared client for ``service`` in ``region`` (default ``Settings.AWS_REGION``)."""
+        key = (service, region or Settings.AWS_REGION)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._govern(self._create(*key), *key)
+                self._clients[key] = client
+        return client
+
+    def register(self, service: str, client, region: str = None):
+        """Hand out ``client`` for ``service`` in ``region`` instead of building one (e.g. a local stand-in)."""
+        key = (service, region or Settings.AWS_REGION)
+        with self._lock:
+            self._clients[key] = self._govern(client, *key)
+
+    def _govern(self, client, service: str, region: str):
+        return GovernedClient(client, self.governors, service, region) if self.governors is not None else client
+
+    def _create(self, service: str, region: str):
+        with instrumentation.phase("client_init"):
+            if self._session is None:
+                self._session = boto3.session.Session(
+                    aws_access_key_id=Settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=Settings.AWS_SECRET_ACCESS_KEY,
+                )
+            client = self._session.client(service, region_name=region, config=self.config)
+
+        stats = {"in_use": 0, "peak_in_use": 0, "calls": 0, "saturated_calls": 0}
+        self._stats[(service, region)] = stats
+        lock = threading.Lock()
+
+        def before_call(context=None, **kwargs):
+            if context is not None:
+                context["started"] = time.perf_counter()
+            with lock:
+                stats["calls"] += 1
+                stats["in_use"] += 1
+                stats["peak_in_use"] = max(stats["peak_in_use"], stats["in_use"])
+                if stats["in_use"] > self.max_pool_connections:
+                    stats["saturated_calls"] += 1
+
+        def after_call(event_name=None, context=None, parsed=None, exception=None, **kwargs):
+            with lock:
+                stats["in_use"] -= 1
+            if context is not None and "started" in context:
+                # Service errors arrive on after-call with an "Error" body; after-call-error means no response at all.
+                instrumentation.record_aws_call(
+                    service, event_name.rsplit(".", 1)[-1], time.perf_counter() - context["started"],
+                    failed=exception is not None or "Error" in (parsed or {}),
+                )
+
+        max_attempts = self._config_kwargs["retries"]["max_attempts"]
+
+        def needs_retry(response=None, operation=None, attempts=None, caught_exception=None, **kwargs):
+            # Called once per attempt before botocore decides whether to retry, and must return None.
+            # The last attempt is left to the governor itself, which sees the final outcome.
+            if self.governors is None or operation is None or response is None or attempts >= max_attempts:
+                return None
+            if (response[1] or {}).get("Error", {}).get("Code") in THROTTLING_ERROR_CODES:
+                self.governors.get(service, region, botocore.xform_name(operation.name)).record_throttle()
+            return None
+
+        client.meta.events.register("before-call.*.*", before_call)
+        client.meta.events.register("after-call.*.*", after_call)
+        client.meta.events.register("after-call-error.*.*", after_call)
+        client.meta.events.register("needs-retry.*.*", needs_retry)
+        return client
+
+    def stats(self):
+        """Report per-client pool usage; ``saturated_calls`` counts calls made while the pool was full."""
+        max_pool = self.max_pool_connections
+        return [
+            {
+                "service": service,
+                "region": region,
+                "max_pool_connections": max_pool,
+                "utilization": round(stats["peak_in_use"] / max_pool, 2),
+                **stats,
+            }
+            for (service, region), stats in self._stats.items()
+        ]
+
+
+client_registry = ClientRegistry(governors=RateGovernors() if Settings.AWS_GOVERNOR_ENABLED else None)
+
+def get_redshift_client(region: str = None):
+    """Returns the shared Redshift Data API client."""
     try:
-        return boto3.client("redshift-data", region_name="ap-south-2")
+        return client_registry.get("redshift-data", region)
     except Exception as e:
         raise RedshiftConnectionError(f"Redshift client initialization failed: {str(e)}")
 
-def get_cloudwatch_client():
-    """Returns an AWS CloudWatch client."""
+def get_cloudwatch_client(region: str = None):
+    """Returns the shared AWS CloudWatch client (billing metrics live in ``Settings.CLOUDWATCH_REGION``)."""
     try:
-        return boto3.client("cloudwatch", region_name="us-east-1")
+        return client_registry.get("cloudwatch", region or Settings.CLOUDWATCH_REGION)
     except Exception as e:
         raise RedshiftConnectionError(f"CloudWatch client initialization failed: {str(e)}")
+
+def get_logs_client(region: str = None):
+    """Returns the shared CloudWatch Logs client."""
+    try:
+        return client_registry.get("logs", region)
+    except Exception as e:
+        raise RedshiftConnectionError(f"CloudWatch Logs client initialization failed: {str(e)}")
+
+_metrics_fetchers = {}
+_metrics_fetchers_lock = threading.Lock()
+
+def get_metrics_fetcher(region: str = None):
+    """Returns the process-wide batched CloudWatch metrics fetcher for a region."""
+    region = region or Settings.CLOUDWATCH_REGION
+    with _metrics_fetchers_lock:
+        fetcher = _metrics_fetchers.get(region)
+        if fetcher is None:
+            fetcher = _metrics_fetchers[region] = MetricsFetcher(get_cloudwatch_client(region))
+    return fetcher
+
+def metrics_fetcher_stats():
+    """Report batching counters for every metrics fetcher, keyed by region."""
+    return {region: fetcher.stats() for region, fetcher in _metrics_fetchers.items()}
+
+def warm_up():
+    """Load the deferred SDK modules and build the shared AWS clients ahead of the first request (see ``STARTUP_WARMUP``)."""
+    with instrumentation.phase("warm_up"):
+        load_deferred()
+        get_cloudwatch_client()
+        get_logs_client()
+        for region in {Settings.AWS_REGION, *get_cluster_registry().regions()}:
+            get_redshift_client(region)
+            get_cloudwatch_client(region)
+
+_statement_executors = {}
+_statement_executors_lock = threading.Lock()
+
+def get_statement_executor(region: str = None):
+    """Returns the process-wide async Redshift statement executor for a region (default ``Settings.AWS_REGION``)."""
+    region = region or Settings.AWS_REGION
+    executor = _statement_executors.get(region)
+    if executor is None:
+        with _statement_executors_lock:
+            executor = _statement_executors.get(region)
+            if executor is None:
+                executor = _statement_executors[region] = StatementExecutor(get_redshift_client(region))
+    return executor
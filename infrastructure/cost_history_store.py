@@ -0,0 +1,202 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from core.config import Settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cost_rollups (
+    resolution TEXT NOT NULL,
+    service TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    PRIMARY KEY (resolution, bucket, service)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cost_last_samples (
+    service TEXT PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    charges REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS watermarks (
+    name TEXT PRIMARY KEY,
+    ts INTEGER NOT NULL
+);
+"""
+
+# EstimatedCharges resets to zero some hours into the 1st of each month (UTC). A drop inside this window
+# after a month starts is that reset; later drops are downward revisions of the running total.
+_RESET_WINDOW = 2 * 86400
+
+HOUR = "hour"
+DAY = "day"
+MONTH = "month"
+RESOLUTIONS = (HOUR, DAY, MONTH)
+
+
+def _utc(ts: int) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+def month_start(ts: int) -> int:
+    """Epoch seconds of the first instant of ``ts``'s UTC month."""
+    value = _utc(ts)
+    return int(datetime(value.year, value.month, 1, tzinfo=timezone.utc).timestamp())
+
+
+def bucket_start(resolution: str, ts: int) -> int:
+    """Floor epoch seconds ``ts`` to the start of its ``resolution`` bucket (UTC)."""
+    if resolution == HOUR:
+        return ts - ts % 3600
+    if resolution == DAY:
+        return ts - ts % 86400
+    return month_start(ts)
+
+
+class CostHistoryStore:
+    """Local SQLite time series of AWS cost per service, rolled up by hour, day and month.
+
+    CloudWatch's ``EstimatedCharges`` is a month-to-date running total, so each
+    new sample is stored as the increase over the previous one (the whole value
+    on the first sample of a month) and added to its hourly, daily and monthly
+    buckets.  Older hourly and daily buckets are dropped after their retention,
+    leaving the coarser rollups to answer long ranges.  Buckets are UTC epoch
+    seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        hourly_retention_days: int = Settings.COST_HISTORY_HOURLY_RETENTION_DAYS,
+        daily_retention_days: int = Settings.COST_HISTORY_DAILY_RETENTION_DAYS,
+    ):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.retention = {HOUR: hourly_retention_days * 86400, DAY: daily_retention_days * 86400}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def _query(self, sql: str, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get_watermark(self, name: str = "EstimatedCharges"):
+        """Return the epoch seconds data has been fetched up to, or None before the first pass."""
+        rows = self._query("SELECT ts FROM watermarks WHERE name = ?", (name,))
+        return rows[0]["ts"] if rows else None
+
+    def add_samples(self, samples, watermark: int, name: str = "EstimatedCharges"):
+        """
+        Fold month-to-date charge samples into the rollups and advance the watermark in one transaction.
+
+        Samples at or before a service's last stored sample are skipped, so overlapping
+        fetches are harmless.
+
+        :param samples: Mapping of service name to ``(epoch seconds, month-to-date charges)`` pairs.
+        :param watermark: Epoch seconds the samples were fetched up to.
+        :return: Number of new samples stored.
+        """
+        stored = 0
+        with self._lock, self._conn:
+            last = {
+                row["service"]: (row["ts"], row["charges"])
+                for row in self._conn.execute("SELECT service, ts, charges FROM cost_last_samples")
+            }
+            increments = {}
+            for service, points in samples.items():
+                previous = last.get(service)
+                for ts, charges in sorted(points):
+                    if previous is not None and ts <= previous[0]:
+                        continue
+                    if previous is None:
+                        cost = charges
+                    elif charges >= previous[1]:
+                        # Still rising, including samples past the 1st that carry last month's running total.
+                        cost = charges - previous[1]
+                    elif ts - month_start(ts) < _RESET_WINDOW:
+                        # The month-to-date total restarted from zero.
+                        cost = charges
+                    else:
+                        # Charges are occasionally revised down; never book a negative cost.
+                        cost = 0.0
+                    for resolution in RESOLUTIONS:
+                        key = (resolution, service, bucket_start(resolution, ts))
+                        increments[key] = increments.get(key, 0.0) + cost
+                    previous = (ts, charges)
+                    stored += 1
+                if previous is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO cost_last_samples (service, ts, charges) VALUES (?, ?, ?)",
+                        (service, previous[0], previous[1]),
+                    )
+
+            self._conn.executemany(
+                """
+                INSERT INTO cost_rollups (resolution, service, bucket, cost) VALUES (?, ?, ?, ?)
+                ON CONFLICT (resolution, bucket, service) DO UPDATE SET cost = cost + excluded.cost
+                """,
+                [(*key, cost) for key, cost in increments.items()],
+            )
+            for resolution, seconds in self.retention.items():
+                self._conn.execute(
+                    "DELETE FROM cost_rollups WHERE resolution = ? AND bucket < ?",
+                    (resolution, bucket_start(resolution, watermark - seconds)),
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watermarks (name, ts) VALUES (?, ?)", (name, watermark),
+            )
+        return stored
+
+    def get_series(self, resolution: str, start: int, end: int):
+        """
+        Return ``[(bucket, {service: cost})]`` in ascending bucket order.
+
+        :param start: Epoch seconds; the bucket containing it is included.
+        :param end: Epoch seconds, exclusive.
+        """
+        rows = self._query(
+            """
+            SELECT bucket, service, cost FROM cost_rollups
+            WHERE resolution = ? AND bucket >= ? AND bucket < ?
+            ORDER BY bucket
+            """,
+            (resolution, bucket_start(resolution, start), end),
+        )
+        series = []
+        for row in rows:
+            if not series or series[-1][0] != row["bucket"]:
+                series.append((row["bucket"], {}))
+            series[-1][1][row["service"]] = row["cost"]
+        return series
+
+    def get_totals(self, resolution: str, start: int, end: int):
+        """Return ``{service: cost}`` summed over the ``resolution`` buckets covering ``[start, end)``."""
+        rows = self._query(
+            """
+            SELECT service, SUM(cost) AS cost FROM cost_rollups
+            WHERE resolution = ? AND bucket >= ? AND bucket < ?
+            GROUP BY service
+            """,
+            (resolution, bucket_start(resolution, start), end),
+        )
+        return {row["service"]: row["cost"] for row in rows}
+
+    def earliest(self, resolution: str):
+        """Return the oldest stored ``resolution`` bucket, or None when empty."""
+        rows = self._query("SELECT MIN(bucket) AS bucket FROM cost_rollups WHERE resolution = ?", (resolution,))
+        return rows[0]["bucket"]
+
+
+_cost_history_store = None
+
+def get_cost_history_store():
+    """Returns the process-wide cost history store, or None when it is disabled."""
+    global _cost_history_store
+    if not Settings.COST_HISTORY_STORE_ENABLED:
+        return None
+    if _cost_history_store is None:
+        _cost_history_store = CostHistoryStore(Settings.COST_HISTORY_STORE_PATH)
+    return _cost_history_store
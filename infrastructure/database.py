@@ -0,0 +1,284 @@
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from core.clusters import Cluster
+from core.config import Settings
+from core.exceptions import RedshiftConnectionError
+from core.lazy import lazy_import
+
+# Optional: only needed for clusters with a direct-connection host.
+psycopg2 = lazy_import("psycopg2")
+
+
+class ConnectionPool:
+    """Thread-safe pool of direct (psycopg2) connections to one Redshift cluster.
+
+    Opening a connection costs a TCP and TLS handshake plus authentication, which
+    is more than a small ``stl_query`` lookup takes to run, so connections are kept
+    between queries.  Up to ``max_size`` are open at once and callers wait up to
+    ``acquire_timeout`` seconds for one to be returned.  A connection that has sat
+    idle for longer than ``health_check_interval`` is pinged before it is handed
+    out, and one older than ``max_lifetime`` is closed instead of reused, so a
+    connection the server or a load balancer dropped is replaced rather than
+    failing the caller's query.
+
+    Works against any PostgreSQL-protocol server, so it can be exercised against a
+    local PostgreSQL with ``connect`` pointed at it.
+    """
+
+    def __init__(
+        self,
+        connect,
+        name: str = "default",
+        min_size: int = Settings.DB_POOL_MIN_SIZE,
+        max_size: int = Settings.DB_POOL_MAX_SIZE,
+        acquire_timeout: float = Settings.DB_POOL_ACQUIRE_TIMEOUT,
+        health_check_interval: float = Settings.DB_POOL_HEALTH_CHECK_INTERVAL,
+        max_lifetime: float = Settings.DB_POOL_MAX_LIFETIME,
+    ):
+        """
+        :param connect: Callable returning a new DB-API connection (e.g. ``functools.partial(psycopg2.connect, dsn)``).
+        :param min_size: Connections ``fill`` opens ahead of the first query.
+        """
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.max_lifetime = max_lifetime
+        self._connect = connect
+        # (connection, opened_at, returned_at); the most recently returned is reused first.
+        self._idle = deque()
+        self._opened = {}
+        self._condition = threading.Condition()
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._stats = {"opened": 0, "closed": 0, "acquired": 0, "health_checks": 0, "health_check_failures": 0,
+                       "timeouts": 0, "connect_errors": 0}
+
+    def _open(self):
+        """Open a connection for a slot already counted in ``_size``."""
+        try:
+            connection = self._connect()
+        except ImportError as e:
+            self._release_slot()
+            raise RedshiftConnectionError(f"Direct connections to cluster '{self.name}' need psycopg2: {str(e)}")
+        except psycopg2.Error as e:
+            self._release_slot()
+            raise RedshiftConnectionError(f"Failed to connect to cluster '{self.name}': {str(e)}")
+        with self._condition:
+            self._opened[id(connection)] = time.monotonic()
+            self._stats["opened"] += 1
+        return connection
+
+    def _release_slot(self):
+        with self._condition:
+            self._size -= 1
+            self._stats["connect_errors"] += 1
+            self._condition.notify()
+
+    def _count(self, stat: str):
+        with self._condition:
+            self._stats[stat] += 1
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._opened.pop(id(connection), None)
+            self._size -= 1
+            self._stats["closed"] += 1
+            self._condition.notify()
+
+    def _healthy(self, connection, opened_at: float, returned_at: float) -> bool:
+        """Whether an idle connection can be handed out, pinging it if it has been idle for a while."""
+        now = time.monotonic()
+        if connection.closed or now - opened_at > self.max_lifetime:
+            return False
+        if now - returned_at <= self.health_check_interval:
+            return True
+        self._count("health_checks")
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            self._count("health_check_failures")
+            return False
+
+    def acquire(self):
+        """
+        Take a connection, opening one when the pool is below ``max_size``.
+
+        :raises RedshiftConnectionError: When none is free within ``acquire_timeout`` or a new one cannot be opened.
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._condition:
+                if self._closed:
+                    raise RedshiftConnectionError(f"Connection pool for cluster '{self.name}' is closed")
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise RedshiftConnectionError(
+                            f"No connection to cluster '{self.name}' became free within {self.acquire_timeout}s"
+                        )
+                    self._waiting += 1
+                    self._condition.wait(remaining)
+                    self._waiting -= 1
+                if self._idle:
+                    connection, opened_at, returned_at = self._idle.pop()
+                else:
+                    self._size += 1
+                    connection = None
+
+            if connection is None:
+                connection = self._open()
+            elif not self._healthy(connection, opened_at, returned_at):
+                self._discard(connection)
+                continue
+            self._count("acquired")
+            return connection
+
+    def release(self, connection, broken: bool = False):
+        """Return a connection; broken or closed ones, and any returned after ``close``, are closed instead."""
+        if not broken and not connection.closed:
+            try:
+                # End whatever transaction the caller left open so the next one starts clean.
+                connection.rollback()
+            except psycopg2.Error:
+                broken = True
+        with self._condition:
+            if not broken and not connection.closed and not self._closed:
+                self._idle.append((connection, self._opened.get(id(connection), time.monotonic()), time.monotonic()))
+                self._condition.notify()
+                return
+        self._discard(connection)
+
+    @contextmanager
+    def connection(self):
+        """Context manager lending a connection; it is discarded if the server or network failed during use."""
+        connection = self.acquire()
+        try:
+            yield connection
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            self.release(connection, broken=True)
+            raise
+        except BaseException:
+            self.release(connection)
+            raise
+        self.release(connection)
+
+    def fetch_all(self, sql: str, params=None):
+        """Run a small query and return ``(column names, rows)``."""
+        with self.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                columns = [column[0] for column in cursor.description]
+                return columns, cursor.fetchall()
+
+    def iter_batches(self, sql: str, params=None, batch_size: int = Settings.DB_SERVER_CURSOR_BATCH):
+        """
+        Yield the rows of a large scan ``batch_size`` at a time through a server-side cursor.
+
+        The server keeps the result and sends one batch per round trip, so memory stays
+        bounded however many rows match.  The connection is held until the generator is
+        exhausted or closed.
+        """
+        with self.connection() as connection:
+            with connection.cursor(name=f"scan_{uuid.uuid4().hex}") as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(sql, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+
+    def fill(self):
+        """Open connections until ``min_size`` are open; failures are left for the first query to report."""
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                connection = self._open()
+            except RedshiftConnectionError:
+                return
+            self.release(connection)
+
+    def close(self):
+        """Close idle connections; connections still lent out are closed when returned."""
+        with self._condition:
+            self._closed = True
+            idle = [entry[0] for entry in self._idle]
+            self._idle.clear()
+        for connection in idle:
+            self._discard(connection)
+
+    def stats(self):
+        with self._condition:
+            return {
+                "cluster": self.name,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "waiting": self._waiting,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                **self._stats,
+            }
+
+
+def _connect_to(cluster: Cluster):
+    def connect():
+        connection = psycopg2.connect(
+            host=cluster.host,
+            port=cluster.port or Settings.REDSHIFT_PORT,
+            dbname=cluster.database,
+            user=cluster.db_user,
+            password=Settings.REDSHIFT_PASSWORD,
+            connect_timeout=Settings.DB_CONNECT_TIMEOUT,
+            sslmode=Settings.DB_SSLMODE,
+            application_name="redshift-api",
+            keepalives=1,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SET statement_timeout TO %s", (Settings.DB_STATEMENT_TIMEOUT_MS,))
+        connection.commit()
+        return connection
+    return connect
+
+
+_connection_pools = {}
+_connection_pools_lock = threading.Lock()
+
+def get_connection_pool(cluster: Cluster):
+    """Returns the shared pool for ``cluster``, or None when it has no host or direct connections are disabled."""
+    if not Settings.DIRECT_CONNECTIONS_ENABLED or not cluster.host:
+        return None
+    pool = _connection_pools.get(cluster.name)
+    if pool is None:
+        with _connection_pools_lock:
+            pool = _connection_pools.get(cluster.name)
+            if pool is None:
+                pool = ConnectionPool(_connect_to(cluster), name=cluster.name)
+                _connection_pools[cluster.name] = pool
+    return pool
+
+def connection_pool_stats():
+    return [pool.stats() for pool in list(_connection_pools.values())]
+
+def close_connection_pools():
+    for pool in list(_connection_pools.values()):
+        pool.close()
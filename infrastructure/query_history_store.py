@@ -0,0 +1,184 @@
+import os
+import sqlite3
+import threading
+from core.config import Settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_history (
+    query INTEGER PRIMARY KEY,
+    userid INTEGER,
+    database TEXT,
+    starttime TEXT NOT NULL,
+    endtime TEXT,
+    execution_time_ms REAL,
+    aborted INTEGER,
+    querytxt TEXT,
+    fingerprint TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_query_history_starttime ON query_history (starttime, query);
+CREATE INDEX IF NOT EXISTS idx_query_history_execution_time ON query_history (execution_time_ms);
+CREATE TABLE IF NOT EXISTS query_fingerprints (
+    fingerprint TEXT PRIMARY KEY,
+    normalized TEXT NOT NULL,
+    sample TEXT
+);
+CREATE TABLE IF NOT EXISTS watermarks (
+    name TEXT PRIMARY KEY,
+    ts TEXT NOT NULL,
+    query INTEGER NOT NULL
+);
+"""
+
+_COLUMNS = (
+    "query", "userid", "database", "starttime", "endtime", "execution_time_ms", "aborted", "querytxt", "fingerprint",
+)
+
+
+class QueryHistoryStore:
+    """Local SQLite copy of ``stl_query`` with indexes for the query-history endpoints.
+
+    Timestamps are stored as Redshift's ``YYYY-MM-DD HH:MM:SS[.ffffff]`` strings,
+    which sort correctly as text.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(query_history)")}
+            if "fingerprint" not in columns:
+                # Stores created before fingerprinting; old rows are fingerprinted when read.
+                self._conn.execute("ALTER TABLE query_history ADD COLUMN fingerprint TEXT")
+
+    def _query(self, sql: str, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get_watermark(self, name: str = "stl_query"):
+        """Return the ``(timestamp, query_id)`` ingested up to, or None before the first pass."""
+        rows = self._query("SELECT ts, query FROM watermarks WHERE name = ?", (name,))
+        return (rows[0]["ts"], rows[0]["query"]) if rows else None
+
+    def insert_rows(self, rows, watermark, name: str = "stl_query", fingerprints=None):
+        """
+        Upsert a batch of history rows and advance the watermark in one transaction.
+
+        :param fingerprints: (Optional) Mapping of fingerprint id to ``(normalised text, sample query)``.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO query_history ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                [tuple(row.get(column) for column in _COLUMNS) for row in rows],
+            )
+            if fingerprints:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO query_fingerprints (fingerprint, normalized, sample) VALUES (?, ?, ?)",
+                    [(fingerprint, *texts) for fingerprint, texts in fingerprints.items()],
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watermarks (name, ts, query) VALUES (?, ?, ?)",
+                (name, watermark[0], watermark[1]),
+            )
+
+    def get_history(self, start_time: str, end_time: str, limit: int = 10, cursor=None):
+        """
+        Page through history newest first using keyset pagination.
+
+        :param cursor: ``(starttime, query_id)`` of the last row of the previous page.
+        :return: Tuple of (rows, next cursor or None).
+        """
+        sql = "SELECT * FROM query_history WHERE starttime BETWEEN ? AND ?"
+        params = [start_time, end_time]
+        if cursor:
+            sql += " AND (starttime, query) < (?, ?)"
+            params.extend(cursor)
+        sql += " ORDER BY starttime DESC, query DESC LIMIT ?"
+        params.append(limit)
+
+        rows = [dict(row) for row in self._query(sql, params)]
+        next_cursor = (rows[-1]["starttime"], rows[-1]["query"]) if len(rows) == limit else None
+        return rows, next_cursor
+
+    def get_long_running(self, start_time: str, end_time: str, min_execution_ms: float, limit: int = 10):
+        """Return the slowest queries above ``min_execution_ms`` in the time range."""
+        rows = self._query(
+            """
+            SELECT * FROM query_history
+            WHERE execution_time_ms > ? AND starttime BETWEEN ? AND ?
+            ORDER BY execution_time_ms DESC
+            LIMIT ?
+            """,
+            (min_execution_ms, start_time, end_time, limit),
+        )
+        return [dict(row) for row in rows]
+
+    def get_statistics(self, start_time: str, end_time: str):
+        """Return count, average runtime and failed-query count for the time range."""
+        row = self._query(
+            """
+            SELECT COUNT(*) AS total, AVG(execution_time_ms) AS avg_ms, COALESCE(SUM(aborted), 0) AS failed
+            FROM query_history
+            WHERE starttime BETWEEN ? AND ?
+            """,
+            (start_time, end_time),
+        )[0]
+        return row["total"], row["avg_ms"], row["failed"]
+
+    def iter_executions(self, start_time: str, end_time: str, batch_size: int = 10000):
+        """
+        Yield ``(fingerprint, execution_time_ms, querytxt)`` batches for the time range.
+
+        Batches are read with keyset pagination so the lock is only held per batch and
+        memory stays bounded however many rows match. ``querytxt`` is only read for rows
+        ingested before fingerprinting, whose fingerprint is None.
+        """
+        cursor = ("", -1)
+        while True:
+            rows = self._query(
+                """
+                SELECT starttime, query, fingerprint, execution_time_ms,
+                       CASE WHEN fingerprint IS NULL THEN querytxt END AS querytxt
+                FROM query_history
+                WHERE starttime BETWEEN ? AND ? AND (starttime, query) > (?, ?)
+                ORDER BY starttime, query
+                LIMIT ?
+                """,
+                (start_time, end_time, cursor[0], cursor[1], batch_size),
+            )
+            if not rows:
+                return
+            yield [(row["fingerprint"], row["execution_time_ms"], row["querytxt"]) for row in rows]
+            cursor = (rows[-1]["starttime"], rows[-1]["query"])
+            if len(rows) < batch_size:
+                return
+
+    def get_fingerprint_texts(self, fingerprints):
+        """Return ``{fingerprint: (normalised text, sample query)}`` for the given fingerprint ids."""
+        fingerprints = list(fingerprints)
+        texts = {}
+        # Stay under SQLite's default bound-parameter limit.
+        for offset in range(0, len(fingerprints), 500):
+            chunk = fingerprints[offset:offset + 500]
+            rows = self._query(
+                f"SELECT fingerprint, normalized, sample FROM query_fingerprints WHERE fingerprint IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            texts.update((row["fingerprint"], (row["normalized"], row["sample"])) for row in rows)
+        return texts
+
+
+_query_history_store = None
+
+def get_query_history_store():
+    """Returns the process-wide query-history store, or None when it is disabled."""
+    global _query_history_store
+    if not Settings.QUERY_HISTORY_STORE_ENABLED:
+        return None
+    if _query_history_store is None:
+        _query_history_store = QueryHistoryStore(Settings.QUERY_HISTORY_STORE_PATH)
+    return _query_history_store
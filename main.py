@@ -1,13 +1,104 @@
+import time
+
+_import_started = time.perf_counter()
+
+import asyncio
+from core import instrumentation
+
+instrumentation.process_started = _import_started
+
 from fastapi import FastAPI
+from core.clusters import get_cluster_registry
+from core.config import Settings
+from core.dashboard_refresh import dashboards
+from core.middleware import InstrumentationMiddleware
+from infrastructure.aws_clients import get_metrics_fetcher, get_statement_executor, warm_up
+from infrastructure.cost_history_store import get_cost_history_store
+from infrastructure.database import close_connection_pools, get_connection_pool
+from infrastructure.query_history_store import get_query_history_store
+from repositories.cost_history_ingester import CostHistoryIngester
+from repositories.query_history_ingester import QueryHistoryIngester
 from routes.database_routes import router as database_router
 from routes.query_routes import router as query_router
 from routes.cost_routes import router as cost_router
+from routes.system_routes import router as system_router
+from routes.anomaly_routes import router as anomaly_router
+from routes.log_routes import router as log_router
+from routes.metrics_routes import router as metrics_router
 app = FastAPI()
+app.add_middleware(InstrumentationMiddleware)
 
 # Include routers
 app.include_router(database_router, prefix="/api", tags=["Databases"])
 app.include_router(query_router, prefix="/api", tags=["Queries"])
 app.include_router(cost_router, prefix="/api", tags=["Cost"])
+app.include_router(anomaly_router, prefix="/api", tags=["Anomalies"])
+app.include_router(log_router, prefix="/api", tags=["Logs"])
+app.include_router(system_router, prefix="/api", tags=["System"])
+app.include_router(metrics_router, tags=["System"])
+
+query_history_ingester = None
+cost_history_ingester = None
+
+@app.on_event("startup")
+async def start_query_history_ingester():
+    """Keep the local stl_query copy of the default cluster up to date when the history store is enabled."""
+    global query_history_ingester
+    if Settings.QUERY_HISTORY_STORE_ENABLED:
+        cluster = get_cluster_registry().default
+        query_history_ingester = QueryHistoryIngester(
+            get_statement_executor(cluster.region), get_query_history_store(), cluster=cluster,
+        )
+        query_history_ingester.start()
+
+@app.on_event("shutdown")
+async def stop_query_history_ingester():
+    if query_history_ingester is not None:
+        await query_history_ingester.stop()
+
+@app.on_event("startup")
+async def start_cost_history_ingester():
+    """Keep the local EstimatedCharges time series up to date when the cost history store is enabled."""
+    global cost_history_ingester
+    if Settings.COST_HISTORY_STORE_ENABLED:
+        cost_history_ingester = CostHistoryIngester(get_metrics_fetcher(Settings.CLOUDWATCH_REGION), get_cost_history_store())
+        cost_history_ingester.start()
+
+@app.on_event("shutdown")
+async def stop_cost_history_ingester():
+    if cost_history_ingester is not None:
+        await cost_history_ingester.stop()
+
+@app.on_event("startup")
+async def start_dashboard_refresh():
+    """Keep dashboard payloads precomputed when DASHBOARD_REFRESH_ENABLED is set."""
+    dashboards.start()
+
+@app.on_event("shutdown")
+async def stop_dashboard_refresh():
+    await dashboards.stop()
+
+def _warm_up():
+    warm_up()
+    for cluster in get_cluster_registry():
+        pool = get_connection_pool(cluster)
+        if pool is not None:
+            pool.fill()
+    instrumentation.record_startup("warmed_up")
+
+@app.on_event("startup")
+async def start_warm_up():
+    """With STARTUP_WARMUP=background, build the AWS clients and open direct connections while the server is already accepting requests."""
+    if Settings.STARTUP_WARMUP == "background":
+        future = asyncio.get_running_loop().run_in_executor(None, _warm_up)
+        # Nobody awaits the warm-up; a failure just leaves client construction to the first request.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+@app.on_event("shutdown")
+async def close_direct_connections():
+    close_connection_pools()
+
+instrumentation.record_startup("imported")
 
 if __name__ == "__main__":
     import uvicorn
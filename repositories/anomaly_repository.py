@@ -0,0 +1,110 @@
+import math
+import time
+from datetime import datetime, timezone
+from botocore.exceptions import BotoCoreError, ClientError
+from core.clusters import Cluster, get_cluster_registry
+from core.config import Settings
+from core.exceptions import CustomAPIException
+from core.metrics_fetcher import MetricQuery, MetricsFetcher
+
+# Logs Insights returns at most this many rows per query.
+_INSIGHTS_MAX_ROWS = 10000
+
+
+class AnomalyRepository:
+    """Fetches CloudWatch metric series and log-event rates for anomaly detection."""
+
+    def __init__(self, metrics_fetcher: MetricsFetcher, logs_client, cluster: Cluster = None,
+                 logs_query_timeout: float = Settings.ANOMALY_LOGS_QUERY_TIMEOUT):
+        """
+        :param metrics_fetcher: Fetcher for the cluster's region; ``logs_client`` must be for it too.
+        :param cluster: (Optional) Cluster whose metrics are scored by default. Defaults to the registry's default cluster.
+        :param logs_query_timeout: Seconds to wait for a Logs Insights query before stopping it.
+        """
+        self.metrics_fetcher = metrics_fetcher
+        self.logs_client = logs_client
+        self.cluster = cluster or get_cluster_registry().default
+        self.logs_query_timeout = logs_query_timeout
+
+    def get_metric_series(self, metrics, start_time: datetime, end_time: datetime, period: int):
+        """
+        Fetch several metric series in one batched GetMetricData round trip.
+
+        :param metrics: List of ``{"namespace", "metric_name", "dimensions", "stat"}`` dicts.
+        :return: Dict mapping a series label to a list of ``(epoch_seconds, value)`` points.
+        """
+        queries = {}
+        for metric in metrics:
+            dimensions = tuple(sorted(metric.get("dimensions", {}).items()))
+            query = MetricQuery(
+                metric["namespace"], metric["metric_name"], dimensions, metric.get("stat", "Average"), period
+            )
+            label = f"{query.namespace}/{query.metric_name}" + "".join(f" {name}={value}" for name, value in dimensions)
+            queries[label] = query
+
+        try:
+            series = self.metrics_fetcher.fetch(queries.values(), start_time, end_time)
+        except (BotoCoreError, ClientError) as e:
+            raise CustomAPIException(f"Failed to fetch metric series: {str(e)}")
+
+        return {
+            label: [(timestamp.timestamp(), value) for timestamp, value in series[query]]
+            for label, query in queries.items()
+        }
+
+    def get_log_event_rates(self, log_group_names, start_time: datetime, end_time: datetime, period: int):
+        """
+        Count log events per time bin for each log group with a single Logs Insights query.
+
+        The bin is widened when needed so the result fits in one Insights response. A query
+        still scheduled or running after ``logs_query_timeout`` seconds is stopped (HTTP 504).
+
+        :return: Tuple of (dict mapping ``logs:<group>`` to ``(epoch_seconds, count)`` points, bin seconds).
+        """
+        window = (end_time - start_time).total_seconds()
+        bin_seconds = max(period, math.ceil(window * len(log_group_names) / _INSIGHTS_MAX_ROWS / 60) * 60)
+
+        try:
+            query_id = self.logs_client.start_query(
+                logGroupNames=list(log_group_names),
+                startTime=int(start_time.timestamp()),
+                endTime=int(end_time.timestamp()),
+                queryString=f"stats count(*) as events by @log, bin({bin_seconds}s) as slot",
+                limit=_INSIGHTS_MAX_ROWS,
+            )["queryId"]
+
+            deadline = time.monotonic() + self.logs_query_timeout
+            interval = 0.25
+            while True:
+                response = self.logs_client.get_query_results(queryId=query_id)
+                if response["status"] not in ("Scheduled", "Running"):
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stop_query(query_id)
+                    raise CustomAPIException(
+                        f"Log event rate query did not finish within {self.logs_query_timeout}s", status_code=504
+                    )
+                time.sleep(min(interval, remaining))
+                interval = min(interval * 1.5, 2.0)
+        except (BotoCoreError, ClientError) as e:
+            raise CustomAPIException(f"Failed to fetch log event rates: {str(e)}")
+
+        if response["status"] != "Complete":
+            raise CustomAPIException(f"Log event rate query {response['status'].lower()}")
+
+        series = {f"logs:{name}": [] for name in log_group_names}
+        for row in response["results"]:
+            fields = {field["field"]: field["value"] for field in row}
+            group = fields["@log"].split(":", 1)[-1]
+            slot = datetime.strptime(fields["slot"], "%Y-%m-%d %H:%M:%S.%f").replace(tzinfo=timezone.utc)
+            series.setdefault(f"logs:{group}", []).append((slot.timestamp(), float(fields["events"])))
+        return series, bin_seconds
+
+    def _stop_query(self, query_id: str):
+        """Stop an abandoned Insights query so it stops counting against the account's concurrent-query quota."""
+        try:
+            self.logs_client.stop_query(queryId=query_id)
+        except (BotoCoreError, ClientError):
+            # It may have finished or failed in the meantime; the caller gets a 504 either way.
+            pass
@@ -0,0 +1,87 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from core.config import Settings
+from core.metrics_fetcher import MetricsFetcher
+from infrastructure.cost_history_store import CostHistoryStore
+from repositories.cost_repository import billing_queries
+
+# EstimatedCharges datapoints can land a few hours after their timestamp, so each
+# pass re-reads this much before the watermark; the store skips samples it already has.
+_OVERLAP = timedelta(hours=6)
+
+
+class CostHistoryIngester:
+    """Copies new hourly ``EstimatedCharges`` samples into the local cost store on an interval.
+
+    The first pass backfills ``COST_HISTORY_BACKFILL_MONTHS`` whole months; later
+    passes only fetch what arrived since the stored watermark.
+    """
+
+    def __init__(
+        self,
+        metrics_fetcher: MetricsFetcher,
+        store: CostHistoryStore,
+        interval: float = Settings.COST_HISTORY_INGEST_INTERVAL,
+        backfill_months: int = Settings.COST_HISTORY_BACKFILL_MONTHS,
+    ):
+        self.metrics_fetcher = metrics_fetcher
+        self.store = store
+        self.interval = interval
+        self.backfill_months = backfill_months
+        self.samples_ingested = 0
+        self.last_run = None
+        self.last_error = None
+        self._task = None
+
+    def _ingest(self) -> int:
+        end_time = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        watermark = self.store.get_watermark()
+        if watermark is None:
+            # Start on a month boundary so the first month-to-date sample is a real increment.
+            start = end_time.replace(day=1)
+            for _ in range(self.backfill_months):
+                start = (start - timedelta(days=1)).replace(day=1)
+            start_time = start
+        else:
+            start_time = datetime.fromtimestamp(watermark, tz=timezone.utc) - _OVERLAP
+
+        series = self.metrics_fetcher.fetch(billing_queries(self.metrics_fetcher, 3600), start_time, end_time)
+        samples = {}
+        for query, points in series.items():
+            service = dict(query.dimensions)["ServiceName"]
+            samples.setdefault(service, []).extend((int(ts.timestamp()), value) for ts, value in points)
+        return self.store.add_samples(samples, int(end_time.timestamp()))
+
+    async def ingest_once(self) -> int:
+        """Fetch and store samples since the watermark; returns the number of new samples."""
+        stored = await asyncio.get_running_loop().run_in_executor(None, self._ingest)
+        self.samples_ingested += stored
+        self.last_run = datetime.utcnow()
+        return stored
+
+    async def run(self):
+        """Ingest forever, sleeping ``interval`` seconds between passes."""
+        while True:
+            try:
+                await self.ingest_once()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start the background ingestion task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_event_loop().create_task(self.run())
+
+    async def stop(self):
+        """Cancel the background ingestion task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,36 +1,98 @@
-import boto3
+import asyncio
 from botocore.exceptions import BotoCoreError, ClientError
-from datetime import datetime, timedelta
-from core.exceptions import CustomAPIException
+from datetime import datetime, timedelta, timezone
+from core.cache import AsyncTTLCache, TTLCache
+from core.clusters import Cluster, get_cluster_registry
+from core.config import Settings
+from core.cost_attribution import CostAttribution, CostModel
+from core.exceptions import CustomAPIException, QueryExecutionError, QueryTimeoutError
+from core.instrumentation import phase
+from core.metrics_fetcher import MetricQuery, MetricsFetcher
 from core.response import error_response
-from core.cloudwatch_client import CloudWatchClient
+from core.result_encoding import field_value
+from core.statement_executor import StatementExecutor
+from infrastructure.cost_history_store import DAY, HOUR, MONTH, RESOLUTIONS, CostHistoryStore, month_start
+
+cost_cache = TTLCache("cost", stale_ttl=Settings.COST_CACHE_STALE_TTL)
+cost_attribution_cache = AsyncTTLCache("cost_attribution", stale_ttl=Settings.COST_CACHE_STALE_TTL)
+
+# Execution time comes from stl_wlm_query, which excludes time spent queued for a slot;
+# queries that bypassed WLM (e.g. short query acceleration) fall back to stl_query.
+_ATTRIBUTION_SQL = """
+    SELECT q.query, TRIM(u.usename) AS usename, TRIM(q.querytxt) AS querytxt,
+           COALESCE(w.total_exec_time / 1000.0, DATEDIFF(microsecond, q.starttime, q.endtime) / 1000.0) AS execution_time_ms,
+           COALESCE(w.slot_count, 1) AS slot_count
+    FROM stl_query q
+    LEFT JOIN stl_wlm_query w ON w.query = q.query
+    LEFT JOIN pg_user u ON u.usesysid = q.userid
+    WHERE q.userid > 1
+    AND q.starttime BETWEEN :start_time AND :end_time
+"""
+
+def billing_queries(metrics_fetcher: MetricsFetcher, period: int):
+    """One ``EstimatedCharges`` series per AWS service, as listed in the billing region."""
+    queries = []
+    paginator = metrics_fetcher.client.get_paginator("list_metrics")
+    for page in paginator.paginate(Namespace="AWS/Billing", MetricName="EstimatedCharges"):
+        for metric in page["Metrics"]:
+            dimensions = {d["Name"]: d["Value"] for d in metric["Dimensions"]}
+            if set(dimensions) == {"ServiceName", "Currency"}:
+                queries.append(MetricQuery(
+                    "AWS/Billing", "EstimatedCharges", tuple(sorted(dimensions.items())), "Maximum", period
+                ))
+    return queries
 
 class CostRepository:
-    def __init__(self):
-        """Initialize with an AWS CloudWatch client."""
-        self.cloudwatch_client = CloudWatchClient()
+    def __init__(
+        self,
+        metrics_fetcher: MetricsFetcher,
+        billing_metrics_fetcher: MetricsFetcher,
+        statement_executor: StatementExecutor = None,
+        cache: TTLCache = cost_cache,
+        attribution_cache: AsyncTTLCache = cost_attribution_cache,
+        history_store: CostHistoryStore = None,
+        cluster: Cluster = None,
+    ):
+        """
+        Initialize with CloudWatch metrics fetchers, the Redshift statement executor and the shared cost caches.
+
+        :param metrics_fetcher: Fetcher for the Redshift cluster's region.
+        :param billing_metrics_fetcher: Fetcher for the region holding ``AWS/Billing`` metrics (us-east-1).
+        :param statement_executor: Executor used to read ``stl_query`` for per-query cost attribution.
+        :param cluster: (Optional) Cluster whose queries are attributed; defaults to the registry's default.
+        :param history_store: (Optional) Local cost time series; when given, cost totals and history are read from it.
+        """
+        self.metrics_fetcher = metrics_fetcher
+        self.billing_metrics_fetcher = billing_metrics_fetcher
+        self.statement_executor = statement_executor
+        self.cache = cache
+        self.attribution_cache = attribution_cache
+        self.history_store = history_store
+        self.cluster = cluster or get_cluster_registry().default
+        self.cost_model = CostModel(Settings.COST_NODE_HOUR_PRICE, Settings.COST_NODE_COUNT, Settings.COST_WLM_SLOTS)
 
     def get_total_cost(self):
-        """Fetch the total AWS cost for each service using CloudWatch metrics."""
+        """Fetch the total AWS cost for each service, cached for ``COST_TOTAL_TTL`` seconds."""
+        if self.history_store is not None:
+            return self._get_total_cost_from_store()
+        return self.cache.get_or_load("total_cost", self._fetch_total_cost, Settings.COST_TOTAL_TTL)
+
+    def _fetch_total_cost(self):
+        """Fetch the month-to-date AWS cost for each service using CloudWatch billing metrics."""
         try:
-            response = self.cloudwatch_client.get_metric_statistics(
-                Namespace="AWS/Usage",
-                MetricName="EstimatedCharges",
-                Dimensions=[{"Name": "ServiceName"}],  # Fetch for all services
-                StartTime=datetime.utcnow() - timedelta(days=30),
-                EndTime=datetime.utcnow(),
-                Period=86400,  # 1-day intervals
-                Statistics=["Maximum"],
-                Unit="None"
-            )
+            # One EstimatedCharges series per service; all of them are fetched in a single batch.
+            queries = billing_queries(self.billing_metrics_fetcher, 86400)  # 1-day intervals
 
-            if not response.get("Datapoints"):
-                return {"total_cost": 0.0, "service_costs": {}, "message": "No cost data available."}
+            end_time = datetime.utcnow()
+            series = self.billing_metrics_fetcher.fetch(queries, end_time - timedelta(days=30), end_time)
 
             service_costs = {}
-            for point in response["Datapoints"]:
-                service_name = point.get("ServiceName", "Unknown")
-                service_costs[service_name] = round(point["Maximum"], 2)
+            for query, points in series.items():
+                if points:
+                    service_costs[dict(query.dimensions)["ServiceName"]] = round(points[-1][1], 2)
+
+            if not service_costs:
+                return {"total_cost": 0.0, "service_costs": {}, "message": "No cost data available."}
 
             total_cost = sum(service_costs.values())
 
@@ -42,28 +104,150 @@ class CostRepository:
         except (BotoCoreError, ClientError) as e:
             raise CustomAPIException(f"Failed to fetch AWS cost breakdown: {str(e)}")
 
-    def get_top_queries(self):
-        """Fetch most expensive queries based on execution time and cost."""
+    def _get_total_cost_from_store(self):
+        """Month-to-date cost per service from the local monthly rollup."""
+        now = int(datetime.now(timezone.utc).timestamp())
+        service_costs = {
+            service: round(cost, 2)
+            for service, cost in self.history_store.get_totals(MONTH, now, now + 1).items()
+        }
+        if not service_costs:
+            return {"total_cost": 0.0, "service_costs": {}, "message": "No cost data available."}
+        return {"total_cost": round(sum(service_costs.values()), 2), "service_costs": service_costs}
+
+    def _require_history_store(self):
+        if self.history_store is None:
+            raise CustomAPIException("Cost history is not enabled; set COST_HISTORY_STORE_ENABLED=true.", status_code=404)
+
+    def get_cost_history(self, days: int = 30, resolution: str = DAY):
+        """
+        Cost per service over the last ``days`` days from the local time series.
+
+        :param days: Length of the window, ending now.
+        :param resolution: Bucket size: hour, day or month.
+        :return: Per-bucket series and per-service totals for the window.
+        """
+        self._require_history_store()
+        if resolution not in RESOLUTIONS:
+            raise CustomAPIException(f"resolution must be one of {', '.join(RESOLUTIONS)}")
+
+        end = int(datetime.now(timezone.utc).timestamp())
+        start = end - days * 86400
+        series = self.history_store.get_series(resolution, start, end + 1)
+        # Totals come from the finest rollup that still covers the window.
+        earliest = self.history_store.earliest(HOUR)
+        totals_resolution = HOUR if earliest is not None and earliest <= start else DAY
+        service_costs = self.history_store.get_totals(totals_resolution, start, end + 1)
+        return {
+            "start_time": datetime.utcfromtimestamp(start).isoformat(),
+            "end_time": datetime.utcfromtimestamp(end).isoformat(),
+            "resolution": resolution,
+            "total_cost": round(sum(service_costs.values()), 2),
+            "service_costs": {service: round(cost, 2) for service, cost in service_costs.items()},
+            "series": [
+                {
+                    "timestamp": datetime.utcfromtimestamp(bucket).isoformat(),
+                    "total_cost": round(sum(costs.values()), 2),
+                    "service_costs": {service: round(cost, 2) for service, cost in costs.items()},
+                }
+                for bucket, costs in series
+            ],
+        }
+
+    def get_month_over_month(self):
+        """
+        Compare month-to-date cost per service with the same days of the previous month.
+
+        :return: Current and previous month-to-date cost, the previous month's total and the change.
+        """
+        self._require_history_store()
+        now = int(datetime.now(timezone.utc).timestamp())
+        current_start = month_start(now)
+        previous_start = month_start(current_start - 1)
+        # Same elapsed time into the previous month, capped at its end (e.g. 31 March vs February).
+        previous_end = min(previous_start + (now - current_start), current_start)
+
+        current = self.history_store.get_totals(DAY, current_start, now + 1)
+        previous = self.history_store.get_totals(DAY, previous_start, previous_end)
+        previous_total = self.history_store.get_totals(MONTH, previous_start, current_start)
+
+        services = {}
+        for service in sorted(set(current) | set(previous) | set(previous_total)):
+            services[service] = self._compare(current.get(service, 0.0), previous.get(service, 0.0))
+            services[service]["previous_month_total"] = round(previous_total.get(service, 0.0), 2)
+        return {
+            "month": datetime.utcfromtimestamp(current_start).strftime("%Y-%m"),
+            "previous_month": datetime.utcfromtimestamp(previous_start).strftime("%Y-%m"),
+            **self._compare(sum(current.values()), sum(previous.values())),
+            "previous_month_total": round(sum(previous_total.values()), 2),
+            "services": services,
+        }
+
+    @staticmethod
+    def _compare(current: float, previous: float):
+        return {
+            "month_to_date": round(current, 2),
+            "previous_month_to_date": round(previous, 2),
+            "change": round(current - previous, 2),
+            "change_pct": round((current - previous) / previous * 100, 2) if previous else None,
+        }
+
+    async def get_top_queries(self, start_time=None, end_time=None, limit=10):
+        """
+        Fetch the most expensive queries, users and query fingerprints, cached for ``COST_TOP_QUERIES_TTL`` seconds.
+
+        :param start_time: (Optional) Start of the window; defaults to ``COST_TOP_QUERIES_DAYS`` ago.
+        :param end_time: (Optional) End of the window; defaults to now.
+        :param limit: Number of entries in each ranking.
+        """
+        return await self.attribution_cache.get_or_load(
+            (self.cluster.name, start_time, end_time, limit),
+            lambda: self._fetch_top_queries(start_time, end_time, limit),
+            Settings.COST_TOP_QUERIES_TTL,
+        )
+
+    async def _fetch_top_queries(self, start_time, end_time, limit):
+        """Estimate the cost of every query in the window and keep the top ``limit`` of each ranking."""
         try:
-            response = self.cloudwatch_client.get_metric_statistics(
-                Namespace="AWS/Redshift",
-                MetricName="QueryRuntime",
-                Dimensions=[{"Name": "ClusterIdentifier", "Value": "your-cluster-id"}],
-                StartTime=datetime.utcnow() - timedelta(days=7),
-                EndTime=datetime.utcnow(),
-                Period=3600,  # 1-hour intervals
-                Statistics=["Maximum"],
-                Unit="Seconds"
+            end = datetime.fromisoformat(end_time) if end_time else datetime.utcnow()
+            start = datetime.fromisoformat(start_time) if start_time else end - timedelta(days=Settings.COST_TOP_QUERIES_DAYS)
+        except ValueError as e:
+            raise CustomAPIException(f"Invalid time range: {str(e)}")
+
+        try:
+            status = await self.statement_executor.run(
+                _ATTRIBUTION_SQL,
+                ClusterIdentifier=self.cluster.cluster_id,
+                Database=self.cluster.database,
+                DbUser=self.cluster.db_user,
+                Parameters=[
+                    {"name": "start_time", "value": start.strftime("%Y-%m-%d %H:%M:%S"), "typeHint": "TIMESTAMP"},
+                    {"name": "end_time", "value": end.strftime("%Y-%m-%d %H:%M:%S"), "typeHint": "TIMESTAMP"},
+                ],
             )
 
-            if not response.get("Datapoints"):
-                return {"top_queries": [], "message": "No query cost data available."}
+            attribution = CostAttribution(self.cost_model, limit, Settings.QUERY_FINGERPRINT_MAX)
+
+            def add_page(records):
+                for record in records:
+                    attribution.add(*(field_value(field) for field in record))
 
-            sorted_queries = sorted(response["Datapoints"], key=lambda x: x["Maximum"], reverse=True)
-            top_queries = sorted_queries[:5]  # Get top 5 expensive queries
+            # Pages are folded in as they arrive, so memory stays bounded by the page size and ``limit``.
+            loop = asyncio.get_running_loop()
+            async for page in self.statement_executor.iter_result_pages(status["Id"]):
+                with phase("decode"):
+                    await loop.run_in_executor(None, add_page, page["Records"])
 
-            return {"top_queries": [{"runtime": q["Maximum"], "timestamp": q["Timestamp"]} for q in top_queries]}
+            return {
+                "start_time": start.strftime("%Y-%m-%d %H:%M:%S"),
+                "end_time": end.strftime("%Y-%m-%d %H:%M:%S"),
+                **attribution.report(),
+            }
 
+        except QueryTimeoutError as e:
+            raise CustomAPIException(f"Failed to fetch top queries: {str(e)}", status_code=504)
+        except QueryExecutionError as e:
+            raise CustomAPIException(f"Failed to fetch top queries: {str(e)}")
         except (BotoCoreError, ClientError) as e:
             raise CustomAPIException(f"Failed to fetch top queries: {str(e)}")
 
@@ -1,16 +1,130 @@
-from core.exceptions import QueryExecutionError
-from core.redshift_client import RedshiftDataClient
+from botocore.exceptions import BotoCoreError, ClientError
+from core.cache import AsyncTTLCache
+from core.catalog_index import TableNameIndex
+from core.clusters import Cluster, get_cluster_registry
+from core.config import Settings
+from core.exceptions import CustomAPIException
+from core.statement_executor import StatementExecutor
+
+catalog_cache = AsyncTTLCache("catalog", stale_ttl=Settings.CATALOG_STALE_TTL)
+# One table-name index per cluster name.
+table_indexes = {}
+
 class DatabaseRepository:
-    """Handles database queries related to Redshift."""
+    """Handles database queries related to Redshift.
+
+    Catalog listings are kept in an in-process index that is filled lazily one
+    level (databases, schemas, tables) at a time and refreshed in the background
+    once ``CATALOG_TTL`` has passed.  Cache keys start with the cluster name, so
+    several clusters share the cache without colliding.
+    """
+
+    def __init__(self, statement_executor: StatementExecutor, cache: AsyncTTLCache = catalog_cache,
+                 index: TableNameIndex = None, cluster: Cluster = None):
+        self.statement_executor = statement_executor
+        self.cache = cache
+        self.cluster = cluster or get_cluster_registry().default
+        self.index = index if index is not None else table_indexes.setdefault(self.cluster.name, TableNameIndex())
+
+    def _target(self, database: str = None):
+        return {
+            "ClusterIdentifier": self.cluster.cluster_id,
+            "Database": database or self.cluster.database,
+            "DbUser": self.cluster.db_user,
+        }
 
-    def __init__(self):
-        self.redshift_client = RedshiftDataClient()
+    async def _list(self, method: str, result_key: str, **kwargs):
+        """Call a paginated Data API catalog method and collect every page."""
+        items = []
+        while True:
+            response = await self.statement_executor.call(method, **kwargs)
+            items.extend(response[result_key])
+            if not response.get("NextToken"):
+                return items
+            kwargs["NextToken"] = response["NextToken"]
 
-    def fetch_all_databases(self):
+    async def fetch_all_databases(self):
         """Fetch all databases in Redshift."""
         try:
-            query = "SELECT datname FROM pg_database;"
-            response = self.redshift_client.execute_statement(Database="dev", Sql=query)
-            return response['Records']
-        except Exception as e:
-            raise QueryExecutionError(f"Error fetching databases: {str(e)}")
+            return await self.cache.get_or_load((self.cluster.name, "databases"), self._load_databases, Settings.CATALOG_TTL)
+        except (BotoCoreError, ClientError) as e:
+            raise CustomAPIException(f"Failed to fetch databases: {str(e)}")
+
+    async def fetch_schemas(self, database_name: str):
+        """Fetch schemas in a database."""
+        try:
+            return await self.cache.get_or_load(
+                (self.cluster.name, "schemas", database_name), lambda: self._load_schemas(database_name), Settings.CATALOG_TTL
+            )
+        except (BotoCoreError, ClientError) as e:
+            raise CustomAPIException(f"Failed to fetch schemas: {str(e)}")
+
+    async def fetch_tables(self, database_name: str, schema_name: str):
+        """Fetch tables in a schema."""
+        try:
+            return await self.cache.get_or_load(
+                (self.cluster.name, "tables", database_name, schema_name),
+                lambda: self._load_tables(database_name, schema_name),
+                Settings.CATALOG_TTL,
+            )
+        except (BotoCoreError, ClientError) as e:
+            raise CustomAPIException(f"Failed to fetch tables: {str(e)}")
+
+    async def search_tables(self, prefix: str, database_name: str = None, limit: int = 50):
+        """
+        Prefix-search table names held in memory.
+
+        When a database is given, all of its tables are loaded in one listing first
+        (once per TTL), so the search covers schemas that were never browsed.
+        """
+        if database_name:
+            try:
+                await self.cache.get_or_load(
+                    (self.cluster.name, "all_tables", database_name), lambda: self._load_all_tables(database_name), Settings.CATALOG_TTL
+                )
+            except (BotoCoreError, ClientError) as e:
+                raise CustomAPIException(f"Failed to fetch tables: {str(e)}")
+        return self.index.search(prefix, database_name, limit)
+
+    def invalidate(self, database_name: str = None, schema_name: str = None):
+        """Drop this cluster's cached catalog entries for a schema, a database, or everything."""
+        if schema_name is not None and database_name is None:
+            raise CustomAPIException("A schema can only be invalidated together with its database.")
+
+        def matches(key):
+            if key[0] != self.cluster.name:
+                return False
+            key = key[1:]
+            if database_name is None:
+                return True
+            if key[0] == "databases" or len(key) < 2 or key[1] != database_name:
+                return False
+            return schema_name is None or key[0] == "all_tables" or (len(key) > 2 and key[2] == schema_name)
+
+        self.cache.invalidate(matches)
+        self.index.remove(
+            lambda key: database_name is None or (key[0] == database_name and schema_name in (None, key[1]))
+        )
+
+    async def _load_databases(self):
+        return await self._list("list_databases", "Databases", **self._target())
+
+    async def _load_schemas(self, database_name: str):
+        return await self._list("list_schemas", "Schemas", **self._target(database_name))
+
+    async def _load_tables(self, database_name: str, schema_name: str):
+        tables = await self._list(
+            "list_tables", "Tables", SchemaPattern=schema_name, **self._target(database_name)
+        )
+        tables = [{"name": t["name"], "type": t.get("type")} for t in tables if t.get("schema") == schema_name]
+        self.index.update(database_name, schema_name, tables)
+        return tables
+
+    async def _load_all_tables(self, database_name: str):
+        tables = await self._list("list_tables", "Tables", **self._target(database_name))
+        by_schema = {}
+        for table in tables:
+            by_schema.setdefault(table["schema"], []).append({"name": table["name"], "type": table.get("type")})
+        for schema_name, schema_tables in by_schema.items():
+            self.index.update(database_name, schema_name, schema_tables)
+        return len(tables)
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from core.cloudwatch_client import CloudWatchClient
+from core.config import Settings
+
+# Cursor prefix for resuming a filtered stream from an event timestamp: ``ts:<epoch ms>:<event ids>``,
+# the ids (comma-separated) being those already returned at that millisecond.
+TIMESTAMP_CURSOR = "ts:"
+
+
+def _timestamp_cursor(timestamp: int, event_ids) -> str:
+    return f"{TIMESTAMP_CURSOR}{timestamp}:{','.join(sorted(event_ids))}"
+
+
+def _parse_timestamp_cursor(cursor: str):
+    timestamp, _, event_ids = cursor[len(TIMESTAMP_CURSOR):].partition(":")
+    return int(timestamp), set(filter(None, event_ids.split(",")))
+
+
+def _ended(end_time) -> bool:
+    """Whether the wall clock has passed ``end_time`` (epoch ms), so following can stop."""
+    return end_time is not None and time.time() * 1000 > end_time
+
+
+class LogRepository:
+    """Pages through CloudWatch Logs lazily, optionally following for new events."""
+
+    def __init__(self, cloudwatch_client: CloudWatchClient):
+        self.cloudwatch_client = cloudwatch_client
+
+    def stream_events(self, log_group, log_stream=None, filter_pattern=None, start_time=None,
+                      end_time=None, cursor=None, follow=False):
+        """
+        Return an async iterator of ``(events, cursor)`` pages.
+
+        A single stream without a filter is read with ``get_log_events``; anything else
+        uses ``filter_log_events``. Only one page is held at a time, and passing the last
+        cursor back resumes where the previous stream stopped.
+
+        :param start_time: (Optional) Epoch milliseconds to start from when no cursor is given.
+        :param end_time: (Optional) Epoch milliseconds to stop at.
+        :param follow: Keep polling for new events once the end is reached, until the clock passes ``end_time``
+            (the poll after that still picks up events ingested late).
+        """
+        if log_stream and not filter_pattern:
+            return self._stream_pages(log_group, log_stream, start_time, end_time, cursor, follow)
+        return self._filter_pages(
+            log_group, filter_pattern, [log_stream] if log_stream else None, start_time, end_time, cursor, follow
+        )
+
+    async def _stream_pages(self, log_group, log_stream, start_time, end_time, cursor, follow):
+        loop = asyncio.get_running_loop()
+        interval = Settings.LOG_FOLLOW_POLL_MIN
+        token = cursor
+        while True:
+            events, next_token = await loop.run_in_executor(
+                None, self.cloudwatch_client.get_log_events_page,
+                log_group, log_stream, token, None if token else start_time, end_time,
+            )
+            if events:
+                yield events, next_token
+                interval = Settings.LOG_FOLLOW_POLL_MIN
+
+            # get_log_events hands back the token it was given once the stream is exhausted.
+            at_end = next_token == token
+            token = next_token
+            if at_end:
+                if not follow or _ended(end_time):
+                    return
+                await asyncio.sleep(interval)
+                interval = min(interval * 2, Settings.LOG_FOLLOW_POLL_MAX)
+
+    async def _filter_pages(self, log_group, filter_pattern, log_stream_names, start_time, end_time, cursor, follow):
+        loop = asyncio.get_running_loop()
+        interval = Settings.LOG_FOLLOW_POLL_MIN
+        token = None
+        since = start_time
+        # Ids of events at the newest timestamp seen, so re-polling from that
+        # millisecond (here or after resuming from a cursor) does not repeat them.
+        seen_ids = set()
+        if cursor and cursor.startswith(TIMESTAMP_CURSOR):
+            since, seen_ids = _parse_timestamp_cursor(cursor)
+        elif cursor:
+            token = cursor
+        last_timestamp = since or 0
+        while True:
+            events, next_token = await loop.run_in_executor(
+                None, self.cloudwatch_client.filter_log_events_page,
+                log_group, filter_pattern, log_stream_names, token, since, end_time,
+            )
+            fresh = [event for event in events if event["eventId"] not in seen_ids]
+            for event in fresh:
+                if event["timestamp"] > last_timestamp:
+                    last_timestamp = event["timestamp"]
+                    seen_ids = {event["eventId"]}
+                elif event["timestamp"] == last_timestamp:
+                    seen_ids.add(event["eventId"])
+            if fresh:
+                yield fresh, next_token or _timestamp_cursor(last_timestamp, seen_ids)
+                interval = Settings.LOG_FOLLOW_POLL_MIN
+
+            if next_token:
+                token = next_token
+                continue
+            if not follow or _ended(end_time):
+                return
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, Settings.LOG_FOLLOW_POLL_MAX)
+            token = None
+            since = last_timestamp
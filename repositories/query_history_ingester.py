@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime, timedelta
+from core.clusters import Cluster, get_cluster_registry
+from core.config import Settings
+from core.result_encoding import decode_rows
+from core.sql import fingerprint_sql
+from core.statement_executor import StatementExecutor
+from infrastructure.query_history_store import QueryHistoryStore
+
+# stl_query rows are written when a query completes, so ``endtime`` (not ``starttime``)
+# is the column that only moves forward and is safe to use as the watermark.
+_INGEST_SQL = """
+    SELECT query, userid, TRIM(database) AS database, starttime, endtime,
+           DATEDIFF(microsecond, starttime, endtime) / 1000.0 AS execution_time_ms,
+           aborted, TRIM(querytxt) AS querytxt
+    FROM stl_query
+    WHERE userid > 1
+    AND (endtime > :ts OR (endtime = :ts AND query > :query))
+    ORDER BY endtime, query
+    LIMIT {limit}
+"""
+
+
+class QueryHistoryIngester:
+    """Copies new ``stl_query`` rows of one cluster (the default) into the local history store on an interval.
+
+    Each pass resumes from the stored ``(endtime, query)`` watermark, so only rows
+    that completed since the previous pass are fetched from Redshift.
+    """
+
+    def __init__(
+        self,
+        statement_executor: StatementExecutor,
+        store: QueryHistoryStore,
+        interval: float = Settings.QUERY_HISTORY_INGEST_INTERVAL,
+        batch_size: int = Settings.QUERY_HISTORY_INGEST_BATCH,
+        cluster: Cluster = None,
+    ):
+        self.statement_executor = statement_executor
+        self.cluster = cluster or get_cluster_registry().default
+        self.store = store
+        self.interval = interval
+        self.batch_size = batch_size
+        self.rows_ingested = 0
+        self.last_run = None
+        self.last_error = None
+        self._task = None
+
+    async def ingest_once(self) -> int:
+        """Fetch and store all rows past the watermark; returns the number of rows ingested."""
+        loop = asyncio.get_running_loop()
+        watermark = await loop.run_in_executor(None, self.store.get_watermark)
+        if watermark is None:
+            since = datetime.utcnow() - timedelta(days=Settings.QUERY_HISTORY_BACKFILL_DAYS)
+            watermark = (since.strftime("%Y-%m-%d %H:%M:%S"), -1)
+
+        total = 0
+        while True:
+            status = await self.statement_executor.run(
+                _INGEST_SQL.format(limit=self.batch_size),
+                ClusterIdentifier=self.cluster.cluster_id,
+                Database=self.cluster.database,
+                DbUser=self.cluster.db_user,
+                Parameters=[
+                    {"name": "ts", "value": watermark[0], "typeHint": "TIMESTAMP"},
+                    {"name": "query", "value": str(watermark[1])},
+                ],
+            )
+
+            fetched = 0
+            column_names = None
+            async for page in self.statement_executor.iter_result_pages(status["Id"]):
+                if column_names is None:
+                    column_names = [column["name"] for column in page["ColumnMetadata"]]
+                rows = decode_rows(column_names, page["Records"])
+                if not rows:
+                    continue
+                for row in rows:
+                    row["execution_time_ms"] = float(row["execution_time_ms"] or 0)
+                    row["aborted"] = int(row["aborted"] or 0)
+                watermark = (rows[-1]["endtime"], rows[-1]["query"])
+                await loop.run_in_executor(None, self._store_rows, rows, watermark)
+                fetched += len(rows)
+
+            total += fetched
+            if fetched < self.batch_size:
+                break
+
+        self.rows_ingested += total
+        self.last_run = datetime.utcnow()
+        return total
+
+    def _store_rows(self, rows, watermark):
+        # Fingerprinting is CPU-bound, so it runs here in the worker thread rather than on the event loop.
+        fingerprints = {}
+        for row in rows:
+            fingerprint, normalized = fingerprint_sql(row["querytxt"] or "")
+            row["fingerprint"] = fingerprint
+            fingerprints.setdefault(fingerprint, (normalized, row["querytxt"]))
+        self.store.insert_rows(rows, watermark, fingerprints=fingerprints)
+
+    async def run(self):
+        """Ingest forever, sleeping ``interval`` seconds between passes."""
+        while True:
+            try:
+                await self.ingest_once()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start the background ingestion task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_event_loop().create_task(self.run())
+
+    async def stop(self):
+        """Cancel the background ingestion task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
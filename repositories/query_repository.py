@@ -1,192 +1,761 @@
-import boto3
-import psycopg2
+import asyncio
+import json
+import time
 from botocore.exceptions import BotoCoreError, ClientError
-from psycopg2 import OperationalError, DatabaseError
 from datetime import datetime, timedelta
-from core.exceptions import CustomAPIException
+from core.cache import AsyncSingleFlight, ByteLRUCache
+from core.clusters import Cluster, get_cluster_registry
+from core.config import Settings
+from core.exceptions import CustomAPIException, QueryExecutionError, QueryTimeoutError, RedshiftConnectionError
+from core.instrumentation import STATEMENTS_COALESCED, phase
+from core.lazy import lazy_import
+from core.metrics_fetcher import MetricsFetcher, redshift_query_runtime
+from core.query_fingerprints import ORDER_BY, FingerprintAggregator
+from core.query_jobs import QueryJob, QueryJobRegistry
 from core.response import error_response
-from core.redshift_client import RedshiftDataClient
-from core.cloudwatch_client import CloudWatchClient
+from core import result_export
+from core.result_encoding import ARROW, COLUMNAR, ROWS, ColumnarBuilder, decode_rows, field_value
+from core.sql import is_read_only, normalize_sql, pyformat_sql
+from core.statement_executor import StatementExecutor
+from infrastructure.database import ConnectionPool
+from infrastructure.query_history_store import QueryHistoryStore
+
+psycopg2 = lazy_import("psycopg2")
+
+# System-table lookups shared by the direct-connection and Data API engines (``:name`` parameters).
+_EXECUTION_MS = "DATEDIFF(microsecond, starttime, endtime) / 1000.0"
+_LONG_RUNNING_SQL = f"""
+    SELECT query, userid, starttime, {_EXECUTION_MS} AS execution_time_ms
+    FROM stl_query
+    WHERE userid > 1
+    AND starttime BETWEEN :start_time AND :end_time
+    AND {_EXECUTION_MS} > :min_execution_ms
+    ORDER BY execution_time_ms DESC
+    LIMIT {{limit}}
+"""
+_STATISTICS_SQL = f"""
+    SELECT COUNT(*) AS total, AVG({_EXECUTION_MS}) AS avg_ms,
+           COALESCE(SUM(CASE WHEN aborted = 1 THEN 1 ELSE 0 END), 0) AS failed
+    FROM stl_query
+    WHERE userid > 1
+    AND starttime BETWEEN :start_time AND :end_time
+"""
+_HISTORY_SQL = f"""
+    SELECT query, starttime, endtime, {_EXECUTION_MS} AS execution_time_ms, TRIM(querytxt) AS querytxt, aborted
+    FROM stl_query
+    WHERE userid > 1
+    AND starttime BETWEEN :start_time AND :end_time
+    ORDER BY starttime DESC
+    LIMIT {{limit}}
+"""
+_FINGERPRINT_SCAN_SQL = f"""
+    SELECT TRIM(querytxt) AS querytxt, {_EXECUTION_MS} AS execution_time_ms
+    FROM stl_query
+    WHERE userid > 1
+    AND starttime BETWEEN :start_time AND :end_time
+"""
+
+
+def _time_range(start_time: str, end_time: str):
+    """Data API parameters for a ``:start_time`` / ``:end_time`` range."""
+    return [
+        {"name": "start_time", "value": start_time, "typeHint": "TIMESTAMP"},
+        {"name": "end_time", "value": end_time, "typeHint": "TIMESTAMP"},
+    ]
+
+
+def _plain(value):
+    """Render a psycopg2 value the way the Data API returns it (timestamps as text, numerics as float)."""
+    if isinstance(value, datetime):
+        return str(value)
+    if value is not None and not isinstance(value, (int, float, str, bool)):
+        return float(value)
+    return value
+
+query_result_cache = ByteLRUCache("query_results", Settings.QUERY_CACHE_MAX_BYTES)
+query_jobs = QueryJobRegistry(Settings.QUERY_JOBS_MAX, Settings.QUERY_JOB_TTL)
+# Identical read-only statements started while one is already running share its result.
+statement_flights = AsyncSingleFlight("query_statements", on_coalesced=STATEMENTS_COALESCED.inc)
 
 class QueryRepository:
-    def __init__(self):
-        """Initialize with a Redshift database connection and AWS CloudWatch client."""
-        self.redshift_client = RedshiftDataClient()
-        self.cloudwatch_client = CloudWatchClient()
+    def __init__(
+        self,
+        statement_executor: StatementExecutor,
+        metrics_fetcher: MetricsFetcher,
+        result_cache: ByteLRUCache = query_result_cache,
+        history_store: QueryHistoryStore = None,
+        jobs: QueryJobRegistry = query_jobs,
+        flights: AsyncSingleFlight = statement_flights,
+        cluster: Cluster = None,
+        connection_pool: ConnectionPool = None,
+    ):
+        """
+        Initialize with the shared Redshift statement executor, CloudWatch metrics fetcher and result cache.
 
-    def get_long_running_queries(self):
-        """Fetch long-running queries from Redshift system tables."""
+        When ``history_store`` is given, the history, long-running and statistics lookups are
+        answered from the local ``stl_query`` copy instead of Redshift.
+
+        :param cluster: (Optional) Cluster to query; the executor and fetcher must be for its region.
+            Defaults to the registry's default cluster.
+        :param connection_pool: (Optional) Direct connections to the cluster. System-table lookups
+            then skip the Data API's submit, poll and fetch round trips, falling back to it when no
+            pooled connection can be had; user statements always go through the Data API.
+        """
+        self.statement_executor = statement_executor
+        self.result_cache = result_cache
+        self.history_store = history_store
+        self.jobs = jobs
+        self.flights = flights
+        self.connection_pool = connection_pool
+        self.redshift_client = statement_executor.client
+        self.metrics_fetcher = metrics_fetcher
+        self.cluster = cluster or get_cluster_registry().default
+        self.cluster_identifier = self.cluster.cluster_id
+        self.database = self.cluster.database
+        self.db_user = self.cluster.db_user
+
+    def _statement_target(self):
+        """Data API keyword arguments that select the cluster, database and user."""
+        return {
+            "ClusterIdentifier": self.cluster_identifier,
+            "Database": self.database,
+            "DbUser": self.db_user,
+        }
+
+    async def _run_statement(self, sql: str, timeout: float = None):
+        """Run a statement through the executor and return its statement id."""
+        status = await self.statement_executor.run(sql, timeout=timeout, **self._statement_target())
+        return status["Id"]
+
+    async def _fetch_rows(self, statement_id: str):
+        """Fetch a statement's whole result, every page of it, as a list of row dicts."""
+        rows, column_names = [], None
+        async for page in self.statement_executor.iter_result_pages(statement_id):
+            with phase("decode"):
+                if column_names is None:
+                    column_names = [column["name"] for column in page["ColumnMetadata"]]
+                rows.extend(decode_rows(column_names, page["Records"]))
+        return rows
+
+    @staticmethod
+    def _format_time(value, default: datetime):
+        """Render a datetime or ISO string in Redshift's text timestamp format."""
+        if not value:
+            value = default
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+
+    def _direct_query(self, what: str, sql: str, parameters):
+        """Run a system-table query on a pooled direct connection; returns row dicts."""
         try:
-            with self.db_connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT query, user, starttime, total_exec_time
-                    FROM stl_query
-                    WHERE total_exec_time > 10000  -- Queries taking longer than 10s
-                    ORDER BY total_exec_time DESC
-                    LIMIT 10
-                """)
-                queries = cursor.fetchall()
-
-            return [
-                {
-                    "query_id": q[0],
-                    "user": q[1],
-                    "start_time": q[2],
-                    "execution_time_ms": q[3]
-                } for q in queries
-            ]
+            columns, rows = self.connection_pool.fetch_all(
+                pyformat_sql(sql), {parameter["name"]: parameter["value"] for parameter in parameters},
+            )
+        except RedshiftConnectionError:
+            raise
+        except psycopg2.Error as e:
+            raise CustomAPIException(f"Database error while fetching {what}: {str(e)}")
+        return [{column: _plain(value) for column, value in zip(columns, row)} for row in rows]
+
+    async def _try_direct(self, what: str, sql: str, parameters):
+        """Row dicts from the direct-connection engine, or None when the cluster has no usable pool."""
+        if self.connection_pool is None:
+            return None
+        loop = asyncio.get_running_loop()
+        try:
+            with phase("direct_query"):
+                return await loop.run_in_executor(None, self._direct_query, what, sql, parameters)
+        except RedshiftConnectionError:
+            # Unreachable endpoint or exhausted pool: the Data API still answers, just more slowly.
+            return None
+
+    async def _system_query(self, what: str, sql: str, parameters):
+        """Run a small system-table query on a direct connection when possible, else through the Data API."""
+        rows = await self._try_direct(what, sql, parameters)
+        if rows is not None:
+            return rows
+        try:
+            status = await self.statement_executor.run(sql, Parameters=parameters, **self._statement_target())
+            return await self._fetch_rows(status["Id"])
+        except QueryTimeoutError as e:
+            raise CustomAPIException(f"Failed to fetch {what}: {str(e)}", status_code=504)
+        except QueryExecutionError as e:
+            raise CustomAPIException(f"Failed to fetch {what}: {str(e)}")
+        except (BotoCoreError, ClientError) as e:
+            raise CustomAPIException(f"Failed to retrieve {what}: {str(e)}")
 
-        except (OperationalError, DatabaseError) as e:
-            raise CustomAPIException(f"Database error while fetching long-running queries: {str(e)}")
+    async def get_long_running_queries(self, start_time=None, end_time=None, limit=10, min_execution_ms=10000):
+        """Fetch long-running queries from Redshift system tables."""
+        start_time = self._format_time(start_time, datetime.utcnow() - timedelta(days=7))
+        end_time = self._format_time(end_time, datetime.utcnow())
+        if self.history_store is not None:
+            loop = asyncio.get_running_loop()
+            queries = await loop.run_in_executor(
+                None, self.history_store.get_long_running, start_time, end_time, min_execution_ms, limit,
+            )
+        else:
+            queries = await self._system_query(
+                "long-running queries",
+                _LONG_RUNNING_SQL.format(limit=int(limit)),
+                _time_range(start_time, end_time) + [{"name": "min_execution_ms", "value": str(min_execution_ms)}],
+            )
+        return [
+            {
+                "query_id": q["query"],
+                "user": q["userid"],
+                "start_time": q["starttime"],
+                "execution_time_ms": float(q["execution_time_ms"])
+            } for q in queries
+        ]
 
     def get_slow_queries_from_cloudwatch(self):
         """Fetch slow queries based on CloudWatch logs."""
         try:
-            response = self.cloudwatch_client.get_metric_statistics(
-                Namespace="AWS/Redshift",
-                MetricName="QueryRuntime",
-                Dimensions=[{"Name": "ClusterIdentifier", "Value": "your-cluster-id"}],
-                StartTime=datetime.utcnow() - timedelta(days=7),
-                EndTime=datetime.utcnow(),
-                Period=3600,  # 1-hour intervals
-                Statistics=["Maximum"],
-                Unit="Seconds"
+            end_time = datetime.utcnow()
+            points = self.metrics_fetcher.fetch_one(
+                redshift_query_runtime(self.cluster_identifier), end_time - timedelta(days=7), end_time
             )
 
-            if not response.get("Datapoints"):
+            if not points:
                 return {"slow_queries": [], "message": "No slow query data available."}
 
-            slow_queries = sorted(response["Datapoints"], key=lambda x: x["Maximum"], reverse=True)[:5]
+            slow_queries = sorted(points, key=lambda x: x[1], reverse=True)[:5]
 
             return {
-                "slow_queries": [{"runtime": q["Maximum"], "timestamp": q["Timestamp"]} for q in slow_queries]
+                "slow_queries": [{"runtime": value, "timestamp": timestamp} for timestamp, value in slow_queries]
             }
 
         except (BotoCoreError, ClientError) as e:
             raise CustomAPIException(f"Failed to fetch slow queries from CloudWatch: {str(e)}")
 
-    def get_query_statistics(self):
+    async def get_query_statistics(self, start_time=None, end_time=None):
         """Fetch query statistics including total count, avg runtime, and errors."""
-        try:
-            with self.db_connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT COUNT(*), AVG(total_exec_time), COUNT(CASE WHEN aborted = 1 THEN 1 END)
-                    FROM stl_query
-                    WHERE starttime >= CURRENT_DATE - INTERVAL '7 days'
-                """)
-                stats = cursor.fetchone()
-
-            return {
-                "total_queries": stats[0],
-                "avg_execution_time_ms": round(stats[1], 2) if stats[1] else 0,
-                "failed_queries": stats[2]
-            }
-
-        except (OperationalError, DatabaseError) as e:
-            raise CustomAPIException(f"Database error while fetching query statistics: {str(e)}")
-    
-    def get_query_history(self, start_time=None, end_time=None, limit=10):
+        start_time = self._format_time(start_time, datetime.utcnow() - timedelta(days=7))
+        end_time = self._format_time(end_time, datetime.utcnow())
+        if self.history_store is not None:
+            loop = asyncio.get_running_loop()
+            total, avg_ms, failed = await loop.run_in_executor(
+                None, self.history_store.get_statistics, start_time, end_time,
+            )
+        else:
+            stats = (await self._system_query("query statistics", _STATISTICS_SQL, _time_range(start_time, end_time)))[0]
+            total, avg_ms, failed = stats["total"], stats["avg_ms"], stats["failed"]
+        return {
+            "total_queries": total,
+            "avg_execution_time_ms": round(float(avg_ms), 2) if avg_ms else 0,
+            "failed_queries": failed
+        }
+
+    async def get_query_history(self, start_time=None, end_time=None, limit=10, cursor: str = None):
         """
         Fetches query execution history from Amazon Redshift.
 
         :param start_time: (Optional) Start time for query filtering.
         :param end_time: (Optional) End time for query filtering.
         :param limit: Number of queries to retrieve.
+        :param cursor: (Optional) ``next_cursor`` from the previous page; local store only.
         :return: List of executed queries with execution times and status.
         """
+        if self.history_store is not None:
+            return await self._get_query_history_from_store(start_time, end_time, limit, cursor)
+
         try:
-            # Default to last 24 hours if no time range provided
+            # Default to last 24 hours if no time range provided. Whole seconds, so
+            # dashboards loading together issue the same statement and share it.
+            now = datetime.utcnow().replace(microsecond=0)
             if not start_time:
-                start_time = datetime.utcnow() - timedelta(days=1)
+                start_time = now - timedelta(days=1)
             if not end_time:
-                end_time = datetime.utcnow()
-
-            sql_query = f"""
-                SELECT query, starttime, endtime, total_exec_time, querytxt, aborted
-                FROM stl_query
-                WHERE userid > 1
-                AND starttime BETWEEN '{start_time}' AND '{end_time}'
-                ORDER BY starttime DESC
-                LIMIT {limit}
-            """
-
-            response = self.redshift_client.execute_statement(
-                ClusterIdentifier=self.cluster_identifier,
-                Database=self.database,
-                DbUser=self.db_user,
-                Sql=sql_query
+                end_time = now
+
+            sql_query = _HISTORY_SQL.format(limit=int(limit))
+            parameters = _time_range(self._format_time(start_time, now), self._format_time(end_time, now))
+            rows = await self._try_direct("query history", sql_query, parameters)
+            if rows is None:
+                rows = await self.flights.do(
+                    ("history", self.cluster.name, normalize_sql(sql_query), parameters[0]["value"], parameters[1]["value"]),
+                    lambda: self._fetch_history(sql_query, parameters),
+                )
+            return {
+                "query_history": [
+                    {
+                        "query_id": row["query"],
+                        "start_time": row["starttime"],
+                        "end_time": row["endtime"],
+                        # Data API numerics arrive as strings.
+                        "execution_time_ms": float(row["execution_time_ms"]),
+                        "query_text": row["querytxt"],
+                        "aborted": bool(row["aborted"])
+                    } for row in rows
+                ]
+            }
+
+        except QueryTimeoutError as e:
+            raise CustomAPIException(f"Failed to fetch query history: {str(e)}", status_code=504)
+        except QueryExecutionError as e:
+            raise CustomAPIException(f"Failed to fetch query history: {str(e)}")
+        except (BotoCoreError, ClientError) as e:
+            raise CustomAPIException(f"Failed to retrieve query history: {str(e)}")
+
+    async def _fetch_history(self, sql_query: str, parameters):
+        status = await self.statement_executor.run(sql_query, Parameters=parameters, **self._statement_target())
+        return await self._fetch_rows(status["Id"])
+
+    async def _get_query_history_from_store(self, start_time, end_time, limit, cursor):
+        """Page through the local ``stl_query`` copy, newest first."""
+        if cursor:
+            cursor_time, cursor_query = cursor.rsplit("|", 1)
+            cursor = (cursor_time, int(cursor_query))
+
+        loop = asyncio.get_running_loop()
+        rows, next_cursor = await loop.run_in_executor(
+            None, self.history_store.get_history,
+            self._format_time(start_time, datetime.utcnow() - timedelta(days=1)),
+            self._format_time(end_time, datetime.utcnow()),
+            limit,
+            cursor,
+        )
+        return {
+            "query_history": [
+                {
+                    "query_id": row["query"],
+                    "start_time": row["starttime"],
+                    "end_time": row["endtime"],
+                    "execution_time_ms": row["execution_time_ms"],
+                    "query_text": row["querytxt"],
+                    "aborted": bool(row["aborted"])
+                } for row in rows
+            ],
+            "next_cursor": f"{next_cursor[0]}|{next_cursor[1]}" if next_cursor else None
+        }
+
+    async def get_query_fingerprints(self, start_time=None, end_time=None, limit=20, order_by="total_ms"):
+        """
+        Aggregates ``stl_query`` runtimes per normalised query shape.
+
+        Literals are stripped so repeated executions of the same statement group together; each
+        group keeps a streaming quantile sketch, so memory depends on the number of distinct shapes
+        rather than the number of executions.
+
+        :param start_time: (Optional) Start time for query filtering.
+        :param end_time: (Optional) End time for query filtering.
+        :param limit: Number of fingerprints to return.
+        :param order_by: One of total_ms, count, p95_ms, p50_ms or max_ms.
+        :return: Fingerprints with execution count, total, mean, p50, p95 and max runtime.
+        """
+        if order_by not in ORDER_BY:
+            raise CustomAPIException(f"order_by must be one of {', '.join(ORDER_BY)}")
+
+        now = datetime.utcnow().replace(microsecond=0)
+        start_time = self._format_time(start_time, now - timedelta(days=1))
+        end_time = self._format_time(end_time, now)
+        aggregator = FingerprintAggregator(Settings.QUERY_FINGERPRINT_MAX)
+        loop = asyncio.get_running_loop()
+
+        if self.history_store is not None:
+            texts = await loop.run_in_executor(
+                None, self._aggregate_fingerprints_from_store, aggregator, start_time, end_time,
             )
+        else:
+            try:
+                if not await self._aggregate_fingerprints_direct(aggregator, start_time, end_time):
+                    await self._aggregate_fingerprints_from_redshift(aggregator, start_time, end_time)
+            except QueryTimeoutError as e:
+                raise CustomAPIException(f"Failed to fetch query fingerprints: {str(e)}", status_code=504)
+            except QueryExecutionError as e:
+                raise CustomAPIException(f"Failed to fetch query fingerprints: {str(e)}")
+            except (BotoCoreError, ClientError) as e:
+                raise CustomAPIException(f"Failed to retrieve query fingerprints: {str(e)}")
+            texts = None
+
+        with phase("serialize"):
+            fingerprints = aggregator.top(limit, order_by, texts)
+        return {
+            "start_time": start_time,
+            "end_time": end_time,
+            "queries": aggregator.rows,
+            "distinct_fingerprints": len(aggregator),
+            "fingerprints": fingerprints,
+        }
+
+    def _aggregate_fingerprints_from_store(self, aggregator, start_time, end_time):
+        """Fold the local copy's executions into ``aggregator``; returns the stored fingerprint texts."""
+        for batch in self.history_store.iter_executions(start_time, end_time):
+            for fingerprint, execution_ms, querytxt in batch:
+                aggregator.add(querytxt, execution_ms, fingerprint)
+        return self.history_store.get_fingerprint_texts(aggregator.fingerprints())
+
+    def _scan_fingerprints(self, aggregator, start_time, end_time):
+        """Fold the time range into ``aggregator`` through a server-side cursor, one batch per round trip."""
+        batches = self.connection_pool.iter_batches(
+            pyformat_sql(_FINGERPRINT_SCAN_SQL), {"start_time": start_time, "end_time": end_time},
+        )
+        try:
+            for rows in batches:
+                for querytxt, execution_ms in rows:
+                    aggregator.add(querytxt, float(execution_ms or 0))
+        except RedshiftConnectionError:
+            raise
+        except psycopg2.Error as e:
+            raise CustomAPIException(f"Database error while fetching query fingerprints: {str(e)}")
+
+    async def _aggregate_fingerprints_direct(self, aggregator, start_time, end_time):
+        """Aggregate over a direct connection; returns False, with nothing added, when the cluster has no usable pool."""
+        if self.connection_pool is None:
+            return False
+        loop = asyncio.get_running_loop()
+        try:
+            with phase("direct_query"):
+                await loop.run_in_executor(None, self._scan_fingerprints, aggregator, start_time, end_time)
+            return True
+        except RedshiftConnectionError:
+            # Raised before the first row is read, so the Data API can start from scratch.
+            return False
+
+    async def _aggregate_fingerprints_from_redshift(self, aggregator, start_time, end_time):
+        """Stream the time range from ``stl_query`` page by page, aggregating each page off the event loop."""
+        status = await self.statement_executor.run(
+            _FINGERPRINT_SCAN_SQL, Parameters=_time_range(start_time, end_time), **self._statement_target(),
+        )
+
+        def add_page(records):
+            for record in records:
+                aggregator.add(field_value(record[0]), float(field_value(record[1]) or 0))
+
+        loop = asyncio.get_running_loop()
+        async for page in self.statement_executor.iter_result_pages(status["Id"]):
+            with phase("decode"):
+                await loop.run_in_executor(None, add_page, page["Records"])
+
+    async def execute_query(self, sql: str, timeout: float = None, result_format: str = ROWS):
+        """
+        Executes a given SQL query on Amazon Redshift and returns the results.
 
-            statement_id = response["Id"]
+        :param sql: The SQL query string to be executed.
+        :param timeout: (Optional) Seconds to wait before the statement is cancelled.
+        :param result_format: "rows" (list of dicts), "columnar" (one array per column) or "arrow" (IPC bytes).
+        :return: Query execution results or an error message.
+        """
+        if is_read_only(sql):
+            # Concurrent identical reads share one statement; the first caller's timeout applies.
+            key = (self.cluster.name, self.database, normalize_sql(sql), result_format)
+            return await self.flights.do(key, lambda: self._execute_query(sql, timeout, result_format))
+        return await self._execute_query(sql, timeout, result_format)
 
-            # Wait for query execution to complete
-            while True:
-                status = self.redshift_client.describe_statement(Id=statement_id)
-                if status["Status"] in ["FINISHED", "FAILED", "ABORTED"]:
-                    break
+    async def _execute_query(self, sql: str, timeout: float = None, result_format: str = ROWS):
+        try:
+            statement_id = await self._run_statement(sql, timeout)
+
+            if result_format == ROWS:
+                return {
+                    "message": "Query executed successfully.",
+                    "query_results": await self._fetch_rows(statement_id)
+                }
+
+            builder = None
+            async for page in self.statement_executor.iter_result_pages(statement_id):
+                with phase("decode"):
+                    if builder is None:
+                        builder = ColumnarBuilder(page["ColumnMetadata"])
+                    builder.add_records(page["Records"])
+
+            if result_format == ARROW:
+                with phase("serialize"):
+                    return builder.to_arrow()
+            return {"message": "Query executed successfully.", **builder.to_dict()}
+
+        except QueryTimeoutError as e:
+            raise CustomAPIException(f"Query execution timed out: {str(e)}", status_code=504)
+        except QueryExecutionError as e:
+            raise CustomAPIException(f"Query execution failed: {str(e)}")
+        except ImportError as e:
+            raise CustomAPIException(str(e), status_code=406)
+        except (BotoCoreError, ClientError) as e:
+            raise CustomAPIException(f"Error executing query: {str(e)}")
 
-            if status["Status"] != "FINISHED":
-                raise CustomAPIException(f"Failed to fetch query history: {status['Error']}")
+    async def execute_cached_query(self, sql: str, max_age: float, timeout: float = None, result_format: str = ROWS):
+        """
+        Executes a SQL query, serving read-only statements from the result cache when possible.
 
-            # Retrieve results
-            results = self.redshift_client.get_statement_result(Id=statement_id)
+        :param sql: The SQL query string to be executed.
+        :param max_age: Oldest cached result, in seconds, the caller will accept.
+        :param timeout: (Optional) Seconds to wait before the statement is cancelled.
+        :param result_format: Result encoding, see ``execute_query``.
+        :return: Tuple of (query results, cache status "HIT"/"MISS"/"BYPASS", age in seconds).
+        """
+        if not is_read_only(sql):
+            return await self.execute_query(sql, timeout, result_format), "BYPASS", 0
 
-            query_history = []
-            for record in results["Records"]:
-                query_history.append({
-                    "query_id": record[0]["stringValue"],
-                    "start_time": record[1]["stringValue"],
-                    "end_time": record[2]["stringValue"],
-                    "execution_time_ms": float(record[3]["stringValue"]),
-                    "query_text": record[4]["stringValue"],
-                    "aborted": record[5]["booleanValue"]
-                })
+        key = (self.cluster.name, self.database, normalize_sql(sql), result_format)
+        cached = self.result_cache.get(key, max_age)
+        if cached is not None:
+            result, age = cached
+            return result, "HIT", age
 
-            return {"query_history": query_history}
+        result = await self.execute_query(sql, timeout, result_format)
+        size = len(result) if isinstance(result, bytes) else len(json.dumps(result, default=str))
+        self.result_cache.put(key, result, size)
+        return result, "MISS", 0
 
+    async def execute_batch(self, statements, mode: str = "transaction", concurrency: int = None, timeout: float = None):
+        """
+        Executes several SQL statements in one request.
+
+        :param statements: List of SQL strings, executed in order.
+        :param mode: "transaction" submits them as one ``batch_execute_statement``;
+                     "parallel" runs them as independent statements.
+        :param concurrency: (Optional) Max statements in flight in parallel mode.
+        :param timeout: (Optional) Seconds before a statement (or the whole transaction) is cancelled.
+        :return: Per-statement status, timings and results.
+        """
+        if not statements:
+            raise CustomAPIException("No statements provided.")
+        if len(statements) > Settings.QUERY_BATCH_MAX_STATEMENTS:
+            raise CustomAPIException(f"A batch may contain at most {Settings.QUERY_BATCH_MAX_STATEMENTS} statements.")
+
+        started = time.perf_counter()
+        if mode == "transaction":
+            results = await self._execute_transaction(statements, timeout)
+        elif mode == "parallel":
+            results = await self._execute_parallel(statements, concurrency or Settings.QUERY_BATCH_CONCURRENCY, timeout)
+        else:
+            raise CustomAPIException(f"Unknown batch mode: {mode}")
+
+        return {
+            "mode": mode,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "results": results
+        }
+
+    async def _execute_transaction(self, statements, timeout: float = None):
+        try:
+            status = await self.statement_executor.run_batch(statements, timeout=timeout, **self._statement_target())
+        except QueryTimeoutError as e:
+            raise CustomAPIException(f"Batch execution timed out: {str(e)}", status_code=504)
+        except QueryExecutionError as e:
+            # The transaction was rolled back, so no statement took effect.
+            return [{"index": i, "status": "FAILED", "error": str(e)} for i in range(len(statements))]
         except (BotoCoreError, ClientError) as e:
-            raise CustomAPIException(f"Failed to retrieve query history: {str(e)}")
-
-    def execute_query(self, sql: str):
+            raise CustomAPIException(f"Error executing batch: {str(e)}")
+
+        results = []
+        for index, sub_statement in enumerate(status.get("SubStatements", [])):
+            result = {
+                "index": index,
+                "status": sub_statement["Status"],
+                "duration_ms": round(sub_statement.get("Duration", 0) / 1e6, 2)
+            }
+            if sub_statement.get("HasResultSet"):
+                result["query_results"] = await self._fetch_rows(sub_statement["Id"])
+            results.append(result)
+        return results
+
+    async def _execute_parallel(self, statements, concurrency: int, timeout: float = None):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(index, sql):
+            async with semaphore:
+                started = time.perf_counter()
+                result = {"index": index}
+                try:
+                    status = await self.statement_executor.run(sql, timeout=timeout, **self._statement_target())
+                    result["status"] = status["Status"]
+                    result["duration_ms"] = round(status.get("Duration", 0) / 1e6, 2)
+                    if status.get("HasResultSet"):
+                        result["query_results"] = await self._fetch_rows(status["Id"])
+                except (QueryExecutionError, QueryTimeoutError, BotoCoreError, ClientError) as e:
+                    result["status"] = "FAILED"
+                    result["error"] = str(e)
+                result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                return result
+
+        return await asyncio.gather(*(run_one(index, sql) for index, sql in enumerate(statements)))
+
+    async def submit_query_job(self, sql: str):
         """
-        Executes a given SQL query on Amazon Redshift and returns the results.
+        Submits a SQL query without waiting for it and tracks it as a job.
 
         :param sql: The SQL query string to be executed.
-        :return: Query execution results or an error message.
+        :return: The job status; ``job_id`` is the Data API statement id.
         """
         try:
-            response = self.redshift_client.execute_statement(
-                ClusterIdentifier=self.cluster_identifier,
-                Database=self.database,
-                DbUser=self.db_user,
-                Sql=sql
+            statement_id = await self.statement_executor.submit(sql, **self._statement_target())
+        except (BotoCoreError, ClientError) as e:
+            raise CustomAPIException(f"Error submitting query: {str(e)}")
+        return self.jobs.add(QueryJob(statement_id, sql, cluster=self.cluster.name)).to_dict()
+
+    async def _refresh_job(self, job_id: str) -> QueryJob:
+        """Return the job with its latest status, re-attaching to the statement if it is not tracked here."""
+        job = self.jobs.get(job_id)
+        if job is not None and job.cluster != self.cluster.name:
+            raise CustomAPIException(
+                f"Query job {job_id} was submitted to cluster {job.cluster}, not {self.cluster.name}.", status_code=404
             )
+        if job is not None and job.done:
+            return job
+
+        try:
+            description = await self.statement_executor.call("describe_statement", Id=job_id)
+        except ClientError as e:
+            if job is None and e.response.get("Error", {}).get("Code") in ("ResourceNotFoundException", "ValidationException"):
+                raise CustomAPIException(f"Query job {job_id} not found.", status_code=404)
+            raise CustomAPIException(f"Error fetching query job status: {str(e)}")
+        except BotoCoreError as e:
+            raise CustomAPIException(f"Error fetching query job status: {str(e)}")
+
+        if job is None:
+            # Submitted by another worker, before a restart, or evicted. Only re-attach statements this API
+            # could have run, so ids of other applications' statements in the account do not expose their results.
+            target = self._statement_target()
+            if any(description.get(key) != value for key, value in target.items()):
+                raise CustomAPIException(f"Query job {job_id} not found.", status_code=404)
+            created_at = description.get("CreatedAt")
+            job = self.jobs.add(
+                QueryJob(job_id, submitted_at=created_at.timestamp() if created_at else None, cluster=self.cluster.name),
+                reattached=True,
+            )
+        job.update(description)
+        return job
+
+    async def get_query_job(self, job_id: str):
+        """
+        Returns a job's status, progress and timings.
 
-            statement_id = response["Id"]
+        :param job_id: Id returned by ``submit_query_job`` (any Data API statement id works).
+        """
+        return (await self._refresh_job(job_id)).to_dict()
 
-            # Wait for the query execution to complete
-            while True:
-                status = self.redshift_client.describe_statement(Id=statement_id)
-                if status["Status"] in ["FINISHED", "FAILED", "ABORTED"]:
-                    break
+    async def get_query_job_results(self, job_id: str, next_token: str = None, result_format: str = ROWS):
+        """
+        Returns one page of a finished job's results.
 
-            if status["Status"] != "FINISHED":
-                raise CustomAPIException(f"Query execution failed: {status.get('Error', 'Unknown error')}")
+        :param job_id: Id returned by ``submit_query_job``.
+        :param next_token: (Optional) ``next_token`` from the previous page.
+        :param result_format: "rows" or "columnar".
+        :return: The page and the ``next_token`` for the following one (None on the last page).
+        """
+        if result_format not in (ROWS, COLUMNAR):
+            raise CustomAPIException("Job results are available as rows or columnar JSON.", status_code=406)
+
+        job = await self._refresh_job(job_id)
+        if not job.done:
+            raise CustomAPIException(f"Query job {job_id} is still {job.status.lower()}.", status_code=409)
+        if job.status != "FINISHED":
+            raise CustomAPIException(f"Query job {job_id} {job.status.lower()}: {job.error}", status_code=409)
+        if not job.has_result_set:
+            return {"job_id": job_id, "query_results": [], "next_token": None}
+
+        kwargs = {"Id": job_id}
+        if next_token:
+            kwargs["NextToken"] = next_token
+        try:
+            with phase("fetch"):
+                page = await self.statement_executor.call("get_statement_result", **kwargs)
+        except (BotoCoreError, ClientError) as e:
+            raise CustomAPIException(f"Error fetching query job results: {str(e)}")
+
+        with phase("decode"):
+            if result_format == COLUMNAR:
+                builder = ColumnarBuilder(page["ColumnMetadata"])
+                builder.add_records(page["Records"])
+                results = builder.to_dict()
+            else:
+                column_names = [column["name"] for column in page["ColumnMetadata"]]
+                results = {"query_results": decode_rows(column_names, page["Records"])}
+        return {
+            "job_id": job_id,
+            **results,
+            "total_rows": page.get("TotalNumRows"),
+            "next_token": page.get("NextToken"),
+        }
+
+    async def cancel_query_job(self, job_id: str):
+        """Cancels a running job and returns its status."""
+        job = await self._refresh_job(job_id)
+        if not job.done:
+            await self.statement_executor.cancel(job_id)
+            job = await self._refresh_job(job_id)
+        return job.to_dict()
+
+    async def stream_query(self, sql: str, timeout: float = None):
+        """
+        Executes a SQL query and returns an async iterator of NDJSON-encoded result rows.
 
-            # Fetch query results
-            results = self.redshift_client.get_statement_result(Id=statement_id)
+        The statement is awaited here so execution errors surface before any bytes are sent;
+        result pages are then fetched one at a time as the client consumes them.
 
-            query_results = []
-            column_names = [column["name"] for column in results["ColumnMetadata"]]
+        :param sql: The SQL query string to be executed.
+        :param timeout: (Optional) Seconds to wait before the statement is cancelled.
+        :return: Async iterator of newline-delimited JSON chunks, one chunk per result page.
+        """
+        statement_id = await self._start_stream(sql, timeout)
+        return self._iter_ndjson(statement_id)
 
-            for record in results["Records"]:
-                row = {column_names[i]: list(record[i].values())[0] for i in range(len(column_names))}
-                query_results.append(row)
+    async def _start_stream(self, sql: str, timeout: float = None):
+        """Run a statement whose results will be streamed, mapping failures to API errors."""
+        try:
+            return await self._run_statement(sql, timeout)
+        except QueryTimeoutError as e:
+            raise CustomAPIException(f"Query execution timed out: {str(e)}", status_code=504)
+        except QueryExecutionError as e:
+            raise CustomAPIException(f"Query execution failed: {str(e)}")
+        except (BotoCoreError, ClientError) as e:
+            raise CustomAPIException(f"Error executing query: {str(e)}")
 
-            return {
-                "message": "Query executed successfully.",
-                "query_results": query_results
-            }
+    async def export_query(self, sql: str, export_format: str = result_export.CSV, compression: str = None,
+                           timeout: float = None):
+        """
+        Executes a SQL query and returns its results as a streamed, compressed file.
+
+        Result pages are fetched ``EXPORT_PREFETCH_PAGES`` ahead while earlier pages are
+        encoded in a worker thread, so memory stays bounded by a few pages (one row group
+        for Parquet) and encoding overlaps the Data API round trips.
 
+        :param sql: The SQL query string to be executed.
+        :param export_format: "csv" or "parquet".
+        :param compression: "gzip", "zstd" or "none" (default gzip for CSV, zstd for Parquet).
+        :param timeout: (Optional) Seconds to wait before the statement is cancelled.
+        :return: Tuple of the encoder (``media_type``, ``extension``) and an async iterator of file chunks.
+        """
+        try:
+            encoder = result_export.create_encoder(export_format, compression, Settings.EXPORT_PARQUET_ROW_GROUP_ROWS)
+        except ValueError as e:
+            raise CustomAPIException(str(e))
+        except ImportError as e:
+            raise CustomAPIException(f"{export_format} export is not available: {str(e)}", status_code=501)
+
+        statement_id = await self._start_stream(sql, timeout)
+        return encoder, self._iter_export(statement_id, encoder)
+
+    async def _iter_export(self, statement_id: str, encoder):
+        """Yield encoded chunks page by page, then the encoder's trailer."""
+        loop = asyncio.get_running_loop()
+        pages = self.statement_executor.iter_result_pages(statement_id, prefetch=Settings.EXPORT_PREFETCH_PAGES)
+        # A failure mid-stream propagates and aborts the response: the headers are already
+        # sent, and a truncated archive fails to decompress rather than looking complete.
+        async for page in pages:
+            with phase("serialize"):
+                chunk = await loop.run_in_executor(None, encoder.encode, page)
+            if chunk:
+                yield chunk
+        with phase("serialize"):
+            chunk = await loop.run_in_executor(None, encoder.finish)
+        if chunk:
+            yield chunk
+
+    async def _iter_ndjson(self, statement_id: str):
+        """Yield one NDJSON chunk per result page; a trailing error line marks a failed stream."""
+        column_names = None
+        try:
+            async for page in self.statement_executor.iter_result_pages(statement_id):
+                if column_names is None:
+                    column_names = [column["name"] for column in page["ColumnMetadata"]]
+                with phase("serialize"):
+                    chunk = "".join(
+                        json.dumps(row, default=str) + "\n"
+                        for row in decode_rows(column_names, page["Records"])
+                    )
+                yield chunk
         except (BotoCoreError, ClientError) as e:
-            raise CustomAPIException(f"Error executing query: {str(e)}")
\ No newline at end of file
+            yield json.dumps({"error": f"Error fetching query results: {str(e)}"}) + "\n"
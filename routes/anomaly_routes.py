@@ -0,0 +1,24 @@
+from typing import Optional
+from fastapi import APIRouter, Depends
+from core.clusters import resolve_clusters
+from services.anomaly_service import AnomalyService
+from repositories.anomaly_repository import AnomalyRepository
+from infrastructure.aws_clients import get_logs_client, get_metrics_fetcher
+
+router = APIRouter()
+
+def get_anomaly_service(cluster: Optional[str] = None):
+    """Service for one ``?cluster=`` selection; metrics and log groups are read in that cluster's region."""
+    target = resolve_clusters(cluster, single=True)[0]
+    anomaly_repo = AnomalyRepository(get_metrics_fetcher(target.region), get_logs_client(target.region), cluster=target)
+    return AnomalyService(anomaly_repo)
+
+@router.post("/anomalies")
+def detect_anomalies(request: dict, service: AnomalyService = Depends(get_anomaly_service)):
+    """Detect anomalies in CloudWatch metric series and log-event rates.
+
+    Body: ``{"metrics": [{"namespace", "metric_name", "dimensions", "stat"}], "log_groups": [...],
+    "hours": 24, "period": 60, "detectors": ["zscore", "ewma", "seasonal"], "threshold": 3.5}``.
+    Without ``metrics`` or ``log_groups``, scores CPUUtilization of the ``?cluster=`` cluster (default: the first).
+    """
+    return service.detect_anomalies(request)
@@ -1,26 +1,74 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Request
 from services.cost_service import CostService
 from repositories.cost_repository import CostRepository
-from infrastructure.aws_clients import get_cloudwatch_client
+from core.clusters import resolve_clusters
+from core.config import Settings
+from core.dashboard_refresh import dashboards
+from infrastructure.aws_clients import get_metrics_fetcher, get_statement_executor
+from infrastructure.cost_history_store import get_cost_history_store
 
 router = APIRouter()
 
-def get_cost_service():
-    cloudwatch_client = get_cloudwatch_client()
-    cost_repo = CostRepository(cloudwatch_client)
-    return CostService(cost_repo)
+def get_cost_service(cluster: Optional[str] = None):
+    """Service for ``?cluster=`` selections; only per-query attribution depends on the cluster,
+    billing metrics are account-wide and always read from ``CLOUDWATCH_REGION``."""
+    fleet = {
+        target.name: CostRepository(
+            get_metrics_fetcher(target.region),
+            get_metrics_fetcher(Settings.CLOUDWATCH_REGION),
+            get_statement_executor(target.region),
+            history_store=get_cost_history_store(),
+            cluster=target,
+        )
+        for target in resolve_clusters(cluster)
+    }
+    return CostService(next(iter(fleet.values())), fleet)
+
+# The CloudWatch handlers block, so they are plain functions and run in the
+# threadpool, which also lets concurrent requests share GetMetricData batches.
 
 @router.get("/cost/total")
-async def get_total_cost(service: CostService = Depends(get_cost_service)):
+def get_total_cost(request: Request, service: CostService = Depends(get_cost_service)):
     """Get total AWS Redshift cost."""
-    return service.get_total_cost()
+    return dashboards.serve("cost_total", request, service.get_total_cost)
+
+@router.get("/cost/history")
+def get_cost_history(
+    request: Request, days: int = 30, resolution: str = "day", service: CostService = Depends(get_cost_service),
+):
+    """Get cost per service over the last ``days`` days in hour, day or month buckets."""
+    return dashboards.serve("cost_history", request, lambda: service.get_cost_history(days, resolution))
+
+@router.get("/cost/month-over-month")
+def get_month_over_month(request: Request, service: CostService = Depends(get_cost_service)):
+    """Compare month-to-date cost per service with the same period of the previous month."""
+    return dashboards.serve("cost_month_over_month", request, service.get_month_over_month)
 
 @router.get("/cost/top-queries")
-async def get_top_queries(service: CostService = Depends(get_cost_service)):
-    """Get the most expensive Redshift queries."""
-    return service.get_top_queries()
+async def get_top_queries(
+    request: Request,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    limit: int = 10,
+    service: CostService = Depends(get_cost_service),
+):
+    """Get the most expensive Redshift queries, users and query fingerprints by estimated cost."""
+    return await dashboards.serve_async(
+        "cost_top_queries", request, lambda: service.get_top_queries(start_time, end_time, limit),
+    )
 
 @router.get("/cost/optimization")
-async def get_optimization_suggestions(service: CostService = Depends(get_cost_service)):
+def get_optimization_suggestions(request: Request, service: CostService = Depends(get_cost_service)):
     """Suggest cost optimization strategies."""
-    return service.get_optimization_suggestions()
+    return dashboards.serve("cost_optimization", request, service.get_optimization_suggestions)
+
+# Refreshed in the background for dashboards that poll these endpoints without query parameters.
+_interval = Settings.DASHBOARD_COST_REFRESH_INTERVAL
+dashboards.register("cost_total", lambda: get_cost_service().get_total_cost(), _interval, blocking=True)
+dashboards.register("cost_history", lambda: get_cost_service().get_cost_history(30, "day"), _interval, blocking=True)
+dashboards.register("cost_month_over_month", lambda: get_cost_service().get_month_over_month(), _interval, blocking=True)
+dashboards.register("cost_top_queries", lambda: get_cost_service().get_top_queries(None, None, 10), _interval)
+dashboards.register(
+    "cost_optimization", lambda: get_cost_service().get_optimization_suggestions(), _interval, blocking=True,
+)
@@ -1,26 +1,50 @@
+from typing import Optional
 from fastapi import APIRouter, Depends
+from core.clusters import resolve_clusters
 from services.database_service import DatabaseService
 from repositories.database_repository import DatabaseRepository
-from infrastructure.aws_clients import get_redshift_client
+from infrastructure.aws_clients import get_statement_executor
 
 router = APIRouter()
 
-def get_database_service():
-    redshift_client = get_redshift_client()
-    db_repo = DatabaseRepository(redshift_client)
-    return DatabaseService(db_repo)
+def get_database_service(cluster: Optional[str] = None):
+    """Service for ``?cluster=name``, ``?cluster=a,b`` or ``?cluster=all`` (default cluster when omitted)."""
+    fleet = {
+        target.name: DatabaseRepository(get_statement_executor(target.region), cluster=target)
+        for target in resolve_clusters(cluster)
+    }
+    return DatabaseService(next(iter(fleet.values())), fleet)
 
 @router.get("/databases")
 async def fetch_databases(service: DatabaseService = Depends(get_database_service)):
     """Fetch all databases in Redshift."""
-    return service.get_all_databases()
+    return await service.get_all_databases()
 
 @router.get("/schemas/{database_name}")
 async def fetch_schemas(database_name: str, service: DatabaseService = Depends(get_database_service)):
     """Fetch schemas from a specific database."""
-    return service.get_schemas(database_name)
+    return await service.get_schemas(database_name)
+
+@router.get("/tables/search")
+async def search_tables(
+    prefix: str,
+    database: Optional[str] = None,
+    limit: int = 50,
+    service: DatabaseService = Depends(get_database_service),
+):
+    """Prefix-search table names. With ``database`` every table in it is searched, otherwise only loaded schemas."""
+    return await service.search_tables(prefix, database, limit)
 
 @router.get("/tables/{database_name}/{schema_name}")
 async def fetch_tables(database_name: str, schema_name: str, service: DatabaseService = Depends(get_database_service)):
     """Fetch tables from a specific schema."""
-    return service.get_tables(database_name, schema_name)
+    return await service.get_tables(database_name, schema_name)
+
+@router.post("/catalog/invalidate")
+async def invalidate_catalog(
+    database: Optional[str] = None,
+    schema: Optional[str] = None,
+    service: DatabaseService = Depends(get_database_service),
+):
+    """Drop cached catalog entries for a schema (with its database), a database, or everything."""
+    return service.invalidate_catalog(database, schema)
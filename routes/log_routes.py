@@ -0,0 +1,43 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from core.cloudwatch_client import CloudWatchClient
+from services.log_service import LogService
+from repositories.log_repository import LogRepository
+
+router = APIRouter()
+
+def get_log_service():
+    log_repo = LogRepository(CloudWatchClient())
+    return LogService(log_repo)
+
+@router.get("/logs/stream")
+async def stream_logs(
+    request: Request,
+    log_group: str,
+    log_stream: Optional[str] = None,
+    filter_pattern: Optional[str] = None,
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+    cursor: Optional[str] = None,
+    follow: bool = False,
+    service: LogService = Depends(get_log_service),
+):
+    """Stream CloudWatch log events as NDJSON, or as Server-Sent Events with ``Accept: text/event-stream``.
+
+    Times are epoch milliseconds. ``follow=true`` keeps the connection open and polls for new
+    events until ``end_time`` passes; ``cursor`` (or the SSE ``Last-Event-ID`` header) resumes
+    a previous stream.
+    """
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    events = service.stream_events(
+        "sse" if sse else "ndjson",
+        log_group=log_group,
+        log_stream=log_stream,
+        filter_pattern=filter_pattern,
+        start_time=start_time,
+        end_time=end_time,
+        cursor=request.headers.get("last-event-id") or cursor,
+        follow=follow,
+    )
+    return StreamingResponse(events, media_type="text/event-stream" if sse else "application/x-ndjson")
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from core import instrumentation
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Expose request, phase and AWS call histograms in the Prometheus text format."""
+    return PlainTextResponse(instrumentation.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,37 +1,216 @@
-from fastapi import APIRouter, Depends
+import math
+import re
+from typing import Optional
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from core.clusters import Cluster, get_cluster_registry, resolve_clusters
+from core.config import Settings
+from core.dashboard_refresh import dashboards
+from core.instrumentation import phase
+from core.response import error_response
+from core.result_encoding import ARROW, ARROW_MEDIA_TYPE, COLUMNAR, COLUMNAR_MEDIA_TYPE, negotiate_format
 from services.query_service import QueryService
-from repositories.query_repository import QueryRepository
-from infrastructure.aws_clients import get_redshift_client
+from repositories.query_repository import QueryRepository, query_jobs
+from infrastructure.aws_clients import get_statement_executor, get_metrics_fetcher
+from infrastructure.database import get_connection_pool
+from infrastructure.query_history_store import get_query_history_store
 
 router = APIRouter()
 
-def get_query_service():
-    redshift_client = get_redshift_client()
-    query_repo = QueryRepository(redshift_client)
-    return QueryService(query_repo)
+def _max_age_hint(query: dict, request: Request):
+    """Read the cache max-age from the body or a ``Cache-Control: max-age=N`` request header."""
+    if query.get("max_age") is not None:
+        try:
+            max_age = float(query["max_age"])
+        except (TypeError, ValueError):
+            max_age = math.nan
+        if not math.isfinite(max_age) or max_age < 0:
+            error_response(f"max_age must be a non-negative number of seconds, got {query['max_age']!r}.")
+        return max_age
+    match = re.search(r"max-age=(\d+)", request.headers.get("cache-control", ""))
+    return float(match.group(1)) if match else None
+
+def _query_repo(cluster: Cluster):
+    # The local history store is filled from the default cluster only.
+    is_default = cluster is get_cluster_registry().default
+    return QueryRepository(
+        get_statement_executor(cluster.region),
+        get_metrics_fetcher(cluster.region),
+        history_store=get_query_history_store() if is_default else None,
+        cluster=cluster,
+        connection_pool=get_connection_pool(cluster),
+    )
+
+def get_query_service(cluster: Optional[str] = None):
+    """Service for one cluster (``?cluster=name``, default cluster when omitted)."""
+    return QueryService(_query_repo(resolve_clusters(cluster, single=True)[0]))
+
+def get_fleet_query_service(cluster: Optional[str] = None):
+    """Service for ``?cluster=name``, ``?cluster=a,b`` or ``?cluster=all``; several clusters are queried concurrently."""
+    fleet = {target.name: _query_repo(target) for target in resolve_clusters(cluster)}
+    return QueryService(next(iter(fleet.values())), fleet)
+
+def get_job_query_service(job_id: str, cluster: Optional[str] = None):
+    """Service for the cluster a job was submitted to, unless ``?cluster=`` names one."""
+    if not cluster:
+        job = query_jobs.get(job_id)
+        cluster = job.cluster if job is not None else None
+    return get_query_service(cluster)
 
 @router.post("/query/execute")
-async def execute_query(query: dict, service: QueryService = Depends(get_query_service)):
-    """Execute a Redshift query."""
-    return service.execute_query(query["sql"])
+async def execute_query(query: dict, request: Request, service: QueryService = Depends(get_query_service)):
+    """Execute a Redshift query.
+
+    Set ``"stream": true`` in the body or send ``Accept: application/x-ndjson`` to stream
+    rows as newline-delimited JSON while result pages are fetched.
+
+    Set ``"max_age": <seconds>`` (or send ``Cache-Control: max-age=N``) to allow read-only
+    statements to be answered from the result cache; ``X-Cache`` and ``Age`` report the outcome.
+
+    Results are row dicts by default. Send ``Accept: application/vnd.redshift.columnar+json``
+    for one typed array per column, or ``Accept: application/vnd.apache.arrow.stream`` for
+    an Arrow IPC stream (``"format"`` in the body overrides the header).
+    """
+    accept = request.headers.get("accept", "")
+    if query.get("stream") or "application/x-ndjson" in accept:
+        rows = await service.stream_query(query["sql"], query.get("timeout"))
+        return StreamingResponse(rows, media_type="application/x-ndjson")
+
+    result_format = negotiate_format(accept, query.get("format"))
+    max_age = _max_age_hint(query, request)
+    headers = {}
+    if max_age is not None:
+        payload, cache_status, age = await service.execute_cached_query(query["sql"], max_age, query.get("timeout"), result_format)
+        headers = {"X-Cache": cache_status, "Age": str(int(age))}
+    else:
+        payload = await service.execute_query(query["sql"], query.get("timeout"), result_format)
+
+    if result_format == ARROW:
+        return Response(content=payload, media_type=ARROW_MEDIA_TYPE, headers=headers)
+    with phase("serialize"):
+        if result_format == COLUMNAR:
+            return JSONResponse(content=payload, media_type=COLUMNAR_MEDIA_TYPE, headers=headers)
+        return JSONResponse(content=jsonable_encoder(payload), headers=headers)
+
+@router.post("/query/export")
+async def export_query(query: dict, service: QueryService = Depends(get_query_service)):
+    """Export a query's full result as a streamed file.
+
+    Body: ``{"sql": ..., "format": "csv" | "parquet", "compression": "gzip" | "zstd" | "none", "timeout": S}``.
+    CSV defaults to gzip; Parquet compresses its columns with zstd by default. Rows are
+    fetched and encoded page by page, so large results never sit in memory at once.
+    """
+    export_format = query.get("format", "csv")
+    encoder, chunks = await service.export_query(query["sql"], export_format, query.get("compression"), query.get("timeout"))
+    headers = {"Content-Disposition": f'attachment; filename="query-results{encoder.extension}"'}
+    return StreamingResponse(chunks, media_type=encoder.media_type, headers=headers)
+
+@router.post("/query/batch")
+async def execute_batch(batch: dict, service: QueryService = Depends(get_query_service)):
+    """Execute several Redshift statements in one request.
+
+    Body: ``{"statements": [...], "mode": "transaction" | "parallel", "concurrency": N, "timeout": S}``.
+    """
+    return await service.execute_batch(
+        batch.get("statements", []), batch.get("mode", "transaction"), batch.get("concurrency"), batch.get("timeout")
+    )
+
+@router.post("/query/jobs", status_code=202)
+async def submit_query_job(query: dict, service: QueryService = Depends(get_query_service)):
+    """Submit a Redshift query and return its job id immediately.
+
+    Poll ``GET /query/jobs/{job_id}`` until ``done``, then page through
+    ``GET /query/jobs/{job_id}/results``. Job ids are Data API statement ids, so a job
+    submitted through another worker (or before a restart) can be looked up too.
+    """
+    return await service.submit_query_job(query["sql"])
+
+@router.get("/query/jobs/{job_id}")
+async def get_query_job(job_id: str, service: QueryService = Depends(get_job_query_service)):
+    """Get a query job's status, row count and duration."""
+    return await service.get_query_job(job_id)
+
+@router.get("/query/jobs/{job_id}/results")
+async def get_query_job_results(
+    job_id: str,
+    request: Request,
+    next_token: Optional[str] = None,
+    format: Optional[str] = None,
+    service: QueryService = Depends(get_job_query_service),
+):
+    """Get one page of a finished job's results; pass the returned ``next_token`` for the next page."""
+    result_format = negotiate_format(request.headers.get("accept", ""), format)
+    return await service.get_query_job_results(job_id, next_token, result_format)
+
+@router.delete("/query/jobs/{job_id}")
+async def cancel_query_job(job_id: str, service: QueryService = Depends(get_job_query_service)):
+    """Cancel a running query job."""
+    return await service.cancel_query_job(job_id)
 
 @router.get("/query/history")
-async def get_query_history(service: QueryService = Depends(get_query_service)):
-    """Get query execution history."""
-    return service.get_query_history()
+async def get_query_history(
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    service: QueryService = Depends(get_fleet_query_service),
+):
+    """Get query execution history. Pass the returned ``next_cursor`` to fetch the next page.
+
+    With ``?cluster=all`` (or a comma-separated list) every selected cluster is queried
+    concurrently and the newest queries are merged; clusters that fail or time out are
+    reported under ``clusters`` instead of failing the request.
+    """
+    return await service.get_query_history(start_time, end_time, limit, cursor)
+
+
+@router.get("/query/fingerprints")
+async def get_query_fingerprints(
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    limit: int = 20,
+    order_by: str = "total_ms",
+    service: QueryService = Depends(get_fleet_query_service),
+):
+    """Get execution count and runtime percentiles per normalised query, heaviest first."""
+    return await service.get_query_fingerprints(start_time, end_time, limit, order_by)
 
 
 @router.get("/query/long-running")
-async def get_long_running_queries(service: QueryService = Depends(get_query_service)):
+async def get_long_running_queries(
+    request: Request,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    limit: int = 10,
+    service: QueryService = Depends(get_fleet_query_service),
+):
     """Get long-running queries from Redshift."""
-    return service.get_long_running_queries()
+    return await dashboards.serve_async(
+        "query_long_running", request, lambda: service.get_long_running_queries(start_time, end_time, limit),
+    )
 
 @router.get("/query/slow")
-async def get_slow_queries(service: QueryService = Depends(get_query_service)):
+async def get_slow_queries(request: Request, service: QueryService = Depends(get_fleet_query_service)):
     """Get slow queries from CloudWatch logs."""
-    return service.get_slow_queries_from_cloudwatch()
+    return await dashboards.serve_async("query_slow", request, service.get_slow_queries_from_cloudwatch)
 
 @router.get("/query/statistics")
-async def get_query_statistics(service: QueryService = Depends(get_query_service)):
+async def get_query_statistics(
+    request: Request,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    service: QueryService = Depends(get_fleet_query_service),
+):
     """Get query statistics from Redshift."""
-    return service.get_query_statistics()
+    return await dashboards.serve_async(
+        "query_statistics", request, lambda: service.get_query_statistics(start_time, end_time),
+    )
+
+# Refreshed in the background for dashboards that poll these endpoints without query parameters.
+_interval = Settings.DASHBOARD_QUERY_REFRESH_INTERVAL
+dashboards.register(
+    "query_long_running", lambda: get_fleet_query_service().get_long_running_queries(None, None, 10), _interval,
+)
+dashboards.register("query_slow", lambda: get_fleet_query_service().get_slow_queries_from_cloudwatch(), _interval)
+dashboards.register("query_statistics", lambda: get_fleet_query_service().get_query_statistics(None, None), _interval)
@@ -0,0 +1,65 @@
+from fastapi import APIRouter
+from core import instrumentation
+from core.cache import caches
+from core.clusters import get_cluster_registry
+from core.config import Settings
+from core.dashboard_refresh import dashboards
+from core.response import success_response
+from infrastructure.aws_clients import client_registry, metrics_fetcher_stats
+from infrastructure.database import connection_pool_stats
+from repositories.query_repository import query_jobs
+
+router = APIRouter()
+
+@router.get("/system/aws-clients")
+async def get_aws_client_stats():
+    """Report shared AWS client pool usage and saturation."""
+    return success_response(client_registry.stats(), "AWS client pool statistics retrieved successfully.")
+
+@router.get("/system/aws-governors")
+async def get_aws_governor_stats():
+    """Report each AWS operation's adaptive rate and concurrency limits, queueing and throttles."""
+    governors = client_registry.governors
+    return success_response(
+        governors.stats() if governors is not None else [], "AWS rate governor statistics retrieved successfully.",
+    )
+
+@router.get("/system/caches")
+async def get_cache_stats():
+    """Report hit/miss counters for the in-process caches."""
+    return success_response({name: cache.stats() for name, cache in caches.items()}, "Cache statistics retrieved successfully.")
+
+@router.get("/system/clusters")
+async def get_clusters():
+    """List the clusters ``?cluster=`` can select; the first one is the default."""
+    return success_response(
+        [cluster.to_dict() for cluster in get_cluster_registry()], "Clusters retrieved successfully.",
+    )
+
+@router.get("/system/dashboards")
+async def get_dashboard_stats():
+    """Report each precomputed dashboard payload's age, refresh lag, hits and skipped or failed refreshes."""
+    return success_response(dashboards.stats(), "Dashboard refresh statistics retrieved successfully.")
+
+@router.get("/system/db-pools")
+async def get_db_pool_stats():
+    """Report direct-connection pool sizes, waiters, health checks and connect failures per cluster."""
+    return success_response(connection_pool_stats(), "Connection pool statistics retrieved successfully.")
+
+@router.get("/system/metrics-fetchers")
+async def get_metrics_fetcher_stats():
+    """Report CloudWatch GetMetricData batching and deduplication counters."""
+    return success_response(metrics_fetcher_stats(), "Metrics fetcher statistics retrieved successfully.")
+
+@router.get("/system/query-jobs")
+async def get_query_job_stats():
+    """Report tracked, running, re-attached and evicted query jobs."""
+    return success_response(query_jobs.stats(), "Query job statistics retrieved successfully.")
+
+@router.get("/system/startup")
+async def get_startup_stats():
+    """Report seconds from process start to import completion, background warm-up and the first request."""
+    return success_response(
+        {"warmup": Settings.STARTUP_WARMUP, "milestones": instrumentation.startup_milestones},
+        "Startup statistics retrieved successfully.",
+    )
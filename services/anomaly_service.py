@@ -0,0 +1,69 @@
+import time
+from datetime import datetime, timedelta, timezone
+from core import anomaly_detection
+from core.exceptions import CustomAPIException
+from core.response import success_response, error_response
+from repositories.anomaly_repository import AnomalyRepository
+
+
+class AnomalyService:
+    def __init__(self, anomaly_repo: AnomalyRepository):
+        self.anomaly_repo = anomaly_repo
+
+    def detect_anomalies(self, request: dict):
+        """Fetch metric and log-rate series over a window and flag anomalous points."""
+        detectors = request.get("detectors", list(anomaly_detection.DETECTORS))
+        unknown = set(detectors) - set(anomaly_detection.DETECTORS)
+        if unknown:
+            return error_response(f"Unknown detectors: {', '.join(sorted(unknown))}")
+
+        try:
+            started = time.perf_counter()
+            period = int(request.get("period", 60))
+            end_time = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+            start_time = end_time - timedelta(hours=float(request.get("hours", 24)))
+
+            metrics = request.get("metrics")
+            if metrics is None and not request.get("log_groups"):
+                metrics = [{
+                    "namespace": "AWS/Redshift",
+                    "metric_name": "CPUUtilization",
+                    "dimensions": {"ClusterIdentifier": self.anomaly_repo.cluster.cluster_id},
+                }]
+
+            # Series sampled at different resolutions are scored on separate grids.
+            groups = []
+            if metrics:
+                groups.append((self.anomaly_repo.get_metric_series(metrics, start_time, end_time, period), period))
+            if request.get("log_groups"):
+                groups.append(self.anomaly_repo.get_log_event_rates(request["log_groups"], start_time, end_time, period))
+
+            anomalies = []
+            for series, step in groups:
+                labels = list(series)
+                length = int((end_time - start_time).total_seconds() // step)
+                grid = anomaly_detection.to_grid([series[label] for label in labels], start_time.timestamp(), step, length)
+                flagged = anomaly_detection.detect(
+                    grid, detectors, float(request.get("threshold", 3.5)), request.get("options")
+                )
+                for detector, row, slot, score in flagged:
+                    anomalies.append({
+                        "series": labels[row],
+                        "detector": detector,
+                        "timestamp": (start_time + timedelta(seconds=slot * step)).isoformat(),
+                        "value": float(grid[row, slot]),
+                        "score": round(score, 2),
+                    })
+
+            anomalies.sort(key=lambda a: abs(a["score"]), reverse=True)
+            return success_response({
+                "start_time": start_time.isoformat(),
+                "end_time": end_time.isoformat(),
+                "series_count": sum(len(series) for series, _ in groups),
+                "anomalies": anomalies[:int(request.get("max_results", 1000))],
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            }, "Anomalies detected successfully.")
+        except CustomAPIException as e:
+            return error_response(f"Anomaly detection error: {e.message}", e.status_code)
+        except Exception as e:
+            return error_response(f"Anomaly detection error: {str(e)}")
@@ -1,33 +1,93 @@
 from datetime import datetime, timedelta
 from core.config import Settings
+from core.exceptions import CustomAPIException
+from core.fanout import cluster_timeouts, fan_out, fleet_summary, merge_top, merge_totals
 from repositories.cost_repository import CostRepository
 from core.response import success_response, error_response
 
 
 class CostService:
-    def __init__(self, cost_repo: CostRepository):
+    def __init__(self, cost_repo: CostRepository, fleet: dict = None):
+        """
+        :param cost_repo: Repository for the targeted cluster; billing figures are account-wide.
+        :param fleet: (Optional) Repositories keyed by cluster name for per-query cost attribution across clusters.
+        """
         self.cost_repo = cost_repo
+        self.fleet = fleet or {cost_repo.cluster.name: cost_repo}
 
     def get_total_cost(self):
         """Fetch total AWS Redshift cost."""
         try:
             total_cost = self.cost_repo.get_total_cost()
             return success_response(total_cost, "Total cost retrieved successfully.")
+        except CustomAPIException as e:
+            return error_response(f"Cost fetch error: {e.message}", e.status_code)
         except Exception as e:
             return error_response(f"Cost fetch error: {str(e)}")
 
-    def get_top_queries(self):
-        """Fetch the most expensive queries."""
+    def get_cost_history(self, days=30, resolution="day"):
+        """Fetch cost per service over time from the local cost history."""
         try:
-            top_queries = self.cost_repo.get_top_queries()
+            history = self.cost_repo.get_cost_history(days, resolution)
+            return success_response(history, "Cost history retrieved successfully.")
+        except CustomAPIException as e:
+            return error_response(e.message, e.status_code)
+        except Exception as e:
+            return error_response(f"Cost history error: {str(e)}")
+
+    def get_month_over_month(self):
+        """Compare month-to-date cost with the previous month."""
+        try:
+            comparison = self.cost_repo.get_month_over_month()
+            return success_response(comparison, "Month-over-month cost retrieved successfully.")
+        except CustomAPIException as e:
+            return error_response(e.message, e.status_code)
+        except Exception as e:
+            return error_response(f"Month-over-month cost error: {str(e)}")
+
+    async def get_top_queries(self, start_time=None, end_time=None, limit=10):
+        """Fetch the most expensive queries, users and query fingerprints."""
+        try:
+            if len(self.fleet) == 1:
+                top_queries = await self.cost_repo.get_top_queries(start_time, end_time, limit)
+            else:
+                outcome = await fan_out(
+                    self.fleet, lambda repo: repo.get_top_queries(start_time, end_time, limit),
+                    timeouts=cluster_timeouts(self.fleet),
+                )
+                top_queries = self._merge_top_queries(outcome, limit)
             return success_response(top_queries, "Top queries retrieved successfully.")
+        except CustomAPIException as e:
+            return error_response(f"Top query fetch error: {e.message}", e.status_code)
         except Exception as e:
             return error_response(f"Top query fetch error: {str(e)}")
 
+    @staticmethod
+    def _merge_top_queries(outcome, limit):
+        """Combine per-cluster cost attribution reports; users and fingerprints seen on several clusters are added up."""
+        results = outcome["results"]
+        sums = ("cost", "queries", "execution_time_ms")
+        by_cost = lambda row: row["cost"]
+        return {
+            # The cost model comes from settings, so every cluster reports the same pricing.
+            "pricing": next(iter(results.values()))["pricing"],
+            "queries": sum(result["queries"] for result in results.values()),
+            "total_cost": round(sum(result["total_cost"] for result in results.values()), 4),
+            "total_execution_ms": round(sum(result["total_execution_ms"] for result in results.values()), 2),
+            "top_queries": merge_top(results, lambda result: result["top_queries"], by_cost, limit),
+            "top_users": merge_totals(results, lambda result: result["top_users"], "user", sums, by_cost, limit),
+            "top_fingerprints": merge_totals(
+                results, lambda result: result["top_fingerprints"], "fingerprint", sums, by_cost, limit,
+            ),
+            "clusters": fleet_summary(outcome),
+        }
+
     def get_optimization_suggestions(self):
         """Suggest cost optimization strategies."""
         try:
             suggestions = self.cost_repo.get_optimization_suggestions()
             return success_response(suggestions, "Optimization suggestions retrieved successfully.")
+        except CustomAPIException as e:
+            return error_response(f"Optimization error: {e.message}", e.status_code)
         except Exception as e:
             return error_response(f"Optimization error: {str(e)}")
@@ -1,30 +1,79 @@
 from repositories.database_repository import DatabaseRepository
+from core.exceptions import CustomAPIException
+from core.fanout import cluster_timeouts, fan_out, fleet_summary
 from core.response import success_response, error_response
 
 class DatabaseService:
-    def __init__(self, db_repo: DatabaseRepository):
+    def __init__(self, db_repo: DatabaseRepository, fleet: dict = None):
+        """
+        :param db_repo: Repository for the targeted cluster.
+        :param fleet: (Optional) Repositories keyed by cluster name; with several clusters,
+            listings are returned per cluster under ``results``.
+        """
         self.db_repo = db_repo
+        self.fleet = fleet or {db_repo.cluster.name: db_repo}
 
-    def get_all_databases(self):
+    async def _collect(self, call):
+        """Run ``call`` against the selected cluster, or every selected cluster concurrently."""
+        if len(self.fleet) == 1:
+            return await call(self.db_repo)
+        outcome = await fan_out(self.fleet, call, timeouts=cluster_timeouts(self.fleet))
+        return {"results": outcome["results"], "clusters": fleet_summary(outcome)}
+
+    async def get_all_databases(self):
         """Fetch all databases."""
         try:
-            databases = self.db_repo.fetch_all_databases()
+            databases = await self._collect(lambda repo: repo.fetch_all_databases())
             return success_response(databases, "Databases retrieved successfully.")
+        except CustomAPIException as e:
+            return error_response(f"Database fetch error: {e.message}", e.status_code)
         except Exception as e:
             return error_response(f"Database fetch error: {str(e)}")
 
-    def get_schemas(self, database_name: str):
+    async def get_schemas(self, database_name: str):
         """Fetch schemas from a specific database."""
         try:
-            schemas = self.db_repo.fetch_schemas(database_name)
+            schemas = await self._collect(lambda repo: repo.fetch_schemas(database_name))
             return success_response(schemas, f"Schemas retrieved for {database_name}.")
+        except CustomAPIException as e:
+            return error_response(f"Schema fetch error: {e.message}", e.status_code)
         except Exception as e:
             return error_response(f"Schema fetch error: {str(e)}")
 
-    def get_tables(self, database_name: str, schema_name: str):
+    async def get_tables(self, database_name: str, schema_name: str):
         """Fetch tables from a schema."""
         try:
-            tables = self.db_repo.fetch_tables(database_name, schema_name)
+            tables = await self._collect(lambda repo: repo.fetch_tables(database_name, schema_name))
             return success_response(tables, f"Tables retrieved for {schema_name}.")
+        except CustomAPIException as e:
+            return error_response(f"Table fetch error: {e.message}", e.status_code)
         except Exception as e:
             return error_response(f"Table fetch error: {str(e)}")
+
+    async def search_tables(self, prefix: str, database_name: str = None, limit: int = 50):
+        """Prefix-search cached table names; across several clusters each match is tagged with its cluster."""
+        try:
+            tables = await self._collect(lambda repo: repo.search_tables(prefix, database_name, limit))
+            if len(self.fleet) > 1:
+                matches = [
+                    {"cluster": name, **table} for name, found in tables["results"].items() for table in found
+                ]
+                matches.sort(key=lambda table: table["name"].lower())
+                tables = {"tables": matches[:limit], "clusters": tables["clusters"]}
+            return success_response(tables, f"Tables matching '{prefix}' retrieved.")
+        except CustomAPIException as e:
+            return error_response(f"Table search error: {e.message}", e.status_code)
+        except Exception as e:
+            return error_response(f"Table search error: {str(e)}")
+
+    def invalidate_catalog(self, database_name: str = None, schema_name: str = None):
+        """Drop cached catalog entries on every selected cluster."""
+        try:
+            for repo in self.fleet.values():
+                repo.invalidate(database_name, schema_name)
+            return success_response(
+                {"database": database_name, "schema": schema_name, "clusters": list(self.fleet)},
+                "Catalog cache invalidated successfully.",
+            )
+        except CustomAPIException as e:
+            return error_response(f"Catalog invalidation error: {e.message}", e.status_code)
@@ -0,0 +1,38 @@
+import json
+from botocore.exceptions import BotoCoreError, ClientError
+from core.exceptions import ThrottledError
+from repositories.log_repository import LogRepository
+
+
+class LogService:
+    def __init__(self, log_repo: LogRepository):
+        self.log_repo = log_repo
+
+    def stream_events(self, event_format: str = "ndjson", **kwargs):
+        """
+        Stream log events as NDJSON or Server-Sent Events.
+
+        NDJSON emits one line per event followed by a ``{"cursor": ...}`` line per page.
+        SSE sets each page's cursor as the ``id`` of its last event, so a reconnecting
+        ``EventSource`` resumes through ``Last-Event-ID``.
+        """
+        pages = self.log_repo.stream_events(**kwargs)
+        return self._encode_sse(pages) if event_format == "sse" else self._encode_ndjson(pages)
+
+    @staticmethod
+    async def _encode_ndjson(pages):
+        try:
+            async for events, cursor in pages:
+                yield "".join(json.dumps(event) + "\n" for event in events) + json.dumps({"cursor": cursor}) + "\n"
+        except (BotoCoreError, ClientError, ThrottledError) as e:
+            yield json.dumps({"error": f"Error fetching logs from CloudWatch: {str(e)}"}) + "\n"
+
+    @staticmethod
+    async def _encode_sse(pages):
+        try:
+            async for events, cursor in pages:
+                chunks = [f"data: {json.dumps(event)}\n\n" for event in events[:-1]]
+                chunks.append(f"id: {cursor}\ndata: {json.dumps(events[-1])}\n\n")
+                yield "".join(chunks)
+        except (BotoCoreError, ClientError, ThrottledError) as e:
+            yield f"event: error\ndata: {json.dumps({'error': f'Error fetching logs from CloudWatch: {str(e)}'})}\n\n"
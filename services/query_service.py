@@ -1,46 +1,224 @@
+import asyncio
 from repositories.query_repository import QueryRepository
+from core.exceptions import CustomAPIException
+from core.fanout import cluster_timeouts, fan_out, fleet_summary, merge_top
 from core.response import success_response, error_response
+from core.result_encoding import ARROW, ROWS
 
 class QueryService:
-    def __init__(self, query_repo: QueryRepository):
+    def __init__(self, query_repo: QueryRepository, fleet: dict = None):
+        """
+        :param query_repo: Repository for the targeted cluster.
+        :param fleet: (Optional) Repositories keyed by cluster name when several clusters are targeted;
+            the read-only history and statistics endpoints then fan out and merge.
+        """
         self.query_repo = query_repo
+        self.fleet = fleet or {query_repo.cluster.name: query_repo}
 
-    def execute_query(self, sql: str):
-        """Execute a SQL query on Redshift."""
+    async def _fan_out(self, call):
+        return await fan_out(self.fleet, call, timeouts=cluster_timeouts(self.fleet))
+
+    async def _fan_out_sync(self, method, *args):
+        """Fan out a blocking repository method, one worker thread per cluster."""
+        loop = asyncio.get_running_loop()
+        return await self._fan_out(lambda repo: loop.run_in_executor(None, lambda: getattr(repo, method)(*args)))
+
+    async def execute_query(self, sql: str, timeout: float = None, result_format: str = ROWS):
+        """Execute a SQL query on Redshift (Arrow results are returned as raw IPC bytes)."""
         try:
-            result = self.query_repo.execute_query(sql)
+            result = await self.query_repo.execute_query(sql, timeout, result_format)
+            if result_format == ARROW:
+                return result
             return success_response(result, "Query executed successfully.")
+        except CustomAPIException as e:
+            return error_response(f"Query execution error: {e.message}", e.status_code)
+        except Exception as e:
+            return error_response(f"Query execution error: {str(e)}")
+
+    async def execute_cached_query(self, sql: str, max_age: float, timeout: float = None, result_format: str = ROWS):
+        """Execute a SQL query through the read-only result cache; returns (response, cache status, age)."""
+        try:
+            result, cache_status, age = await self.query_repo.execute_cached_query(sql, max_age, timeout, result_format)
+            if result_format == ARROW:
+                return result, cache_status, age
+            return success_response(result, "Query executed successfully."), cache_status, age
+        except CustomAPIException as e:
+            return error_response(f"Query execution error: {e.message}", e.status_code)
         except Exception as e:
             return error_response(f"Query execution error: {str(e)}")
 
-    def get_query_history(self):
-        """Get query execution history."""
+    async def execute_batch(self, statements, mode: str = "transaction", concurrency: int = None, timeout: float = None):
+        """Execute a batch of SQL statements on Redshift."""
+        try:
+            result = await self.query_repo.execute_batch(statements, mode, concurrency, timeout)
+            return success_response(result, "Batch executed successfully.")
+        except CustomAPIException as e:
+            return error_response(f"Batch execution error: {e.message}", e.status_code)
+        except Exception as e:
+            return error_response(f"Batch execution error: {str(e)}")
+
+    async def submit_query_job(self, sql: str):
+        """Submit a SQL query as a background job."""
+        try:
+            job = await self.query_repo.submit_query_job(sql)
+            return success_response(job, "Query job submitted successfully.")
+        except CustomAPIException as e:
+            return error_response(f"Query job submit error: {e.message}", e.status_code)
+        except Exception as e:
+            return error_response(f"Query job submit error: {str(e)}")
+
+    async def get_query_job(self, job_id: str):
+        """Get a query job's status."""
         try:
-            history = self.query_repo.get_query_history()
+            job = await self.query_repo.get_query_job(job_id)
+            return success_response(job, "Query job status retrieved successfully.")
+        except CustomAPIException as e:
+            return error_response(e.message, e.status_code)
+        except Exception as e:
+            return error_response(f"Query job status error: {str(e)}")
+
+    async def get_query_job_results(self, job_id: str, next_token: str = None, result_format: str = ROWS):
+        """Get one page of a finished query job's results."""
+        try:
+            results = await self.query_repo.get_query_job_results(job_id, next_token, result_format)
+            return success_response(results, "Query job results retrieved successfully.")
+        except CustomAPIException as e:
+            return error_response(e.message, e.status_code)
+        except Exception as e:
+            return error_response(f"Query job results error: {str(e)}")
+
+    async def cancel_query_job(self, job_id: str):
+        """Cancel a running query job."""
+        try:
+            job = await self.query_repo.cancel_query_job(job_id)
+            return success_response(job, "Query job cancelled successfully.")
+        except CustomAPIException as e:
+            return error_response(e.message, e.status_code)
+        except Exception as e:
+            return error_response(f"Query job cancel error: {str(e)}")
+
+    async def stream_query(self, sql: str, timeout: float = None):
+        """Execute a SQL query and return an async iterator of NDJSON rows."""
+        try:
+            return await self.query_repo.stream_query(sql, timeout)
+        except CustomAPIException as e:
+            return error_response(f"Query execution error: {e.message}", e.status_code)
+        except Exception as e:
+            return error_response(f"Query execution error: {str(e)}")
+
+    async def export_query(self, sql: str, export_format: str = "csv", compression: str = None, timeout: float = None):
+        """Execute a SQL query and return the encoder and an async iterator of compressed file chunks."""
+        try:
+            return await self.query_repo.export_query(sql, export_format, compression, timeout)
+        except CustomAPIException as e:
+            return error_response(e.message, e.status_code)
+        except Exception as e:
+            return error_response(f"Query export error: {str(e)}")
+
+    async def get_query_history(self, start_time=None, end_time=None, limit=10, cursor=None):
+        """Get query execution history; across several clusters the newest ``limit`` queries overall."""
+        try:
+            if len(self.fleet) == 1:
+                history = await self.query_repo.get_query_history(start_time, end_time, limit, cursor)
+            else:
+                if cursor:
+                    raise CustomAPIException("Cursors are not supported across several clusters.")
+                outcome = await self._fan_out(lambda repo: repo.get_query_history(start_time, end_time, limit))
+                history = {
+                    "query_history": merge_top(
+                        outcome["results"], lambda result: result["query_history"],
+                        lambda query: str(query["start_time"]), limit,
+                    ),
+                    "clusters": fleet_summary(outcome),
+                }
             return success_response(history, "Query history retrieved successfully.")
+        except CustomAPIException as e:
+            return error_response(f"Query history fetch error: {e.message}", e.status_code)
         except Exception as e:
             return error_response(f"Query history fetch error: {str(e)}")
 
-    def get_long_running_queries(self):
-        """Fetch long-running queries."""
+    async def get_query_fingerprints(self, start_time=None, end_time=None, limit=20, order_by="total_ms"):
+        """Get runtime statistics per normalised query shape; across clusters each entry is per cluster."""
+        try:
+            if len(self.fleet) == 1:
+                fingerprints = await self.query_repo.get_query_fingerprints(start_time, end_time, limit, order_by)
+            else:
+                outcome = await self._fan_out(
+                    lambda repo: repo.get_query_fingerprints(start_time, end_time, limit, order_by)
+                )
+                results = outcome["results"]
+                fingerprints = {
+                    "queries": sum(result["queries"] for result in results.values()),
+                    "fingerprints": merge_top(
+                        results, lambda result: result["fingerprints"], lambda entry: entry[order_by] or 0, limit,
+                    ),
+                    "clusters": fleet_summary(outcome),
+                }
+            return success_response(fingerprints, "Query fingerprints retrieved successfully.")
+        except CustomAPIException as e:
+            return error_response(f"Query fingerprint fetch error: {e.message}", e.status_code)
+        except Exception as e:
+            return error_response(f"Query fingerprint fetch error: {str(e)}")
+
+    async def get_long_running_queries(self, start_time=None, end_time=None, limit=10):
+        """Fetch long-running queries; across several clusters the slowest ``limit`` overall."""
         try:
-            queries = self.query_repo.get_long_running_queries()
+            if len(self.fleet) == 1:
+                queries = await self.query_repo.get_long_running_queries(start_time, end_time, limit)
+            else:
+                outcome = await self._fan_out(lambda repo: repo.get_long_running_queries(start_time, end_time, limit))
+                queries = {
+                    "queries": merge_top(
+                        outcome["results"], lambda result: result, lambda query: query["execution_time_ms"] or 0, limit,
+                    ),
+                    "clusters": fleet_summary(outcome),
+                }
             return success_response(queries, "Long-running queries retrieved successfully.")
+        except CustomAPIException as e:
+            return error_response(f"Error fetching long-running queries: {e.message}", e.status_code)
         except Exception as e:
             return error_response(f"Error fetching long-running queries: {str(e)}")
 
-    def get_slow_queries_from_cloudwatch(self):
-        """Fetch slow queries from CloudWatch logs."""
+    async def get_slow_queries_from_cloudwatch(self):
+        """Fetch slow queries from CloudWatch logs; across several clusters the five slowest overall."""
         try:
-            slow_queries = self.query_repo.get_slow_queries_from_cloudwatch()
+            if len(self.fleet) == 1:
+                slow_queries = await asyncio.get_running_loop().run_in_executor(
+                    None, self.query_repo.get_slow_queries_from_cloudwatch
+                )
+            else:
+                outcome = await self._fan_out_sync("get_slow_queries_from_cloudwatch")
+                slow_queries = {
+                    "slow_queries": merge_top(
+                        outcome["results"], lambda result: result["slow_queries"], lambda point: point["runtime"], 5,
+                    ),
+                    "clusters": fleet_summary(outcome),
+                }
             return success_response(slow_queries, "Slow queries retrieved successfully.")
+        except CustomAPIException as e:
+            return error_response(f"Error fetching slow queries from CloudWatch: {e.message}", e.status_code)
         except Exception as e:
             return error_response(f"Error fetching slow queries from CloudWatch: {str(e)}")
 
-    def get_query_statistics(self):
-        """Fetch query statistics."""
+    async def get_query_statistics(self, start_time=None, end_time=None):
+        """Fetch query statistics; across several clusters the totals are added up."""
         try:
-            stats = self.query_repo.get_query_statistics()
+            if len(self.fleet) == 1:
+                stats = await self.query_repo.get_query_statistics(start_time, end_time)
+            else:
+                outcome = await self._fan_out(lambda repo: repo.get_query_statistics(start_time, end_time))
+                results = outcome["results"]
+                total = sum(result["total_queries"] for result in results.values())
+                weighted = sum(result["avg_execution_time_ms"] * result["total_queries"] for result in results.values())
+                stats = {
+                    "total_queries": total,
+                    "avg_execution_time_ms": round(weighted / total, 2) if total else 0,
+                    "failed_queries": sum(result["failed_queries"] for result in results.values()),
+                    "per_cluster": results,
+                    "clusters": fleet_summary(outcome),
+                }
             return success_response(stats, "Query statistics retrieved successfully.")
+        except CustomAPIException as e:
+            return error_response(f"Error fetching query statistics: {e.message}", e.status_code)
         except Exception as e:
-            return error_response(f"Error fetching query statistics: {str(e)}")
\ No newline at end of file
+            return error_response(f"Error fetching query statistics: {str(e)}")
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from core.exceptions import CustomAPIException
+from repositories.anomaly_repository import AnomalyRepository
+
+
+class StuckLogs:
+    """A Logs client whose Insights queries never leave ``Running``."""
+
+    def __init__(self):
+        self.stopped = []
+
+    def start_query(self, **kwargs):
+        return {"queryId": "q-1"}
+
+    def get_query_results(self, queryId):
+        return {"status": "Running", "results": []}
+
+    def stop_query(self, queryId):
+        self.stopped.append(queryId)
+        return {"success": True}
+
+
+def test_stuck_insights_query_is_stopped_after_the_deadline():
+    logs = StuckLogs()
+    repository = AnomalyRepository(metrics_fetcher=None, logs_client=logs, logs_query_timeout=0.05)
+    end_time = datetime.now(timezone.utc)
+
+    with pytest.raises(CustomAPIException) as raised:
+        repository.get_log_event_rates(["/aws/redshift/test"], end_time - timedelta(hours=1), end_time, 60)
+    assert raised.value.status_code == 504
+    assert logs.stopped == ["q-1"]
@@ -0,0 +1,180 @@
+import threading
+import time
+import pytest
+from core.exceptions import RedshiftConnectionError
+from infrastructure import database
+from infrastructure.database import ConnectionPool
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, params=None):
+        if self.connection.dead:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.connection.executed.append(sql)
+
+
+class FakeConnection:
+    """Just enough of a psycopg2 connection for the pool: ``closed``, ``cursor``, ``rollback`` and ``close``."""
+
+    def __init__(self):
+        self.closed = 0
+        self.dead = False
+        self.executed = []
+
+    def cursor(self, name=None):
+        return FakeCursor(self)
+
+    def rollback(self):
+        if self.dead:
+            raise psycopg2.OperationalError("connection already closed")
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeConnect:
+    def __init__(self):
+        self.connections = []
+
+    def __call__(self):
+        connection = FakeConnection()
+        self.connections.append(connection)
+        return connection
+
+
+def _pool(connect, **kwargs):
+    options = {"min_size": 0, "max_size": 2, "acquire_timeout": 2, "health_check_interval": 30, "max_lifetime": 600}
+    return ConnectionPool(connect, name="test", **{**options, **kwargs})
+
+
+def test_released_connections_are_reused():
+    connect = FakeConnect()
+    pool = _pool(connect)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert len(connect.connections) == 1
+
+
+def test_broken_connection_is_discarded_and_replaced():
+    connect = FakeConnect()
+    pool = _pool(connect)
+
+    with pytest.raises(psycopg2.OperationalError):
+        with pool.connection() as connection:
+            connection.dead = True
+            raise psycopg2.OperationalError("SSL connection has been closed unexpectedly")
+
+    assert connection.closed
+    stats = pool.stats()
+    assert stats["size"] == 0
+    assert stats["closed"] == 1
+    replacement = pool.acquire()
+    assert replacement is not connection
+    assert len(connect.connections) == 2
+
+
+def test_failed_rollback_on_release_discards_the_connection():
+    pool = _pool(FakeConnect())
+    connection = pool.acquire()
+    connection.dead = True
+    pool.release(connection)
+    assert connection.closed
+    assert pool.stats()["idle"] == 0
+
+
+def test_idle_connection_failing_its_health_check_is_replaced(clock, monkeypatch):
+    monkeypatch.setattr(database, "time", clock)
+    connect = FakeConnect()
+    pool = _pool(connect)
+    connection = pool.acquire()
+    pool.release(connection)
+
+    clock.advance(10)
+    assert pool.acquire() is connection
+    assert connection.executed == []
+    pool.release(connection)
+
+    connection.dead = True
+    clock.advance(31)
+    replacement = pool.acquire()
+    assert replacement is not connection
+    stats = pool.stats()
+    assert stats["health_checks"] == 1
+    assert stats["health_check_failures"] == 1
+    assert stats["size"] == 1
+
+
+def test_connection_past_max_lifetime_is_not_reused(clock, monkeypatch):
+    monkeypatch.setattr(database, "time", clock)
+    pool = _pool(FakeConnect())
+    connection = pool.acquire()
+    clock.advance(601)
+    pool.release(connection)
+    assert pool.acquire() is not connection
+    assert connection.closed
+
+
+def test_waiter_at_max_size_gets_the_next_released_connection():
+    pool = _pool(FakeConnect(), max_size=1)
+    held = pool.acquire()
+    acquired = []
+    thread = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    thread.start()
+    deadline = time.monotonic() + 2
+    while pool.stats()["waiting"] != 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+    pool.release(held)
+    thread.join(2)
+    assert acquired == [held]
+    assert pool.stats()["size"] == 1
+
+
+def test_waiter_at_max_size_gets_a_new_slot_when_a_connection_is_discarded():
+    connect = FakeConnect()
+    pool = _pool(connect, max_size=1)
+    held = pool.acquire()
+    acquired = []
+    thread = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    thread.start()
+    deadline = time.monotonic() + 2
+    while pool.stats()["waiting"] != 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+    pool.release(held, broken=True)
+    thread.join(2)
+    assert len(acquired) == 1 and acquired[0] is not held
+    assert len(connect.connections) == 2
+
+
+def test_acquire_times_out_at_max_size():
+    pool = _pool(FakeConnect(), max_size=1, acquire_timeout=0.05)
+    pool.acquire()
+    with pytest.raises(RedshiftConnectionError):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_close_rejects_acquire_and_closes_returned_connections():
+    pool = _pool(FakeConnect())
+    lent = pool.acquire()
+    pool.close()
+    with pytest.raises(RedshiftConnectionError):
+        pool.acquire()
+    pool.release(lent)
+    assert lent.closed
+    assert pool.stats()["size"] == 0
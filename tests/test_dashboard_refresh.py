@@ -0,0 +1,116 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from core import dashboard_refresh
+from core.dashboard_refresh import DashboardRefresher
+
+REQUEST = SimpleNamespace(query_params={})
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return {"calls": self.calls}
+
+
+@pytest.fixture
+def refresher(clock, monkeypatch):
+    monkeypatch.setattr(dashboard_refresh, "time", clock)
+    monkeypatch.setattr(dashboard_refresh, "_TICK", 0)
+    return DashboardRefresher(enabled=True, concurrency=2, jitter=0, idle_ttl=5)
+
+
+async def _passes(count: int = 5):
+    """Let the refresh loop (ticking every 0s) and its refresh tasks run a few times."""
+    for _ in range(count):
+        await asyncio.sleep(0)
+
+
+def test_due_job_that_was_read_recently_is_refreshed(refresher, clock):
+    compute = Counter()
+    refresher.register("summary", compute, interval=10)
+
+    async def scenario():
+        response = await refresher.serve_async("summary", REQUEST, compute)
+        assert response.headers["X-Cache"] == "MISS"
+        refresher.start()
+        try:
+            clock.advance(8)
+            assert refresher.lookup("summary", REQUEST).headers["X-Cache"] == "HIT"
+            await _passes()
+            assert compute.calls == 1
+
+            clock.advance(3)
+            await _passes()
+            assert compute.calls == 2
+        finally:
+            await refresher.stop()
+
+    asyncio.run(scenario())
+    job = refresher.stats()["jobs"]["summary"]
+    assert job["refreshes"] == 1
+    assert job["skipped"] == 0
+
+
+def test_idle_job_is_skipped_until_the_next_read(refresher, clock):
+    compute = Counter()
+    refresher.register("summary", compute, interval=10)
+
+    async def scenario():
+        await refresher.serve_async("summary", REQUEST, compute)
+        refresher.start()
+        try:
+            # Due at 10s, but the last read was at 0s and idle_ttl is 5s.
+            clock.advance(11)
+            await _passes()
+            assert compute.calls == 1
+            job = refresher.stats()["jobs"]["summary"]
+            assert job["skipped"] == 1
+            assert job["due_in_seconds"] is None
+
+            # Still idle: no further skips are counted while nothing is due.
+            clock.advance(5)
+            await _passes()
+            assert refresher.stats()["jobs"]["summary"]["skipped"] == 1
+
+            # A read within twice the interval serves the stored body and re-arms the job.
+            assert refresher.lookup("summary", REQUEST).headers["X-Cache"] == "HIT"
+            await _passes()
+            assert compute.calls == 2
+        finally:
+            await refresher.stop()
+
+    asyncio.run(scenario())
+    job = refresher.stats()["jobs"]["summary"]
+    assert job["refreshes"] == 1
+    assert job["hits"] == 1
+
+
+def test_stale_payload_is_recomputed_live(refresher, clock):
+    compute = Counter()
+    refresher.register("summary", compute, interval=10)
+
+    async def scenario():
+        await refresher.serve_async("summary", REQUEST, compute)
+        clock.advance(21)
+        response = await refresher.serve_async("summary", REQUEST, compute)
+        assert response.headers["X-Cache"] == "MISS"
+
+    asyncio.run(scenario())
+    assert compute.calls == 2
+    assert refresher.stats()["jobs"]["summary"]["misses"] == 2
+
+
+def test_requests_with_query_parameters_bypass_the_stored_payload(refresher):
+    compute = Counter()
+    refresher.register("summary", compute, interval=10)
+    request = SimpleNamespace(query_params={"days": "7"})
+
+    async def scenario():
+        await refresher.serve_async("summary", REQUEST, compute)
+        return await refresher.serve_async("summary", request, compute)
+
+    assert asyncio.run(scenario()) == {"calls": 2}
@@ -0,0 +1,53 @@
+import asyncio
+import time
+from repositories.log_repository import LogRepository
+
+
+class FakeCloudWatch:
+    """Serves a fixed list of events; each call returns those at or after ``start_time`` in one page."""
+
+    def __init__(self, events):
+        self.events = events
+        self.polls = 0
+
+    def filter_log_events_page(self, log_group, filter_pattern, log_stream_names, token, start_time, end_time):
+        self.polls += 1
+        return [event for event in self.events if event["timestamp"] >= (start_time or 0)], None
+
+    def get_log_events_page(self, log_group, log_stream, token, start_time, end_time):
+        self.polls += 1
+        if token == "end":
+            return [], "end"
+        return list(self.events), "end"
+
+
+def _collect(repository: LogRepository, **kwargs):
+    async def collect():
+        return [page async for page in repository.stream_events("group", **kwargs)]
+    return asyncio.run(asyncio.wait_for(collect(), 5))
+
+
+EVENTS = [
+    {"eventId": "a", "timestamp": 100, "message": "one"},
+    {"eventId": "b", "timestamp": 100, "message": "two"},
+    {"eventId": "c", "timestamp": 101, "message": "three"},
+]
+
+
+def test_timestamp_cursor_skips_events_already_returned_at_its_millisecond():
+    client = FakeCloudWatch(list(EVENTS))
+    repository = LogRepository(client)
+    [(events, cursor)] = _collect(repository, filter_pattern="ERROR")
+    assert [event["eventId"] for event in events] == ["a", "b", "c"]
+
+    client.events.append({"eventId": "d", "timestamp": 101, "message": "four"})
+    [(events, _)] = _collect(repository, filter_pattern="ERROR", cursor=cursor)
+    assert [event["eventId"] for event in events] == ["d"]
+
+
+def test_follow_stops_once_end_time_has_passed():
+    end_time = int(time.time() * 1000) - 1000
+    for kwargs in ({"filter_pattern": "ERROR"}, {"log_stream": "stream"}):
+        client = FakeCloudWatch(list(EVENTS))
+        pages = _collect(LogRepository(client), end_time=end_time, follow=True, **kwargs)
+        assert sum(len(events) for events, _ in pages) == 3
@@ -0,0 +1,29 @@
+import asyncio
+import pytest
+from benchmarks.fake_aws import FakeAWSConfig, FakeRedshiftData
+from core.clusters import Cluster
+from core.statement_executor import StatementExecutor
+from repositories.query_repository import QueryRepository
+
+CLUSTER = Cluster("test", "test-cluster", "us-east-1", "dev", "admin")
+
+
+def _repository(rows: int, page_size: int):
+    fake = FakeRedshiftData(FakeAWSConfig(latency=0, statement_seconds=0, rows=rows, page_size=page_size))
+    executor = StatementExecutor(fake, poll_initial=0.001, poll_max=0.001)
+    return QueryRepository(executor, metrics_fetcher=None, cluster=CLUSTER)
+
+
+@pytest.mark.parametrize("mode", ["transaction", "parallel"])
+def test_batch_results_include_every_page(mode):
+    repository = _repository(rows=2500, page_size=1000)
+    batch = asyncio.run(repository.execute_batch(["SELECT * FROM a", "SELECT * FROM b"], mode=mode))
+
+    assert [result["status"] for result in batch["results"]] == ["FINISHED", "FINISHED"]
+    assert [len(result["query_results"]) for result in batch["results"]] == [2500, 2500]
+
+
+def test_rows_format_query_includes_every_page():
+    repository = _repository(rows=2500, page_size=1000)
+    result = asyncio.run(repository.execute_query("SELECT * FROM t"))
+    assert len(result["query_results"]) == 2500
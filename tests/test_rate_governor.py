@@ -0,0 +1,140 @@
+import threading
+import time
+import pytest
+from core import rate_governor
+from core.exceptions import ThrottledError
+from core.rate_governor import RateGovernor
+
+
+@pytest.fixture
+def governor(clock, monkeypatch):
+    monkeypatch.setattr(rate_governor, "time", clock)
+    return RateGovernor("test.op", max_rate=100, concurrency=1, max_concurrency=1, max_wait=5, max_queue=10)
+
+
+def _wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the governor"
+        time.sleep(0.005)
+
+
+def _queue_acquire(governor, name, acquired, errors):
+    def target():
+        try:
+            governor.acquire()
+            acquired.append(name)
+        except ThrottledError as e:
+            errors.append((name, e))
+
+    thread = threading.Thread(target=target)
+    waiting = governor.stats()["waiting"]
+    thread.start()
+    _wait_for(lambda: governor.stats()["waiting"] == waiting + 1)
+    return thread
+
+
+def test_released_slots_go_to_waiters_in_arrival_order(governor):
+    governor.acquire()
+    acquired, errors = [], []
+    first = _queue_acquire(governor, "first", acquired, errors)
+    second = _queue_acquire(governor, "second", acquired, errors)
+
+    governor.release()
+    first.join(2)
+    assert acquired == ["first"]
+    assert governor.stats()["waiting"] == 1
+
+    governor.release()
+    second.join(2)
+    assert acquired == ["first", "second"]
+    assert errors == []
+    assert governor.stats()["queued"] == 2
+
+
+def test_waiter_times_out_and_leaves_the_queue(governor, clock):
+    governor.acquire()
+    acquired, errors = [], []
+    thread = _queue_acquire(governor, "late", acquired, errors)
+
+    # The waiter re-checks at least every _MAX_SLEEP, so it notices the deadline without a wake-up.
+    clock.advance(governor.max_wait + 1)
+    thread.join(2)
+    assert acquired == []
+    assert [name for name, _ in errors] == ["late"]
+    stats = governor.stats()
+    assert stats["timed_out"] == 1
+    assert stats["waiting"] == 0
+
+
+def test_timed_out_head_hands_its_turn_to_the_next_waiter(governor, clock):
+    governor.acquire()
+    acquired, errors = [], []
+    head = _queue_acquire(governor, "head", acquired, errors)
+    clock.advance(3)
+    second = _queue_acquire(governor, "second", acquired, errors)
+
+    clock.advance(2.5)
+    head.join(2)
+    assert [name for name, _ in errors] == ["head"]
+
+    governor.release()
+    second.join(2)
+    assert acquired == ["second"]
+
+
+def test_full_queue_rejects_new_callers(governor):
+    governor.max_queue = 1
+    governor.acquire()
+    acquired, errors = [], []
+    thread = _queue_acquire(governor, "queued", acquired, errors)
+
+    with pytest.raises(ThrottledError):
+        governor.acquire()
+    assert governor.stats()["rejected"] == 1
+
+    governor.release()
+    thread.join(2)
+    assert acquired == ["queued"]
+
+
+def test_throttles_within_the_cooldown_decrease_once(clock, monkeypatch):
+    monkeypatch.setattr(rate_governor, "time", clock)
+    governor = RateGovernor("test.op", max_rate=10, concurrency=8, max_concurrency=8, decrease=0.5, cooldown=1.0)
+
+    governor.record_throttle()
+    governor.record_throttle()
+    clock.advance(0.9)
+    governor.record_throttle()
+    assert governor.rate == 5
+    assert governor.limit == 4
+    assert governor.stats()["throttled"] == 3
+
+    clock.advance(0.1)
+    governor.record_throttle()
+    assert governor.rate == 2.5
+    assert governor.limit == 2
+
+
+def test_rate_never_drops_below_min_rate(clock, monkeypatch):
+    monkeypatch.setattr(rate_governor, "time", clock)
+    governor = RateGovernor("test.op", max_rate=2, decrease=0.1, cooldown=1.0, min_rate=0.5)
+
+    for _ in range(3):
+        governor.record_throttle()
+        clock.advance(1)
+    assert governor.rate == 0.5
+    assert governor.limit == 1
+
+
+def test_successes_climb_back_towards_the_ceiling(clock, monkeypatch):
+    monkeypatch.setattr(rate_governor, "time", clock)
+    governor = RateGovernor("test.op", max_rate=10, concurrency=4, max_concurrency=4, decrease=0.5)
+    governor.record_throttle()
+    assert governor.rate == 5
+
+    for _ in range(100):
+        clock.advance(1)
+        governor.acquire()
+        governor.release()
+    assert governor.rate == 10